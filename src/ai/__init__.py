@@ -3,7 +3,8 @@ AI服务层
 提供股票分析AI对话功能
 """
 
+from src.ai.cache import ResponseCache
 from src.ai.client import AIClient
 from src.ai.prompts import Prompts
 
-__all__ = ["AIClient", "Prompts"]
+__all__ = ["AIClient", "Prompts", "ResponseCache"]
@@ -0,0 +1,179 @@
+"""
+AI响应缓存
+以 (模型, 完整消息列表) 的SHA-256为键将LLM回复持久化到SQLite，可选按语义相似度命中近似问题
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Sequence
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+
+
+class ResponseCache:
+    """LLM响应缓存
+
+    精确命中：消息完全相同时直接返回缓存的回复。
+    语义命中（可选）：提供embedder时，对未精确命中的问题与同一作用域内最近的缓存条目计算余弦相似度，
+    超过阈值即视为同一问题。作用域由调用方按模型、系统提示词和对话历史等固定上下文生成（见make_scope），
+    上下文不同的条目即使问题相近也不会互相命中。embedder可使用sentence-transformers等任意文本向量化函数。
+    条目超过max_age后不再命中，并在下次写入时清除。
+    """
+
+    def __init__(
+        self,
+        path: str = ".cache/ai_responses.db",
+        embedder: Callable[[str], Sequence[float]] | None = None,
+        similarity_threshold: float = 0.95,
+        semantic_window: int = 200,
+        max_age: float = 3600,
+    ):
+        """初始化响应缓存
+
+        Args:
+            path: SQLite数据库文件路径，传入":memory:"则仅缓存在内存中
+            embedder: 文本向量化函数，为None时只做精确匹配
+            similarity_threshold: 语义命中的余弦相似度阈值
+            semantic_window: 语义匹配时比较的最近缓存条目数
+            max_age: 缓存有效期（秒），默认1小时；行情相关的回复时效性强，不宜长期复用
+        """
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+        self.semantic_window = semantic_window
+        self.max_age = max_age
+
+        with self._lock:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key BLOB PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    embedding BLOB,
+                    created_at INTEGER NOT NULL,
+                    scope BLOB
+                )
+                """
+            )
+            # 旧版缓存文件没有scope列，补上后旧条目只参与精确匹配
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(responses)")}
+            if "scope" not in columns:
+                self._conn.execute("ALTER TABLE responses ADD COLUMN scope BLOB")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_scope ON responses (scope, created_at)")
+            self._conn.commit()
+        logger.info(f"ResponseCache initialized at {path}")
+
+    @staticmethod
+    def make_key(model: str, messages: list[dict]) -> bytes:
+        """根据模型名和消息列表生成缓存键
+
+        Args:
+            model: 模型名称
+            messages: 发送给模型的完整消息列表（含系统提示词）
+
+        Returns:
+            bytes: SHA-256摘要
+        """
+        payload = model + "\n" + json.dumps(messages, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).digest()
+
+    @staticmethod
+    def make_scope(model: str, context: list[dict], tag: str = "") -> bytes:
+        """生成语义匹配的作用域
+
+        Args:
+            model: 模型名称
+            context: 语义文本之外的固定上下文消息，如系统提示词和此前的对话历史
+            tag: 附加的区分标记，如股票代码
+
+        Returns:
+            bytes: SHA-256摘要
+        """
+        return ResponseCache.make_key(model, context + [{"tag": tag}])
+
+    def get(self, key: bytes, text: str | None = None, scope: bytes | None = None) -> str | None:
+        """查询缓存
+
+        Args:
+            key: 缓存键
+            text: 用于语义匹配的文本（用户问题或动态数据部分），为None时只做精确匹配
+            scope: 语义匹配的作用域，为None时只做精确匹配
+
+        Returns:
+            缓存的回复，未命中返回None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM responses WHERE key = ? AND created_at >= ?", (key, self._min_created_at())
+            ).fetchone()
+        if row:
+            return row[0]
+        if self.embedder is not None and text and scope is not None:
+            return self._get_similar(text, scope)
+        return None
+
+    def put(self, key: bytes, value: str, text: str | None = None, scope: bytes | None = None):
+        """写入缓存
+
+        Args:
+            key: 缓存键
+            value: 模型回复
+            text: 用于语义匹配的文本
+            scope: 语义匹配的作用域，为None时该条目只参与精确匹配
+        """
+        embedding = None
+        if self.embedder is not None and text and scope is not None:
+            embedding = np.asarray(self.embedder(text), dtype=np.float32).tobytes()
+
+        now = int(time.time())
+        with self._lock:
+            # 写入时顺带清除过期条目，避免缓存文件无限增长
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.max_age,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, embedding, created_at, scope) VALUES (?, ?, ?, ?, ?)",
+                (key, value, embedding, now, scope),
+            )
+            self._conn.commit()
+
+    def _get_similar(self, text: str, scope: bytes) -> str | None:
+        """在同一作用域最近的缓存条目中查找语义最相近且超过阈值的回复"""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT value, embedding FROM responses
+                WHERE scope = ? AND embedding IS NOT NULL AND created_at >= ?
+                ORDER BY created_at DESC
+                LIMIT ?
+                """,
+                (scope, self._min_created_at(), self.semantic_window),
+            ).fetchall()
+        if not rows:
+            return None
+
+        query = np.asarray(self.embedder(text), dtype=np.float32)
+        matrix = np.stack([np.frombuffer(embedding, dtype=np.float32) for _, embedding in rows])
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        similarities = np.divide(matrix @ query, norms, out=np.zeros(len(rows), dtype=np.float32), where=norms > 0)
+
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.similarity_threshold:
+            logger.debug(f"ResponseCache semantic hit, similarity={similarities[best]:.3f}")
+            return rows[best][0]
+        return None
+
+    def _min_created_at(self) -> float:
+        """未过期条目的最早写入时间"""
+        return time.time() - self.max_age
+
+    def close(self):
+        """关闭底层数据库连接"""
+        with self._lock:
+            self._conn.close()
@@ -3,11 +3,15 @@ AI客户端
 封装OpenAI API调用，提供股票分析和对话功能
 """
 
+import asyncio
+from collections.abc import Iterator
 from datetime import datetime
 
 from loguru import logger
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
+from src.ai.cache import ResponseCache
+from src.ai.prompts import Prompts
 from src.models.schemas import AIAnalysis
 
 
@@ -17,16 +21,41 @@ class AIClient:
     封装OpenAI API调用，提供股票分析和智能对话功能
     """
 
-    def __init__(self, api_key: str, base_url: str, model: str = "gpt-4"):
+    # 批量异步分析时的最大并发请求数，避免触发服务商限流
+    MAX_CONCURRENCY = 8
+
+    # Anthropic提示词缓存要求可缓存前缀至少达到的token数
+    PROMPT_CACHE_MIN_TOKENS = 1024
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        model: str = "gpt-4",
+        cache: ResponseCache | None = None,
+    ):
         """初始化AI客户端
 
         Args:
             api_key: OpenAI API密钥
             base_url: API基础URL
             model: 模型名称，默认gpt-4
+            cache: 响应缓存，为None时每次都调用接口
         """
         self.client = OpenAI(api_key=api_key, base_url=base_url)
+        self.aclient = AsyncOpenAI(api_key=api_key, base_url=base_url)
         self.model = model
+        self.cache = cache
+        # Anthropic兼容接口需要显式标记可缓存的系统提示词
+        self._cache_system_prompt = "anthropic" in base_url
+        if self._cache_system_prompt:
+            tokens = Prompts.system_analyst_tokens()
+            if tokens is not None and tokens < self.PROMPT_CACHE_MIN_TOKENS:
+                # 缓存断点之前的内容不足阈值时，服务商会忽略cache_control标记
+                logger.info(
+                    f"System prompt has {tokens} tokens, "
+                    f"below the {self.PROMPT_CACHE_MIN_TOKENS}-token prompt cache minimum"
+                )
         logger.info(f"AIClient initialized with model={model}")
 
     def analyze_stock(self, symbol: str, fundamental: dict, technical: dict) -> AIAnalysis:
@@ -40,19 +69,76 @@ class AIClient:
         Returns:
             AIAnalysis: AI分析结果
         """
-        from src.ai.prompts import Prompts
+        prompt = Prompts.stock_analysis(symbol, fundamental, technical)
+        try:
+            content = self._create(
+                [
+                    self._system_message(),
+                    {"role": "user", "content": prompt},
+                ],
+                *self._stock_analysis_semantic(symbol, prompt),
+            ) or "分析完成但无返回内容"
+            return AIAnalysis(
+                symbol=symbol,
+                summary=content,
+                generated_at=datetime.now(),
+                confidence=80,  # 默认置信度
+            )
+        except Exception as e:
+            logger.error(f"AI分析失败: {e}")
+            return AIAnalysis(
+                symbol=symbol,
+                summary=f"分析失败: {str(e)}",
+                generated_at=datetime.now(),
+                confidence=0,
+            )
 
+    def analyze_stock_stream(self, symbol: str, fundamental: dict, technical: dict) -> Iterator[str]:
+        """综合分析股票（流式版本）
+
+        逐段返回模型输出，供界面边生成边展示；调用方拼接全部片段即为完整分析内容
+
+        Args:
+            symbol: 股票代码
+            fundamental: 基本面数据字典
+            technical: 技术面数据字典
+
+        Yields:
+            str: 模型输出的文本片段
+        """
         prompt = Prompts.stock_analysis(symbol, fundamental, technical)
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": Prompts.SYSTEM_ANALYST},
+            yield from self._create_stream(
+                [
+                    self._system_message(),
                     {"role": "user", "content": prompt},
                 ],
-                temperature=0.7,
+                *self._stock_analysis_semantic(symbol, prompt),
             )
-            content = response.choices[0].message.content or "分析完成但无返回内容"
+        except Exception as e:
+            logger.error(f"AI分析失败: {e}")
+            yield f"分析失败: {str(e)}"
+
+    async def aanalyze_stock(self, symbol: str, fundamental: dict, technical: dict) -> AIAnalysis:
+        """综合分析股票（异步版本）
+
+        Args:
+            symbol: 股票代码
+            fundamental: 基本面数据字典
+            technical: 技术面数据字典
+
+        Returns:
+            AIAnalysis: AI分析结果
+        """
+        prompt = Prompts.stock_analysis(symbol, fundamental, technical)
+        try:
+            content = await self._acreate(
+                [
+                    self._system_message(),
+                    {"role": "user", "content": prompt},
+                ],
+                *self._stock_analysis_semantic(symbol, prompt),
+            ) or "分析完成但无返回内容"
             return AIAnalysis(
                 symbol=symbol,
                 summary=content,
@@ -68,6 +154,128 @@ class AIClient:
                 confidence=0,
             )
 
+    async def analyze_stocks(self, items: list[tuple[str, dict, dict]]) -> list[AIAnalysis]:
+        """并发分析多只股票
+
+        Args:
+            items: (股票代码, 基本面数据字典, 技术面数据字典) 列表
+
+        Returns:
+            list[AIAnalysis]: 与items顺序一致的AI分析结果列表
+        """
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENCY)
+
+        async def _analyze_one(symbol: str, fundamental: dict, technical: dict) -> AIAnalysis:
+            async with semaphore:
+                return await self.aanalyze_stock(symbol, fundamental, technical)
+
+        return list(await asyncio.gather(*[_analyze_one(*item) for item in items]))
+
+    def _create(self, messages: list[dict], text: str | None = None, tag: str = "") -> str | None:
+        """调用对话补全接口，命中响应缓存时直接返回缓存内容
+
+        Args:
+            messages: 完整消息列表
+            text: 参与语义匹配的文本，为None时只做精确匹配
+            tag: 语义匹配作用域的附加标记，如请求类型和股票代码
+        """
+        key, scope, cached = self._cache_get(messages, text, tag)
+        if cached is not None:
+            return cached
+
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=0.7,
+        )
+        content = response.choices[0].message.content
+        if key is not None and content:
+            self.cache.put(key, content, text, scope)
+        return content
+
+    def _create_stream(self, messages: list[dict], text: str | None = None, tag: str = "") -> Iterator[str]:
+        """以流式方式调用对话补全接口，命中响应缓存时一次性返回缓存内容
+
+        完整接收后才写入缓存，中途断开的回复不会被缓存；参数同_create
+        """
+        key, scope, cached = self._cache_get(messages, text, tag)
+        if cached is not None:
+            yield cached
+            return
+
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=0.7,
+            stream=True,
+        )
+        parts = []
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+
+        if key is not None and parts:
+            self.cache.put(key, "".join(parts), text, scope)
+
+    async def _acreate(self, messages: list[dict], text: str | None = None, tag: str = "") -> str | None:
+        """异步调用对话补全接口，命中响应缓存时直接返回缓存内容；参数同_create"""
+        key, scope, cached = self._cache_get(messages, text, tag)
+        if cached is not None:
+            return cached
+
+        response = await self.aclient.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=0.7,
+        )
+        content = response.choices[0].message.content
+        if key is not None and content:
+            self.cache.put(key, content, text, scope)
+        return content
+
+    def _cache_get(
+        self, messages: list[dict], text: str | None, tag: str
+    ) -> tuple[bytes | None, bytes | None, str | None]:
+        """查询响应缓存
+
+        语义匹配限定在模型、系统提示词、对话历史（即最后一条消息之前的全部消息）和tag都相同的条目内
+
+        Returns:
+            (缓存键, 语义作用域, 缓存内容)：未配置缓存时键为None，未命中时内容为None
+        """
+        if self.cache is None:
+            return None, None, None
+        key = ResponseCache.make_key(self.model, messages)
+        scope = ResponseCache.make_scope(self.model, messages[:-1], tag)
+        return key, scope, self.cache.get(key, text, scope)
+
+    @staticmethod
+    def _stock_analysis_semantic(symbol: str, prompt: str) -> tuple[str, str]:
+        """股票分析请求的语义匹配参数：只比较提示词中固定指令之后的动态数据部分，并按请求类型和股票代码隔离"""
+        return prompt.removeprefix(Prompts.STOCK_ANALYSIS_INSTRUCTIONS), f"stock_analysis:{symbol}"
+
+    def _system_message(self) -> dict:
+        """构建系统提示词消息
+
+        系统提示词保持逐字不变（不注入时间戳等动态内容），以便服务商缓存请求前缀
+        """
+        if self._cache_system_prompt:
+            return {
+                "role": "system",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": Prompts.SYSTEM_ANALYST,
+                        "cache_control": {"type": "ephemeral"},
+                    }
+                ],
+            }
+        return {"role": "system", "content": Prompts.SYSTEM_ANALYST}
+
     def chat(self, messages: list[dict], user_message: str) -> str:
         """对话式问答
 
@@ -80,12 +288,7 @@ class AIClient:
         """
         all_messages = messages + [{"role": "user", "content": user_message}]
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=all_messages,
-                temperature=0.7,
-            )
-            return response.choices[0].message.content or "抱歉，我无法生成回复。"
+            return self._create(all_messages, user_message) or "抱歉，我无法生成回复。"
         except Exception as e:
             logger.error(f"AI对话失败: {e}")
             return f"抱歉，我遇到了一些问题: {str(e)}"
@@ -100,20 +303,17 @@ class AIClient:
         Returns:
             str: AI回复
         """
-        from src.ai.prompts import Prompts
-
         context = f"股票代码: {symbol}"
         prompt = Prompts.quick_question(question, context)
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": Prompts.SYSTEM_ANALYST},
+            return self._create(
+                [
+                    self._system_message(),
                     {"role": "user", "content": prompt},
                 ],
-                temperature=0.7,
-            )
-            return response.choices[0].message.content or "无法生成分析"
+                question,
+                f"quick_question:{symbol}",
+            ) or "无法生成分析"
         except Exception as e:
             logger.error(f"快速分析失败: {e}")
             return f"分析失败: {str(e)}"
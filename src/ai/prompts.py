@@ -3,6 +3,16 @@ AI提示词模板
 定义股票分析相关的提示词模板
 """
 
+from decimal import Decimal
+from functools import lru_cache
+
+from loguru import logger
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - tiktoken为可选依赖，缺失时不统计token数
+    tiktoken = None
+
 
 class Prompts:
     """提示词模板类"""
@@ -14,6 +24,17 @@ class Prompts:
 3. 给出明确的操作建议（买入/持有/卖出）及理由
 4. 使用中文回复，语言简洁专业"""
 
+    # 固定指令放在用户消息开头、动态数据放在末尾，使各次请求共享尽可能长的相同前缀以命中服务商的提示词缓存
+    STOCK_ANALYSIS_INSTRUCTIONS = """请分析文末提供的股票数据并给出投资建议。
+
+请给出：
+1. 综合评价（2-3句话）
+2. 投资建议（买入/持有/卖出）及理由
+3. 风险提示
+4. 建议关注的关键点位或指标"""
+
+    QUICK_QUESTION_INSTRUCTIONS = "请结合文末提供的背景信息回答用户的问题。"
+
     @staticmethod
     def stock_analysis(symbol: str, fundamental: dict, technical: dict) -> str:
         """生成股票分析提示词
@@ -26,23 +47,15 @@ class Prompts:
         Returns:
             str: 格式化的提示词
         """
-        fund_text = "\n".join([f"- {k}: {v}" for k, v in fundamental.items()]) if fundamental else "暂无基本面数据"
-        tech_text = "\n".join([f"- {k}: {v}" for k, v in technical.items()]) if technical else "暂无技术面数据"
-        return f"""请分析以下股票并给出投资建议：
-
-【股票代码】{symbol}
-
-【基本面数据】
-{fund_text}
-
-【技术面数据】
-{tech_text}
-
-请给出：
-1. 综合评价（2-3句话）
-2. 投资建议（买入/持有/卖出）及理由
-3. 风险提示
-4. 建议关注的关键点位或指标"""
+        # 键中带上值的类型，避免15与15.0、1与True这类相等但格式化结果不同的值共用缓存；
+        # 数值先规范化，Decimal("1.1")与Decimal("1.10")共用缓存且格式化结果相同
+        fund_items = tuple((k, type(v), _normalize_value(v)) for k, v in fundamental.items()) if fundamental else ()
+        tech_items = tuple((k, type(v), _normalize_value(v)) for k, v in technical.items()) if technical else ()
+        try:
+            return _stock_analysis_cached(symbol, fund_items, tech_items)
+        except TypeError:
+            # 字典值不可哈希（如嵌套list/dict）时跳过缓存
+            return _format_stock_analysis(symbol, fund_items, tech_items)
 
     @staticmethod
     def quick_question(question: str, context: str = "") -> str:
@@ -56,8 +69,73 @@ class Prompts:
             str: 格式化的提示词
         """
         if context:
-            return f"""基于以下背景信息：
-{context}
+            return f"""{Prompts.QUICK_QUESTION_INSTRUCTIONS}
+
+用户的问题：{question}
 
-请回答用户的问题：{question}"""
+---
+背景信息：
+{context}"""
         return question
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def system_analyst_tokens() -> int | None:
+        """统计系统提示词的token数（cl100k_base编码）
+
+        首次使用tiktoken可能需要联网下载编码表，因此不在模块导入时统计，而是首次调用时统计一次
+
+        Returns:
+            token数，tiktoken不可用或编码表加载失败时返回None
+        """
+        return _count_tokens(Prompts.SYSTEM_ANALYST)
+
+
+def _normalize_value(value):
+    """规范化数值，使缓存键和格式化结果只取决于数值本身
+
+    Decimal去掉尾部的0（1.10与1.1相同），整数值保持普通写法而不是normalize得到的科学计数法（100而非1E+2）
+    """
+    if isinstance(value, Decimal) and value.is_finite():
+        normalized = value.normalize()
+        return normalized.quantize(Decimal(1)) if normalized.as_tuple().exponent > 0 else normalized
+    return value
+
+
+def _format_stock_analysis(symbol: str, fund_items: tuple, tech_items: tuple) -> str:
+    """按 (键, 值类型, 值) 元组格式化股票分析提示词，保持字典原有的键顺序"""
+    fund_text = "\n".join([f"- {k}: {v}" for k, _, v in fund_items]) if fund_items else "暂无基本面数据"
+    tech_text = "\n".join([f"- {k}: {v}" for k, _, v in tech_items]) if tech_items else "暂无技术面数据"
+    return f"""{Prompts.STOCK_ANALYSIS_INSTRUCTIONS}
+
+---
+【股票代码】{symbol}
+
+【基本面数据】
+{fund_text}
+
+【技术面数据】
+{tech_text}"""
+
+
+# 同一会话内常对同一只股票的相同数据反复生成提示词，缓存格式化结果
+_stock_analysis_cached = lru_cache(maxsize=256)(_format_stock_analysis)
+
+
+def _count_tokens(text: str) -> int | None:
+    """使用cl100k_base编码统计文本token数
+
+    Args:
+        text: 待统计的文本
+
+    Returns:
+        token数，tiktoken不可用或编码表加载失败时返回None
+    """
+    if tiktoken is None:
+        return None
+    try:
+        return len(tiktoken.get_encoding("cl100k_base").encode(text))
+    except Exception as e:
+        # 首次使用需下载编码表，离线环境下可能失败
+        logger.debug(f"tiktoken编码表加载失败: {e}")
+        return None
@@ -0,0 +1,17 @@
+"""
+Numba JIT兼容层
+numba可用时导出真正的njit装饰器，否则退化为原样返回函数的空装饰器
+"""
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - numba随pandas-ta安装，缺失时退化为纯Python
+
+    def njit(*args, **kwargs):
+        """numba不可用时的空装饰器，兼容 @njit 与 @njit(...) 两种写法"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+__all__ = ["njit"]
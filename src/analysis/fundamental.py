@@ -3,9 +3,13 @@
 提供估值分析、盈利能力分析、成长性分析、财务健康度分析等功能
 """
 
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date
 from decimal import Decimal
+from statistics import fmean
 
+import numpy as np
 from loguru import logger
 
 from src.data.repository import Repository
@@ -18,6 +22,55 @@ from src.models.schemas import (
     ValuationResult,
 )
 
+# 比率类指标保留两位小数
+_CENT = Decimal("0.01")
+
+# 综合评分权重：估值、盈利能力、成长性、财务健康度
+_SCORE_WEIGHTS = np.array([0.25, 0.30, 0.25, 0.20])
+
+# 分档评分查找表：np.digitize(x, EDGES, right=...) 得到档位下标，再查 SCORES 得到加减分。
+# 边界包含关系与原先的 if/elif 阶梯一致，需要严格不等号的一侧用 np.nextafter 取相邻浮点数
+
+# PE：<=0 亏损 / (0,15) 低估 / [15,25) 合理 / [25,40) 略高 / >=40 高估
+_PE_EDGES = np.array([np.nextafter(0, np.inf), 15, 25, 40])
+_PE_SCORES = np.array([-20, 20, 10, 0, -10])
+# PB：<=0 不评分 / (0,1) 破净 / [1,2) 合理 / [2,5] 不评分 / >5 高估
+_PB_EDGES = np.array([np.nextafter(0, np.inf), 1, 2, np.nextafter(5, np.inf)])
+_PB_SCORES = np.array([0, 15, 5, 0, -10])
+# ROE（right=True）：<=5 / (5,10] / (10,15] / (15,20] / >20
+_ROE_EDGES = np.array([5, 10, 15, 20])
+_ROE_SCORES = np.array([-10, 0, 5, 15, 25])
+# 毛利率（right=True）：<10 / [10,20] / (20,40] / >40
+_GROSS_MARGIN_EDGES = np.array([np.nextafter(10, -np.inf), 20, 40])
+_GROSS_MARGIN_SCORES = np.array([-5, 0, 5, 10])
+# 营收/利润同比（right=True）：<-10 / [-10,0) / [0,5] / (5,15] / (15,30] / >30
+_YOY_EDGES = np.array([np.nextafter(-10, -np.inf), np.nextafter(0, -np.inf), 5, 15, 30])
+_YOY_SCORES = np.array([-15, -5, 0, 5, 10, 20])
+# 营收3年CAGR（right=True）：<=10 / (10,20] / >20
+_CAGR_EDGES = np.array([10, 20])
+_CAGR_SCORES = np.array([0, 5, 10])
+# 负债率：<30 / [30,50) / [50,70) / >=70
+_DEBT_RATIO_EDGES = np.array([30, 50, 70])
+_DEBT_RATIO_SCORES = np.array([25, 15, 0, -20])
+
+
+def _bucket_score(value, edges: np.ndarray, scores: np.ndarray, right: bool = False):
+    """按分档查找表计算加减分
+
+    value为标量时返回int；为np.ndarray时逐元素向量化计算并返回整数数组，供批量评分使用
+
+    Args:
+        value: 指标值（标量或数组）
+        edges: 单调递增的分档边界
+        scores: 各档对应的加减分，长度为len(edges) + 1
+        right: 传给np.digitize，True表示区间右闭
+
+    Returns:
+        加减分
+    """
+    deltas = scores[np.digitize(np.asarray(value, dtype=np.float64), edges, right=right)]
+    return int(deltas) if deltas.ndim == 0 else deltas
+
 
 class FundamentalAnalyzer:
     """基本面分析器
@@ -48,6 +101,47 @@ class FundamentalAnalyzer:
 
         # 获取财务数据
         financials = self.repository.get_financials(symbol, years)
+        return self._analyze_from_data(symbol, financials)
+
+    def analyze_many(self, symbols: list[str], years: int = 5) -> list[FundamentalReport]:
+        """批量执行基本面分析
+
+        在主进程中一次性取出所有股票的财务数据，再将纯计算部分分发到多个进程并行执行
+
+        Args:
+            symbols: 股票代码列表
+            years: 分析年数，默认5年
+
+        Returns:
+            list[FundamentalReport]: 与symbols顺序一致的基本面分析报告列表
+        """
+        if not symbols:
+            return []
+
+        logger.info(f"Starting batch fundamental analysis for {len(symbols)} symbols, years={years}")
+
+        financials_map = self.repository.get_financials_bulk(symbols, years)
+        financials_list = [financials_map.get(symbol, []) for symbol in symbols]
+
+        workers = min(os.cpu_count() or 1, len(symbols))
+        if workers == 1:
+            return list(map(self._analyze_from_data, symbols, financials_list))
+
+        chunksize = max(1, len(symbols) // (4 * workers))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self._analyze_from_data, symbols, financials_list, chunksize=chunksize))
+
+    @staticmethod
+    def _analyze_from_data(symbol: str, financials: list[Financial]) -> FundamentalReport:
+        """基于已获取的财务数据生成基本面分析报告
+
+        Args:
+            symbol: 股票代码
+            financials: 财务数据列表，须按报告期倒序（最新的在前），与Repository的查询结果一致
+
+        Returns:
+            FundamentalReport: 基本面分析报告
+        """
         if not financials:
             logger.warning(f"No financial data found for {symbol}")
             return FundamentalReport(
@@ -57,28 +151,25 @@ class FundamentalAnalyzer:
                 summary="无财务数据，无法进行基本面分析",
             )
 
-        # 按报告日期排序（最新的在前）
-        financials = sorted(financials, key=lambda x: x.report_date, reverse=True)
-
         # 估值分析
-        valuation = self._analyze_valuation(financials)
+        valuation = FundamentalAnalyzer._analyze_valuation(financials)
 
         # 盈利能力分析
-        profitability = self._analyze_profitability(financials)
+        profitability = FundamentalAnalyzer._analyze_profitability(financials)
 
         # 成长性分析
-        growth = self._analyze_growth(financials)
+        growth = FundamentalAnalyzer._analyze_growth(financials)
 
         # 财务健康度分析
-        financial_health = self._analyze_health(financials)
+        financial_health = FundamentalAnalyzer._analyze_health(financials)
 
         # 计算综合评分
-        overall_score = self._calculate_overall_score(
+        overall_score = FundamentalAnalyzer._calculate_overall_score(
             valuation, profitability, growth, financial_health
         )
 
         # 生成摘要
-        summary = self._generate_summary(
+        summary = FundamentalAnalyzer._generate_summary(
             valuation, profitability, growth, financial_health, overall_score
         )
 
@@ -96,7 +187,8 @@ class FundamentalAnalyzer:
         logger.info(f"Fundamental analysis completed for {symbol}, score={overall_score}")
         return report
 
-    def _analyze_valuation(self, financials: list[Financial]) -> ValuationResult:
+    @staticmethod
+    def _analyze_valuation(financials: list[Financial]) -> ValuationResult:
         """估值分析
 
         Args:
@@ -116,36 +208,15 @@ class FundamentalAnalyzer:
         # 评分计算
         score = 50
 
-        # PE估值分析
+        # PE估值分析（仅0 < PE < 15视为低估）
         is_undervalued = None
         if pe is not None:
-            if pe > 0:
-                if pe < 15:
-                    score += 20  # 低PE，可能低估
-                    is_undervalued = True
-                elif pe < 25:
-                    score += 10  # 合理PE
-                    is_undervalued = False
-                elif pe < 40:
-                    score += 0  # 略高PE
-                    is_undervalued = False
-                else:
-                    score -= 10  # 高PE，可能高估
-                    is_undervalued = False
-            else:
-                # PE为负，亏损公司
-                score -= 20
-                is_undervalued = False
+            score += _bucket_score(pe, _PE_EDGES, _PE_SCORES)
+            is_undervalued = 0 < pe < 15
 
         # PB估值分析
         if pb is not None:
-            if pb > 0:
-                if pb < 1:
-                    score += 15  # 低于净资产
-                elif pb < 2:
-                    score += 5  # 合理PB
-                elif pb > 5:
-                    score -= 10  # 高PB
+            score += _bucket_score(pb, _PB_EDGES, _PB_SCORES)
 
         return ValuationResult(
             pe=pe,
@@ -154,7 +225,8 @@ class FundamentalAnalyzer:
             score=max(0, min(100, score)),
         )
 
-    def _analyze_profitability(self, financials: list[Financial]) -> ProfitabilityResult:
+    @staticmethod
+    def _analyze_profitability(financials: list[Financial]) -> ProfitabilityResult:
         """盈利能力分析
 
         Args:
@@ -171,16 +243,16 @@ class FundamentalAnalyzer:
         gross_margin = latest.gross_margin
 
         # 计算3年平均ROE
-        roe_values = [float(f.roe) for f in financials[:12] if f.roe is not None]  # 最近12个季度（约3年）
+        roe_values = [f.roe for f in financials[:12] if f.roe is not None]  # 最近12个季度（约3年）
         roe_avg_3y = None
         if roe_values:
-            roe_avg_3y = Decimal(str(sum(roe_values) / len(roe_values)))
+            roe_avg_3y = Decimal.from_float(fmean(roe_values)).quantize(_CENT)
 
         # 判断ROE趋势
         roe_trend = "稳定"
         if len(roe_values) >= 3:
-            recent_avg = sum(roe_values[:3]) / 3
-            older_avg = sum(roe_values[3:6]) / len(roe_values[3:6]) if len(roe_values) >= 6 else recent_avg
+            recent_avg = fmean(roe_values[:3])
+            older_avg = fmean(roe_values[3:6]) if len(roe_values) >= 6 else recent_avg
 
             if recent_avg > older_avg * 1.1:
                 roe_trend = "上升"
@@ -192,16 +264,7 @@ class FundamentalAnalyzer:
 
         # ROE评分
         if roe_current is not None:
-            if roe_current > 20:
-                score += 25
-            elif roe_current > 15:
-                score += 15
-            elif roe_current > 10:
-                score += 5
-            elif roe_current > 5:
-                score += 0
-            else:
-                score -= 10
+            score += _bucket_score(roe_current, _ROE_EDGES, _ROE_SCORES, right=True)
 
         # ROE趋势评分
         if roe_trend == "上升":
@@ -211,12 +274,7 @@ class FundamentalAnalyzer:
 
         # 毛利率评分
         if gross_margin is not None:
-            if gross_margin > 40:
-                score += 10
-            elif gross_margin > 20:
-                score += 5
-            elif gross_margin < 10:
-                score -= 5
+            score += _bucket_score(gross_margin, _GROSS_MARGIN_EDGES, _GROSS_MARGIN_SCORES, right=True)
 
         return ProfitabilityResult(
             roe_current=roe_current,
@@ -226,7 +284,8 @@ class FundamentalAnalyzer:
             score=max(0, min(100, score)),
         )
 
-    def _analyze_growth(self, financials: list[Financial]) -> GrowthResult:
+    @staticmethod
+    def _analyze_growth(financials: list[Financial]) -> GrowthResult:
         """成长性分析
 
         Args:
@@ -264,7 +323,7 @@ class FundamentalAnalyzer:
             ):
                 years = (latest.report_date - oldest.report_date).days / 365
                 if years > 0:
-                    cagr = (float(latest.revenue) / float(oldest.revenue)) ** (1 / years) - 1
+                    cagr = (latest.revenue / oldest.revenue) ** (1 / years) - 1
                     revenue_cagr_3y = Decimal(str(cagr * 100))
 
         # 评分计算
@@ -272,36 +331,15 @@ class FundamentalAnalyzer:
 
         # 营收增长评分
         if revenue_yoy is not None:
-            if revenue_yoy > 30:
-                score += 20
-            elif revenue_yoy > 15:
-                score += 10
-            elif revenue_yoy > 5:
-                score += 5
-            elif revenue_yoy < -10:
-                score -= 15
-            elif revenue_yoy < 0:
-                score -= 5
+            score += _bucket_score(revenue_yoy, _YOY_EDGES, _YOY_SCORES, right=True)
 
         # 利润增长评分
         if profit_yoy is not None:
-            if profit_yoy > 30:
-                score += 20
-            elif profit_yoy > 15:
-                score += 10
-            elif profit_yoy > 5:
-                score += 5
-            elif profit_yoy < -10:
-                score -= 15
-            elif profit_yoy < 0:
-                score -= 5
+            score += _bucket_score(profit_yoy, _YOY_EDGES, _YOY_SCORES, right=True)
 
         # CAGR评分
         if revenue_cagr_3y is not None:
-            if revenue_cagr_3y > 20:
-                score += 10
-            elif revenue_cagr_3y > 10:
-                score += 5
+            score += _bucket_score(revenue_cagr_3y, _CAGR_EDGES, _CAGR_SCORES, right=True)
 
         return GrowthResult(
             revenue_yoy=revenue_yoy,
@@ -310,7 +348,8 @@ class FundamentalAnalyzer:
             score=max(0, min(100, score)),
         )
 
-    def _analyze_health(self, financials: list[Financial]) -> HealthResult:
+    @staticmethod
+    def _analyze_health(financials: list[Financial]) -> HealthResult:
         """财务健康度分析
 
         Args:
@@ -328,10 +367,10 @@ class FundamentalAnalyzer:
         # 判断负债率趋势
         debt_trend = "稳定"
         if len(financials) >= 4:
-            recent_ratios = [float(f.debt_ratio) for f in financials[:4] if f.debt_ratio is not None]
+            recent_ratios = [f.debt_ratio for f in financials[:4] if f.debt_ratio is not None]
             if len(recent_ratios) >= 4:
-                recent_avg = sum(recent_ratios[:2]) / 2
-                older_avg = sum(recent_ratios[2:4]) / 2
+                recent_avg = fmean(recent_ratios[:2])
+                older_avg = fmean(recent_ratios[2:4])
 
                 if recent_avg > older_avg * 1.1:
                     debt_trend = "上升"  # 负债增加，不好
@@ -343,14 +382,7 @@ class FundamentalAnalyzer:
 
         # 负债率评分
         if debt_ratio is not None:
-            if debt_ratio < 30:
-                score += 25  # 低负债
-            elif debt_ratio < 50:
-                score += 15  # 适中负债
-            elif debt_ratio < 70:
-                score += 0  # 较高负债
-            else:
-                score -= 20  # 高负债
+            score += _bucket_score(debt_ratio, _DEBT_RATIO_EDGES, _DEBT_RATIO_SCORES)
 
         # 负债趋势评分
         if debt_trend == "下降":
@@ -364,8 +396,8 @@ class FundamentalAnalyzer:
             score=max(0, min(100, score)),
         )
 
+    @staticmethod
     def _calculate_overall_score(
-        self,
         valuation: ValuationResult,
         profitability: ProfitabilityResult,
         growth: GrowthResult,
@@ -382,25 +414,11 @@ class FundamentalAnalyzer:
         Returns:
             int: 综合评分（0-100）
         """
-        # 权重分配
-        weights = {
-            "valuation": 0.25,
-            "profitability": 0.30,
-            "growth": 0.25,
-            "health": 0.20,
-        }
-
-        weighted_score = (
-            valuation.score * weights["valuation"]
-            + profitability.score * weights["profitability"]
-            + growth.score * weights["growth"]
-            + health.score * weights["health"]
-        )
-
-        return int(round(weighted_score))
+        scores = np.array([valuation.score, profitability.score, growth.score, health.score], dtype=np.float64)
+        return int(round(float(_SCORE_WEIGHTS @ scores)))
 
+    @staticmethod
     def _generate_summary(
-        self,
         valuation: ValuationResult,
         profitability: ProfitabilityResult,
         growth: GrowthResult,
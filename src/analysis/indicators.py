@@ -3,18 +3,45 @@
 提供MACD、RSI、KDJ、MA等常用技术指标的计算函数
 """
 
+from collections.abc import Mapping
 from decimal import Decimal
 
+import numpy as np
 import pandas as pd
 
+from src.analysis._njit import njit
 from src.models.schemas import KDJResult, MACDResult
 
 
-def calc_macd(df: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9) -> MACDResult:
+def _to_decimal(value: float) -> Decimal:
+    """将numpy/Python浮点数转换为Decimal
+
+    先转为Python float再取最短往返表示，避免numpy标量较慢的字符串格式化
+    """
+    return Decimal(repr(float(value)))
+
+
+def _as_f64(data: pd.DataFrame | Mapping[str, np.ndarray] | np.ndarray, col: str) -> np.ndarray:
+    """取出指定列的连续float64一维数组
+
+    已是连续float64的数据直接返回视图不做拷贝，其余（如步长切片、二维数组的某一列）转换为连续数组，
+    保证njit内核按顺序访存；传入np.ndarray时视为该列本身
+
+    Args:
+        data: 行情DataFrame、列名到数组的映射，或单列数组
+        col: 列名
+
+    Returns:
+        np.ndarray: C连续的float64数组
+    """
+    return np.ascontiguousarray(data if isinstance(data, np.ndarray) else data[col], dtype=np.float64)
+
+
+def calc_macd(df: pd.DataFrame | np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> MACDResult:
     """计算MACD指标
 
     Args:
-        df: 包含行情数据的DataFrame，必须有close列
+        df: 包含行情数据的DataFrame（必须有close列），或收盘价数组
         fast: 快线周期，默认12
         slow: 慢线周期，默认26
         signal: 信号线周期，默认9
@@ -22,50 +49,204 @@ def calc_macd(df: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9)
     Returns:
         MACDResult: 包含DIF、DEA、MACD柱值的结果
     """
-    closes = df["close"]
-    ema_fast = closes.ewm(span=fast, adjust=False).mean()
-    ema_slow = closes.ewm(span=slow, adjust=False).mean()
-    dif = ema_fast - ema_slow
-    dea = dif.ewm(span=signal, adjust=False).mean()
-    macd = (dif - dea) * 2
+    closes = _as_f64(df, "close")
+    dif, dea, macd = _macd_last(closes, fast, slow, signal)
 
     return MACDResult(
-        dif=Decimal(str(dif.iloc[-1])),
-        dea=Decimal(str(dea.iloc[-1])),
-        macd=Decimal(str(macd.iloc[-1])),
+        dif=_to_decimal(dif),
+        dea=_to_decimal(dea),
+        macd=_to_decimal(macd),
     )
 
 
-def calc_rsi(df: pd.DataFrame, period: int = 14) -> Decimal:
+@njit(cache=True)
+def _macd_last(closes, fast, slow, signal):
+    """MACD融合循环：单次遍历同时推进快慢线与信号线EMA，返回最新的(DIF, DEA, MACD)
+
+    递推口径与 pandas ewm(span=..., adjust=False) 一致，首值作为EMA初值
+    """
+    alpha_fast = 2.0 / (fast + 1)
+    alpha_slow = 2.0 / (slow + 1)
+    alpha_signal = 2.0 / (signal + 1)
+
+    ema_fast = closes[0]
+    ema_slow = closes[0]
+    dif = 0.0
+    dea = 0.0
+    for i in range(1, closes.shape[0]):
+        ema_fast += alpha_fast * (closes[i] - ema_fast)
+        ema_slow += alpha_slow * (closes[i] - ema_slow)
+        dif = ema_fast - ema_slow
+        dea += alpha_signal * (dif - dea)
+
+    return dif, dea, (dif - dea) * 2
+
+
+def calc_macd_tail(
+    df: pd.DataFrame | np.ndarray, n: int = 2, fast: int = 12, slow: int = 26, signal: int = 9
+) -> list[MACDResult]:
+    """计算最近n个交易日的MACD指标
+
+    单次遍历收盘价同时记录末尾n天的结果，判断金叉/死叉时无需对去掉最后一天的切片重新计算
+
+    Args:
+        df: 包含行情数据的DataFrame（必须有close列），或收盘价数组
+        n: 返回的天数，默认2
+        fast: 快线周期，默认12
+        slow: 慢线周期，默认26
+        signal: 信号线周期，默认9
+
+    Returns:
+        list[MACDResult]: 按日期升序排列的MACD结果，数据不足n天时只返回已有天数
+    """
+    closes = _as_f64(df, "close")
+    difs, deas = _macd_tail(closes, fast, slow, signal, min(n, closes.shape[0]))
+
+    return [
+        MACDResult(dif=_to_decimal(dif), dea=_to_decimal(dea), macd=_to_decimal((dif - dea) * 2))
+        for dif, dea in zip(difs.tolist(), deas.tolist())
+    ]
+
+
+@njit(cache=True)
+def _macd_tail(closes, fast, slow, signal, n):
+    """MACD融合循环的多日版本：递推口径同_macd_last，返回末尾n天的(DIF数组, DEA数组)"""
+    alpha_fast = 2.0 / (fast + 1)
+    alpha_slow = 2.0 / (slow + 1)
+    alpha_signal = 2.0 / (signal + 1)
+
+    size = closes.shape[0]
+    difs = np.zeros(n)
+    deas = np.zeros(n)
+    if size == 0:
+        return difs, deas
+
+    ema_fast = closes[0]
+    ema_slow = closes[0]
+    dif = 0.0
+    dea = 0.0
+    start = size - n
+    for i in range(size):
+        if i > 0:
+            ema_fast += alpha_fast * (closes[i] - ema_fast)
+            ema_slow += alpha_slow * (closes[i] - ema_slow)
+            dif = ema_fast - ema_slow
+            dea += alpha_signal * (dif - dea)
+        if i >= start:
+            difs[i - start] = dif
+            deas[i - start] = dea
+
+    return difs, deas
+
+
+def calc_macd_batch(
+    closes: np.ndarray, n: int = 2, fast: int = 12, slow: int = 26, signal: int = 9
+) -> tuple[np.ndarray, np.ndarray]:
+    """批量计算多只股票最近n个交易日的MACD指标
+
+    每行的有效数据交给_macd_tail在同一个njit内核中逐行递推，结果与逐只调用calc_macd_tail一致
+
+    Args:
+        closes: (股票数, 天数)的收盘价矩阵，每行按日期升序右对齐，数据较少的行在左侧以NaN填充
+        n: 返回的天数，默认2
+        fast: 快线周期，默认12
+        slow: 慢线周期，默认26
+        signal: 信号线周期，默认9
+
+    Returns:
+        (DIF, DEA): 形状均为(股票数, n)的float64矩阵，列按日期升序
+    """
+    closes = np.ascontiguousarray(closes, dtype=np.float64)
+    # 每行首个有效收盘价所在列，EMA从该列开始递推
+    start = np.isnan(closes).argmin(axis=1)
+    return _macd_tail_rows(closes, start, fast, slow, signal, min(n, closes.shape[1]))
+
+
+@njit(cache=True)
+def _macd_tail_rows(closes, start, fast, slow, signal, n):
+    """对矩阵每行从start列起的有效数据执行_macd_tail，有效数据不足n天的行左侧补0"""
+    rows = closes.shape[0]
+    difs = np.zeros((rows, n))
+    deas = np.zeros((rows, n))
+    for r in range(rows):
+        row = closes[r, start[r]:]
+        m = min(n, row.shape[0])
+        dif, dea = _macd_tail(row, fast, slow, signal, m)
+        difs[r, n - m:] = dif
+        deas[r, n - m:] = dea
+    return difs, deas
+
+
+def calc_rsi(df: pd.DataFrame | np.ndarray, period: int = 14) -> Decimal:
     """计算RSI指标
 
     Args:
-        df: 包含行情数据的DataFrame，必须有close列
+        df: 包含行情数据的DataFrame（必须有close列），或收盘价数组
         period: RSI周期，默认14
 
     Returns:
         Decimal: RSI值（0-100）
     """
-    closes = df["close"]
-    delta = closes.diff()
+    closes = _as_f64(df, "close")
+    return _to_decimal(_rsi_loop(closes, period))
 
-    gain = delta.where(delta > 0, 0)
-    loss = (-delta.where(delta < 0, 0)).abs()
 
-    avg_gain = gain.rolling(window=period, min_periods=period).mean()
-    avg_loss = loss.rolling(window=period, min_periods=period).mean()
+@njit(cache=True)
+def _rsi_loop(closes, period):
+    """RSI核心循环：只遍历最后period个涨跌幅，返回最新RSI值
 
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
+    与滚动均值口径一致：窗口内首个缺失的涨跌幅按0计入，数据不足period时返回NaN
+    """
+    n = closes.shape[0]
+    if n < period:
+        return np.nan
+
+    gain = 0.0
+    loss = 0.0
+    for i in range(max(1, n - period), n):
+        delta = closes[i] - closes[i - 1]
+        if delta > 0:
+            gain += delta
+        else:
+            loss -= delta
+
+    if loss == 0.0:
+        return 100.0 if gain > 0.0 else np.nan
+    return 100.0 - 100.0 / (1.0 + gain / loss)
+
+
+def calc_rsi_batch(closes: np.ndarray, period: int = 14) -> np.ndarray:
+    """批量计算多只股票的最新RSI
+
+    每行的有效数据交给_rsi_loop在同一个njit内核中逐行计算，结果与逐只调用calc_rsi一致
+
+    Args:
+        closes: (股票数, 天数)的收盘价矩阵，每行按日期升序右对齐，数据较少的行在左侧以NaN填充
+        period: RSI周期，默认14
+
+    Returns:
+        np.ndarray: 各行的RSI值（0-100），数据不足period的行为NaN
+    """
+    closes = np.ascontiguousarray(closes, dtype=np.float64)
+    start = np.isnan(closes).argmin(axis=1)
+    return _rsi_rows(closes, start, period)
 
-    return Decimal(str(rsi.iloc[-1]))
 
+@njit(cache=True)
+def _rsi_rows(closes, start, period):
+    """对矩阵每行从start列起的有效数据执行_rsi_loop"""
+    rows = closes.shape[0]
+    rsi = np.empty(rows)
+    for r in range(rows):
+        rsi[r] = _rsi_loop(closes[r, start[r]:], period)
+    return rsi
 
-def calc_kdj(df: pd.DataFrame, n: int = 9, m1: int = 3, m2: int = 3) -> KDJResult:
+
+def calc_kdj(df: pd.DataFrame | Mapping[str, np.ndarray], n: int = 9, m1: int = 3, m2: int = 3) -> KDJResult:
     """计算KDJ指标
 
     Args:
-        df: 包含行情数据的DataFrame，必须有high、low、close列
+        df: 包含行情数据的DataFrame或列名到数组的映射，必须有high、low、close列
         n: RSV周期，默认9
         m1: K值平滑周期，默认3
         m2: D值平滑周期，默认3
@@ -73,28 +254,77 @@ def calc_kdj(df: pd.DataFrame, n: int = 9, m1: int = 3, m2: int = 3) -> KDJResul
     Returns:
         KDJResult: 包含K、D、J值的结果
     """
-    low_min = df["low"].rolling(window=n, min_periods=n).min()
-    high_max = df["high"].rolling(window=n, min_periods=n).max()
-
-    rsv = (df["close"] - low_min) / (high_max - low_min) * 100
-    rsv = rsv.fillna(50)
-
-    k = rsv.ewm(span=m1, adjust=False).mean()
-    d = k.ewm(span=m2, adjust=False).mean()
-    j = 3 * k - 2 * d
+    k, d, j = _kdj_last(
+        _as_f64(df, "high"),
+        _as_f64(df, "low"),
+        _as_f64(df, "close"),
+        n,
+        m1,
+        m2,
+    )
 
     return KDJResult(
-        k=Decimal(str(k.iloc[-1])),
-        d=Decimal(str(d.iloc[-1])),
-        j=Decimal(str(j.iloc[-1])),
+        k=_to_decimal(k),
+        d=_to_decimal(d),
+        j=_to_decimal(j),
     )
 
 
-def calc_ma(df: pd.DataFrame, periods: list[int] = None) -> dict[int, Decimal]:
+@njit(cache=True)
+def _kdj_last(high, low, close, n, m1, m2):
+    """KDJ单次遍历：单调队列维护n日最高/最低价，同时递推K、D平滑值，返回最新的(K, D, J)
+
+    队列用长度为n的环形数组保存下标；窗口未满或最高价等于最低价时RSV取50
+    """
+    alpha_k = 2.0 / (m1 + 1)
+    alpha_d = 2.0 / (m2 + 1)
+
+    max_queue = np.empty(n, dtype=np.int64)
+    min_queue = np.empty(n, dtype=np.int64)
+    max_head = max_tail = 0
+    min_head = min_tail = 0
+
+    k = 50.0
+    d = 50.0
+    for i in range(close.shape[0]):
+        # 先淘汰滑出窗口的队首，保证入队前队列不超过n-1个元素
+        if max_tail > max_head and max_queue[max_head % n] <= i - n:
+            max_head += 1
+        if min_tail > min_head and min_queue[min_head % n] <= i - n:
+            min_head += 1
+
+        while max_tail > max_head and high[max_queue[(max_tail - 1) % n]] <= high[i]:
+            max_tail -= 1
+        max_queue[max_tail % n] = i
+        max_tail += 1
+
+        while min_tail > min_head and low[min_queue[(min_tail - 1) % n]] >= low[i]:
+            min_tail -= 1
+        min_queue[min_tail % n] = i
+        min_tail += 1
+
+        rsv = 50.0
+        if i >= n - 1:
+            low_min = low[min_queue[min_head % n]]
+            price_range = high[max_queue[max_head % n]] - low_min
+            if price_range != 0.0:
+                rsv = (close[i] - low_min) / price_range * 100
+
+        if i == 0:
+            k = rsv
+            d = rsv
+        else:
+            k += alpha_k * (rsv - k)
+            d += alpha_d * (k - d)
+
+    return k, d, 3 * k - 2 * d
+
+
+def calc_ma(df: pd.DataFrame | np.ndarray, periods: list[int] = None) -> dict[int, Decimal]:
     """计算均线
 
     Args:
-        df: 包含行情数据的DataFrame，必须有close列
+        df: 包含行情数据的DataFrame（必须有close列），或收盘价数组
         periods: 均线周期列表，默认[5, 10, 20, 60]
 
     Returns:
@@ -103,59 +333,227 @@ def calc_ma(df: pd.DataFrame, periods: list[int] = None) -> dict[int, Decimal]:
     if periods is None:
         periods = [5, 10, 20, 60]
 
+    closes = _as_f64(df, "close")
+    size = closes.shape[0]
+
+    # 只需要最新一期均线，直接对尾部窗口求均值
     result = {}
     for period in periods:
-        if len(df) >= period:
-            ma = df["close"].rolling(window=period).mean().iloc[-1]
-            result[period] = Decimal(str(ma))
+        if size >= period:
+            result[period] = _to_decimal(closes[-period:].mean())
     return result
 
 
 def calc_bollinger_bands(
-    df: pd.DataFrame, period: int = 20, std_dev: float = 2.0
+    df: pd.DataFrame | np.ndarray, period: int = 20, std_dev: float = 2.0
 ) -> dict[str, Decimal]:
     """计算布林带
 
     Args:
-        df: 包含行情数据的DataFrame，必须有close列
+        df: 包含行情数据的DataFrame（必须有close列），或收盘价数组
         period: 周期，默认20
         std_dev: 标准差倍数，默认2.0
 
     Returns:
         dict[str, Decimal]: 包含upper、middle、lower的字典
     """
-    closes = df["close"]
-    middle = closes.rolling(window=period).mean()
-    std = closes.rolling(window=period).std()
+    closes = _as_f64(df, "close")
+
+    # 数据不足一个周期时与滚动窗口一致返回NaN
+    if closes.shape[0] < period:
+        middle = std = np.nan
+    else:
+        tail = closes[-period:]
+        middle = tail.mean()
+        std = tail.std(ddof=1)
     upper = middle + std * std_dev
     lower = middle - std * std_dev
 
     return {
-        "upper": Decimal(str(upper.iloc[-1])),
-        "middle": Decimal(str(middle.iloc[-1])),
-        "lower": Decimal(str(lower.iloc[-1])),
+        "upper": _to_decimal(upper),
+        "middle": _to_decimal(middle),
+        "lower": _to_decimal(lower),
     }
 
 
-def calc_atr(df: pd.DataFrame, period: int = 14) -> Decimal:
+def calc_atr(df: pd.DataFrame | Mapping[str, np.ndarray], period: int = 14) -> Decimal:
     """计算ATR（平均真实波幅）
 
     Args:
-        df: 包含行情数据的DataFrame，必须有high、low、close列
+        df: 包含行情数据的DataFrame或列名到数组的映射，必须有high、low、close列
         period: 周期，默认14
 
     Returns:
         Decimal: ATR值
     """
-    high = df["high"]
-    low = df["low"]
-    close = df["close"]
+    atr = _atr_last(
+        _as_f64(df, "high"),
+        _as_f64(df, "low"),
+        _as_f64(df, "close"),
+        period,
+    )
+    return _to_decimal(atr)
+
 
-    tr1 = high - low
-    tr2 = (high - close.shift(1)).abs()
-    tr3 = (low - close.shift(1)).abs()
+@njit(cache=True)
+def _atr_last(high, low, close, period):
+    """ATR核心循环：逐根计算最后period根K线的真实波幅并求均值
+
+    首根K线没有前收盘价，真实波幅取最高价减最低价；数据不足period时返回NaN
+    """
+    n = close.shape[0]
+    if n < period:
+        return np.nan
+
+    total = 0.0
+    for i in range(n - period, n):
+        tr = high[i] - low[i]
+        if i > 0:
+            tr = max(tr, abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+        total += tr
+    return total / period
+
+
+def calc_all_indicators(
+    df: pd.DataFrame | Mapping[str, np.ndarray],
+    ma_periods: list[int] = None,
+    fast: int = 12,
+    slow: int = 26,
+    signal: int = 9,
+    n: int = 9,
+    m1: int = 3,
+    m2: int = 3,
+    rsi_period: int = 14,
+) -> dict:
+    """单次遍历同时计算均线、MACD、KDJ、RSI
+
+    口径与calc_ma、calc_macd、calc_kdj、calc_rsi分别计算的结果一致，但收盘价序列只读取一次
 
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-    atr = tr.rolling(window=period, min_periods=period).mean()
+    Args:
+        df: 包含行情数据的DataFrame或列名到数组的映射，必须有high、low、close列
+        ma_periods: 均线周期列表，默认[5, 10, 20, 60]
+        fast: MACD快线周期，默认12
+        slow: MACD慢线周期，默认26
+        signal: MACD信号线周期，默认9
+        n: KDJ的RSV周期，默认9
+        m1: KDJ的K值平滑周期，默认3
+        m2: KDJ的D值平滑周期，默认3
+        rsi_period: RSI周期，默认14
+
+    Returns:
+        dict: 包含ma（周期到均线值的映射，数据不足的周期不出现）、macd、kdj、rsi的字典
+    """
+    if ma_periods is None:
+        ma_periods = [5, 10, 20, 60]
 
-    return Decimal(str(atr.iloc[-1]))
+    closes = _as_f64(df, "close")
+    periods = np.asarray(ma_periods, dtype=np.int64)
+    ma_sums, dif, dea, macd, k, d, j, rsi = _indicators_pass(
+        _as_f64(df, "high"), _as_f64(df, "low"), closes, periods, fast, slow, signal, n, m1, m2, rsi_period
+    )
+
+    size = closes.shape[0]
+    return {
+        "ma": {
+            period: _to_decimal(ma_sum / period)
+            for period, ma_sum in zip(ma_periods, ma_sums.tolist())
+            if size >= period
+        },
+        "macd": MACDResult(dif=_to_decimal(dif), dea=_to_decimal(dea), macd=_to_decimal(macd)),
+        "kdj": KDJResult(k=_to_decimal(k), d=_to_decimal(d), j=_to_decimal(j)),
+        "rsi": _to_decimal(rsi),
+    }
+
+
+@njit(cache=True)
+def _indicators_pass(high, low, close, ma_periods, fast, slow, signal, n, m1, m2, rsi_period):
+    """融合循环：一次遍历同步推进均线窗口和、MACD、KDJ、RSI的累加器
+
+    各指标的递推方式与_macd_last、_kdj_last、_rsi_loop逐项相同
+    """
+    size = close.shape[0]
+
+    ma_sums = np.zeros(ma_periods.shape[0])
+
+    alpha_fast = 2.0 / (fast + 1)
+    alpha_slow = 2.0 / (slow + 1)
+    alpha_signal = 2.0 / (signal + 1)
+    ema_fast = close[0]
+    ema_slow = close[0]
+    dif = 0.0
+    dea = 0.0
+
+    alpha_k = 2.0 / (m1 + 1)
+    alpha_d = 2.0 / (m2 + 1)
+    max_queue = np.empty(n, dtype=np.int64)
+    min_queue = np.empty(n, dtype=np.int64)
+    max_head = max_tail = 0
+    min_head = min_tail = 0
+    k = 50.0
+    d = 50.0
+
+    rsi_start = max(1, size - rsi_period)
+    gain = 0.0
+    loss = 0.0
+
+    for i in range(size):
+        price = close[i]
+
+        # 均线：只累加各周期尾部窗口内的收盘价
+        for p in range(ma_periods.shape[0]):
+            if i >= size - ma_periods[p]:
+                ma_sums[p] += price
+
+        if i > 0:
+            # MACD
+            ema_fast += alpha_fast * (price - ema_fast)
+            ema_slow += alpha_slow * (price - ema_slow)
+            dif = ema_fast - ema_slow
+            dea += alpha_signal * (dif - dea)
+
+            # RSI：只统计最后rsi_period个涨跌幅
+            if i >= rsi_start:
+                delta = price - close[i - 1]
+                if delta > 0:
+                    gain += delta
+                else:
+                    loss -= delta
+
+        # KDJ：单调队列维护n日最高/最低价
+        if max_tail > max_head and max_queue[max_head % n] <= i - n:
+            max_head += 1
+        if min_tail > min_head and min_queue[min_head % n] <= i - n:
+            min_head += 1
+
+        while max_tail > max_head and high[max_queue[(max_tail - 1) % n]] <= high[i]:
+            max_tail -= 1
+        max_queue[max_tail % n] = i
+        max_tail += 1
+
+        while min_tail > min_head and low[min_queue[(min_tail - 1) % n]] >= low[i]:
+            min_tail -= 1
+        min_queue[min_tail % n] = i
+        min_tail += 1
+
+        rsv = 50.0
+        if i >= n - 1:
+            low_min = low[min_queue[min_head % n]]
+            price_range = high[max_queue[max_head % n]] - low_min
+            if price_range != 0.0:
+                rsv = (price - low_min) / price_range * 100
+
+        if i == 0:
+            k = rsv
+            d = rsv
+        else:
+            k += alpha_k * (rsv - k)
+            d += alpha_d * (k - d)
+
+    if size < rsi_period:
+        rsi = np.nan
+    elif loss == 0.0:
+        rsi = 100.0 if gain > 0.0 else np.nan
+    else:
+        rsi = 100.0 - 100.0 / (1.0 + gain / loss)
+
+    return ma_sums, dif, dea, (dif - dea) * 2, k, d, 3 * k - 2 * d, rsi
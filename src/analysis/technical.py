@@ -3,22 +3,85 @@
 提供趋势分析、支撑压力位识别、K线形态检测等功能
 """
 
+import heapq
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from decimal import Decimal
 
-import pandas as pd
+import numpy as np
 from loguru import logger
 
-from src.analysis.indicators import calc_kdj, calc_ma, calc_macd, calc_rsi
+from src.analysis._njit import njit
+from src.analysis.indicators import calc_all_indicators
 from src.data.repository import Repository
 from src.models.schemas import (
-    DailyQuote,
     Indicators,
     SupportResistance,
     TechnicalReport,
     TrendResult,
 )
 
+# K线形态名称，第i个形态对应_pattern_bits返回值的第i位
+_PATTERN_NAMES = ("大阳线", "大阴线", "十字星", "锤子线", "倒锤线", "流星线")
+
+
+@njit(cache=True)
+def _pattern_bits(opens, highs, lows, closes):
+    """K线形态判断核心循环：返回所有K线命中形态的位掩码，位序见_PATTERN_NAMES
+
+    振幅为0的K线不参与判断
+    """
+    mask = 0
+    for i in range(closes.shape[0]):
+        open_price = opens[i]
+        close_price = closes[i]
+        total_range = highs[i] - lows[i]
+        if total_range == 0:
+            continue
+
+        # 计算实体和影线
+        body = abs(close_price - open_price)
+        upper_shadow = highs[i] - max(open_price, close_price)
+        lower_shadow = min(open_price, close_price) - lows[i]
+        body_ratio = body / total_range
+        rising = close_price > open_price
+        falling = close_price < open_price
+        long_upper = upper_shadow > body * 2 and lower_shadow < body * 0.5
+
+        # 大阳线：实体占比>70%，收盘接近最高
+        if rising and body_ratio > 0.7:
+            mask |= 1 << 0
+        # 大阴线：实体占比>70%，收盘接近最低
+        if falling and body_ratio > 0.7:
+            mask |= 1 << 1
+        # 十字星：实体很小，上下影线较长
+        if body_ratio < 0.1 and upper_shadow > body and lower_shadow > body:
+            mask |= 1 << 2
+        # 锤子线：下影线长，实体小，上影线短
+        if lower_shadow > body * 2 and upper_shadow < body * 0.5 and rising:
+            mask |= 1 << 3
+        # 倒锤线：上影线长，实体小，下影线短
+        if long_upper and rising:
+            mask |= 1 << 4
+        # 流星线：上影线长，实体小，出现在上涨趋势中
+        if long_upper and falling:
+            mask |= 1 << 5
+    return mask
+
+
+# (趋势强度分档, 短期趋势, 中期趋势) -> 趋势方向，未列出的组合为横盘整理
+# 分档：2为>0.65，1为(0.55, 0.65]，0为[0.45, 0.55]，-1为[0.35, 0.45)，-2为<0.35
+_TREND_DIRECTIONS = {
+    (2, "上涨", "上涨"): "强势上涨",
+    (2, "上涨", "下跌"): "震荡偏强",
+    (1, "上涨", "上涨"): "震荡偏强",
+    (1, "上涨", "下跌"): "震荡偏强",
+    (-1, "下跌", "上涨"): "震荡偏弱",
+    (-1, "下跌", "下跌"): "震荡偏弱",
+    (-2, "下跌", "上涨"): "震荡偏弱",
+    (-2, "下跌", "下跌"): "弱势下跌",
+}
+
 
 class TechnicalAnalyzer:
     """技术面分析器
@@ -26,6 +89,9 @@ class TechnicalAnalyzer:
     对股票进行技术分析，包括趋势判断、指标计算、支撑压力位识别、K线形态检测等
     """
 
+    # 批量分析时的最大线程数
+    MAX_WORKERS = 8
+
     def __init__(self, repository: Repository):
         """初始化技术分析器
 
@@ -47,10 +113,10 @@ class TechnicalAnalyzer:
         """
         logger.info(f"Starting technical analysis for {symbol}, days={days}")
 
-        # 获取行情数据
-        quotes = self.repository.get_quotes(symbol, days)
-        if not quotes or len(quotes) < 20:
-            logger.warning(f"Insufficient data for {symbol}: {len(quotes) if quotes else 0} quotes")
+        # 获取行情数据（float64列，按交易日期升序）
+        df = self.repository.get_quotes_df(symbol, days)
+        if len(df) < 20:
+            logger.warning(f"Insufficient data for {symbol}: {len(df)} quotes")
             return TechnicalReport(
                 symbol=symbol,
                 analysis_date=date.today(),
@@ -58,20 +124,20 @@ class TechnicalAnalyzer:
                 summary="数据不足，无法进行技术分析",
             )
 
-        # 转换为DataFrame
-        df = self._quotes_to_dataframe(quotes)
+        # 各价格列只转换一次为连续的float64一维数组，供后续各阶段和指标函数共用
+        arrays = {col: np.ascontiguousarray(df[col].to_numpy(np.float64)) for col in ("open", "high", "low", "close")}
 
         # 分析趋势
-        trend = self._analyze_trend(df)
+        trend = self._analyze_trend(arrays)
 
         # 计算技术指标
-        indicators = self._calculate_indicators(df)
+        indicators = self._calculate_indicators(arrays)
 
         # 识别支撑压力位
-        support_resistance = self._find_support_resistance(df)
+        support_resistance = self._find_support_resistance(arrays)
 
         # 检测K线形态
-        patterns = self._detect_patterns(df)
+        patterns = self._detect_patterns(arrays)
 
         # 计算综合评分
         score = self._calculate_score(trend, indicators, patterns)
@@ -89,44 +155,44 @@ class TechnicalAnalyzer:
         logger.info(f"Technical analysis completed for {symbol}, score={score}")
         return report
 
-    def _quotes_to_dataframe(self, quotes: list[DailyQuote]) -> pd.DataFrame:
-        """将行情列表转换为DataFrame
+    def analyze_many(self, symbols: list[str], days: int = 365) -> list[TechnicalReport]:
+        """批量执行技术面分析
+
+        各股票的分析相互独立，且耗时主要在数据库读取和释放GIL的numpy计算上，使用线程池并发执行
 
         Args:
-            quotes: 行情数据列表
+            symbols: 股票代码列表
+            days: 分析天数，默认365天
 
         Returns:
-            pd.DataFrame: 转换后的DataFrame
+            list[TechnicalReport]: 与symbols顺序一致的技术面分析报告列表
         """
-        data = {
-            "trade_date": [q.trade_date for q in quotes],
-            "open": [float(q.open) for q in quotes],
-            "high": [float(q.high) for q in quotes],
-            "low": [float(q.low) for q in quotes],
-            "close": [float(q.close) for q in quotes],
-            "volume": [q.volume for q in quotes],
-        }
-        df = pd.DataFrame(data)
-        df["trade_date"] = pd.to_datetime(df["trade_date"])
-        df = df.sort_values("trade_date").reset_index(drop=True)
-        return df
+        if not symbols:
+            return []
 
-    def _analyze_trend(self, df: pd.DataFrame) -> TrendResult:
+        workers = min(self.MAX_WORKERS, len(symbols))
+        if workers == 1:
+            return [self.analyze(symbol, days) for symbol in symbols]
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda symbol: self.analyze(symbol, days), symbols))
+
+    def _analyze_trend(self, arrays: dict[str, np.ndarray]) -> TrendResult:
         """分析趋势方向
 
         Args:
-            df: 行情数据DataFrame
+            arrays: 列名到float64数组的映射，需包含close列
 
         Returns:
             TrendResult: 趋势分析结果
         """
-        closes = df["close"]
-        current_price = Decimal(str(closes.iloc[-1]))
+        closes = arrays["close"]
+        current_price = Decimal(str(float(closes[-1])))
 
-        # 计算不同周期的均线
-        ma5 = closes.rolling(window=5).mean().iloc[-1]
-        ma10 = closes.rolling(window=10).mean().iloc[-1]
-        ma20 = closes.rolling(window=20).mean().iloc[-1]
+        # 计算不同周期的均线（只需最新一期，直接对尾部窗口求均值）
+        ma5 = closes[-5:].mean()
+        ma10 = closes[-10:].mean()
+        ma20 = closes[-20:].mean()
 
         # 计算短期趋势（5日vs10日）
         short_trend = "上涨" if ma5 > ma10 else "下跌"
@@ -135,47 +201,47 @@ class TechnicalAnalyzer:
         mid_trend = "上涨" if ma10 > ma20 else "下跌"
 
         # 计算趋势强度（基于最近N日的涨跌幅）
-        recent_returns = closes.pct_change().tail(20)
-        positive_days = (recent_returns > 0).sum()
-        trend_strength = positive_days / len(recent_returns)
-
-        # 判断趋势方向
-        if trend_strength > 0.65 and short_trend == "上涨" and mid_trend == "上涨":
-            direction = "强势上涨"
-        elif trend_strength > 0.55 and short_trend == "上涨":
-            direction = "震荡偏强"
-        elif trend_strength < 0.35 and short_trend == "下跌" and mid_trend == "下跌":
-            direction = "弱势下跌"
-        elif trend_strength < 0.45 and short_trend == "下跌":
-            direction = "震荡偏弱"
+        # 与pct_change().tail(20)口径一致：数据恰为20日时首日无涨跌幅，但仍计入分母
+        # 收盘价恒为正，涨跌幅>0等价于收盘价高于前一日，直接比较相邻元素，无需构造涨跌幅数组
+        window = closes[-21:]
+        positive_days = np.count_nonzero(window[1:] > window[:-1])
+        trend_strength = positive_days / min(20, len(closes))
+
+        # 判断趋势方向：趋势强度分档后查表
+        if trend_strength > 0.65:
+            bucket = 2
+        elif trend_strength > 0.55:
+            bucket = 1
+        elif trend_strength < 0.35:
+            bucket = -2
+        elif trend_strength < 0.45:
+            bucket = -1
         else:
-            direction = "横盘整理"
+            bucket = 0
+        direction = _TREND_DIRECTIONS.get((bucket, short_trend, mid_trend), "横盘整理")
 
         return TrendResult(
             direction=direction,
             current_price=current_price,
         )
 
-    def _calculate_indicators(self, df: pd.DataFrame) -> Indicators:
+    def _calculate_indicators(self, arrays: dict[str, np.ndarray]) -> Indicators:
         """计算技术指标
 
         Args:
-            df: 行情数据DataFrame
+            arrays: 列名到float64数组的映射，需包含high、low、close列
 
         Returns:
             Indicators: 技术指标集合
         """
-        # 计算MA
-        ma_dict = calc_ma(df, [5, 10, 20, 60])
-
-        # 计算MACD
-        macd_result = calc_macd(df) if len(df) >= 26 else None
+        size = len(arrays["close"])
 
-        # 计算KDJ
-        kdj_result = calc_kdj(df) if len(df) >= 9 else None
-
-        # 计算RSI
-        rsi_result = calc_rsi(df) if len(df) >= 14 else None
+        # 一次遍历计算全部指标，数据不足的指标置空
+        result = calc_all_indicators(arrays, [5, 10, 20, 60])
+        ma_dict = result["ma"]
+        macd_result = result["macd"] if size >= 26 else None
+        kdj_result = result["kdj"] if size >= 9 else None
+        rsi_result = result["rsi"] if size >= 14 else None
 
         return Indicators(
             ma5=ma_dict.get(5),
@@ -187,54 +253,43 @@ class TechnicalAnalyzer:
             rsi=rsi_result,
         )
 
-    def _find_support_resistance(self, df: pd.DataFrame) -> SupportResistance:
+    def _find_support_resistance(self, arrays: dict[str, np.ndarray]) -> SupportResistance:
         """识别支撑压力位
 
         Args:
-            df: 行情数据DataFrame
+            arrays: 列名到float64数组的映射，需包含high、low、close列
 
         Returns:
             SupportResistance: 支撑压力位
         """
         # 使用最近60日的数据
-        lookback = min(60, len(df))
-        recent_df = df.tail(lookback)
-
-        highs = recent_df["high"]
-        lows = recent_df["low"]
-        closes = recent_df["close"]
-
-        current_price = closes.iloc[-1]
-
-        # 找出局部高点和低点
-        resistance_levels = []
-        support_levels = []
-
-        # 简单方法：找出过去的高点和低点
-        for i in range(2, len(recent_df) - 2):
-            # 局部高点
-            if (
-                highs.iloc[i] > highs.iloc[i - 1]
-                and highs.iloc[i] > highs.iloc[i - 2]
-                and highs.iloc[i] > highs.iloc[i + 1]
-                and highs.iloc[i] > highs.iloc[i + 2]
-            ):
-                if highs.iloc[i] > current_price:
-                    resistance_levels.append(highs.iloc[i])
-
-            # 局部低点
-            if (
-                lows.iloc[i] < lows.iloc[i - 1]
-                and lows.iloc[i] < lows.iloc[i - 2]
-                and lows.iloc[i] < lows.iloc[i + 1]
-                and lows.iloc[i] < lows.iloc[i + 2]
-            ):
-                if lows.iloc[i] < current_price:
-                    support_levels.append(lows.iloc[i])
-
-        # 排序并取最近的支撑压力位
-        resistance_levels = sorted(resistance_levels)
-        support_levels = sorted(support_levels, reverse=True)
+        highs = arrays["high"][-60:]
+        lows = arrays["low"][-60:]
+
+        current_price = float(arrays["close"][-1])
+
+        # 找出局部高点和低点：与前后各两根K线整体比较，一次得到布尔掩码
+        mid_highs = highs[2:-2]
+        peak_mask = (
+            (mid_highs > highs[1:-3])
+            & (mid_highs > highs[:-4])
+            & (mid_highs > highs[3:-1])
+            & (mid_highs > highs[4:])
+        )
+        resistance_levels = mid_highs[peak_mask & (mid_highs > current_price)].tolist()
+
+        mid_lows = lows[2:-2]
+        trough_mask = (
+            (mid_lows < lows[1:-3])
+            & (mid_lows < lows[:-4])
+            & (mid_lows < lows[3:-1])
+            & (mid_lows < lows[4:])
+        )
+        support_levels = mid_lows[trough_mask & (mid_lows < current_price)].tolist()
+
+        # 只需最近的两个支撑压力位，无需完整排序
+        resistance_levels = heapq.nsmallest(2, resistance_levels)
+        support_levels = heapq.nlargest(2, support_levels)
 
         # 第一压力位：最近的上方压力
         resistance_1 = Decimal(str(resistance_levels[0])) if resistance_levels else Decimal(str(current_price * 1.05))
@@ -255,78 +310,23 @@ class TechnicalAnalyzer:
             support_2=support_2,
         )
 
-    def _detect_patterns(self, df: pd.DataFrame) -> list[str]:
+    def _detect_patterns(self, arrays: dict[str, np.ndarray]) -> list[str]:
         """检测K线形态
 
         Args:
-            df: 行情数据DataFrame
+            arrays: 列名到float64数组的映射，需包含open、high、low、close列
 
         Returns:
             list[str]: 检测到的K线形态列表
         """
-        patterns = []
-
-        if len(df) < 3:
-            return patterns
-
-        # 获取最近几根K线
-        recent = df.tail(5)
-
-        for i in range(len(recent) - 1, max(len(recent) - 4, 0), -1):
-            open_price = recent["open"].iloc[i]
-            high_price = recent["high"].iloc[i]
-            low_price = recent["low"].iloc[i]
-            close_price = recent["close"].iloc[i]
-
-            # 计算实体和影线
-            body = abs(close_price - open_price)
-            total_range = high_price - low_price
-            upper_shadow = high_price - max(open_price, close_price)
-            lower_shadow = min(open_price, close_price) - low_price
-
-            if total_range == 0:
-                continue
-
-            # 大阳线：实体占比>70%，收盘接近最高
-            if close_price > open_price and body / total_range > 0.7:
-                patterns.append("大阳线")
-
-            # 大阴线：实体占比>70%，收盘接近最低
-            if close_price < open_price and body / total_range > 0.7:
-                patterns.append("大阴线")
-
-            # 十字星：实体很小，上下影线较长
-            if body / total_range < 0.1 and upper_shadow > body and lower_shadow > body:
-                patterns.append("十字星")
-
-            # 锤子线：下影线长，实体小，上影线短
-            if (
-                lower_shadow > body * 2
-                and upper_shadow < body * 0.5
-                and close_price > open_price
-            ):
-                patterns.append("锤子线")
-
-            # 倒锤线：上影线长，实体小，下影线短
-            if (
-                upper_shadow > body * 2
-                and lower_shadow < body * 0.5
-                and close_price > open_price
-            ):
-                patterns.append("倒锤线")
-
-            # 流星线：上影线长，实体小，出现在上涨趋势中
-            if (
-                upper_shadow > body * 2
-                and lower_shadow < body * 0.5
-                and close_price < open_price
-            ):
-                patterns.append("流星线")
-
-        # 去重
-        patterns = list(dict.fromkeys(patterns))
-
-        return patterns
+        if len(arrays["close"]) < 3:
+            return []
+
+        # 最近至多3根K线（不含第一根），各K线命中的形态按位合并，天然去重
+        count = min(3, len(arrays["close"]) - 1)
+        mask = _pattern_bits(*(arrays[col][-count:] for col in ("open", "high", "low", "close")))
+
+        return [name for i, name in enumerate(_PATTERN_NAMES) if mask & (1 << i)]
 
     def _calculate_score(
         self,
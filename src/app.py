@@ -7,15 +7,35 @@ from datetime import datetime
 
 import streamlit as st
 
-from src.data.repository import Repository
-from src.models.schemas import Market
+from src.models.schemas import Alert, Market, TechnicalReport, WatchlistItem
+from src.resources import get_repo
+
+
+@st.cache_data(ttl=30)
+def cached_watchlist() -> list[WatchlistItem]:
+    """获取自选股列表，30秒内的重复渲染直接复用结果"""
+    return get_repo().get_watchlist()
+
+
+@st.cache_data(ttl=30)
+def cached_alerts(limit: int) -> list[Alert]:
+    """获取最近的预警记录，30秒内的重复渲染直接复用结果"""
+    return get_repo().get_alerts(limit=limit)
+
+
+@st.cache_data(ttl=60)
+def cached_technical_reports(symbols: tuple[str, ...]) -> list[TechnicalReport]:
+    """获取自选股的技术面分析报告，60秒内的重复渲染直接复用结果"""
+    # 技术分析依赖numba等较重的模块，有自选股时才导入
+    from src.analysis.technical import TechnicalAnalyzer
+
+    return TechnicalAnalyzer(get_repo()).analyze_many(list(symbols), days=120)
 
 
 def init_session_state():
     """初始化会话状态"""
     if "repository" not in st.session_state:
-        # 使用SQLite作为默认数据库（测试模式）
-        st.session_state.repository = Repository("sqlite:///stock_analyzer.db")
+        st.session_state.repository = get_repo()
 
 
 def main():
@@ -62,12 +82,12 @@ def main():
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        watchlist = repo.get_watchlist()
+        watchlist = cached_watchlist()
         st.metric(label="自选股数量", value=len(watchlist), delta=None)
 
     with col2:
         # 获取未读预警数量
-        alerts = repo.get_alerts(limit=100)
+        alerts = cached_alerts(100)
         unread_count = sum(1 for a in alerts if not a.is_read)
         st.metric(label="未读预警", value=unread_count, delta=None)
 
@@ -79,7 +99,7 @@ def main():
             # 获取最新行情
             latest_quote = repo.get_latest_quote(watchlist[0].symbol)
             if latest_quote:
-                change = float(latest_quote.change_pct) if latest_quote.change_pct else 0
+                change = latest_quote.change_pct or 0
                 st.metric(
                     label=f"{watchlist[0].symbol}",
                     value=f"{latest_quote.close:.2f}",
@@ -92,6 +112,28 @@ def main():
 
     st.markdown("---")
 
+    # 自选股技术面概览：各股票并发分析
+    st.subheader("📊 自选股技术面概览")
+    if watchlist:
+        reports = cached_technical_reports(tuple(item.symbol for item in watchlist))
+        st.dataframe(
+            [
+                {
+                    "股票代码": report.symbol,
+                    "趋势": report.trend.direction if report.trend else "--",
+                    "现价": float(report.trend.current_price) if report.trend else None,
+                    "技术评分": report.score,
+                }
+                for report in reports
+            ],
+            use_container_width=True,
+            hide_index=True,
+        )
+    else:
+        st.info("暂无自选股")
+
+    st.markdown("---")
+
     # 快速搜索
     st.subheader("🔍 快速搜索")
     search_col1, search_col2 = st.columns([3, 1])
@@ -115,7 +157,7 @@ def main():
 
     # 最近预警
     st.subheader("🔔 最近预警")
-    recent_alerts = repo.get_alerts(limit=5)
+    recent_alerts = cached_alerts(5)
 
     if recent_alerts:
         for alert in recent_alerts:
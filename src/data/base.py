@@ -5,10 +5,23 @@
 
 from abc import ABC, abstractmethod
 from datetime import date
+from operator import attrgetter
+
+import numpy as np
 
 from src.models.schemas import DailyQuote, Financial, StockInfo
 
 
+def to_float(value) -> float | None:
+    """将数据源返回的数值转换为float
+
+    用于行情价格、财务指标等分析型字段；None、NaN和0视为缺失值返回None
+    """
+    if not value or value != value:
+        return None
+    return float(value)
+
+
 class BaseProvider(ABC):
     """数据源基类"""
 
@@ -26,6 +39,57 @@ class BaseProvider(ABC):
         """
         pass
 
+    def get_daily_quotes_batch(self, symbols: list[str], start: date, end: date) -> dict[str, list[DailyQuote]]:
+        """批量获取多只股票的日线行情
+
+        默认逐只调用get_daily_quotes，支持批量接口的数据源应覆盖为一次或少量请求
+
+        Args:
+            symbols: 股票代码列表
+            start: 开始日期
+            end: 结束日期
+
+        Returns:
+            股票代码到日线行情列表的映射，无数据的股票对应空列表
+        """
+        return {symbol: self.get_daily_quotes(symbol, start, end) for symbol in symbols}
+
+    # get_daily_quotes_arrays返回的数值列，与Repository.get_quotes_df的同名列一致
+    QUOTE_ARRAY_COLUMNS = ("open", "high", "low", "close", "volume", "pre_close", "amount")
+
+    def get_daily_quotes_arrays(self, symbol: str, start: date, end: date) -> dict[str, np.ndarray]:
+        """获取按列存储的日线行情，供技术指标等数值计算直接使用
+
+        默认实现由get_daily_quotes转换而来，数据源可覆盖为不经过DailyQuote的列式实现
+
+        Args:
+            symbol: 股票代码
+            start: 开始日期
+            end: 结束日期
+
+        Returns:
+            dict[str, np.ndarray]: trade_date列为datetime64[ns]，QUOTE_ARRAY_COLUMNS中的列为float64，
+            缺失值为NaN，按交易日期升序排列
+        """
+        return self._quotes_to_arrays(self.get_daily_quotes(symbol, start, end))
+
+    @classmethod
+    def _quotes_to_arrays(cls, quotes: list[DailyQuote]) -> dict[str, np.ndarray]:
+        """将日线行情列表按交易日期升序转换为列数组
+
+        数值列先写入一块(列数, 行数)的float64缓冲区，每条行情一次取出全部字段填入一列，
+        各数值列是缓冲区的连续行视图；None在写入时转为NaN
+        """
+        quotes = sorted(quotes, key=attrgetter("trade_date"))
+        get_values = attrgetter(*cls.QUOTE_ARRAY_COLUMNS)
+        buffer = np.empty((len(cls.QUOTE_ARRAY_COLUMNS), len(quotes)), dtype=np.float64)
+        for i, q in enumerate(quotes):
+            buffer[:, i] = get_values(q)
+
+        arrays = {"trade_date": np.array([q.trade_date for q in quotes], dtype="datetime64[ns]")}
+        arrays.update(zip(cls.QUOTE_ARRAY_COLUMNS, buffer))
+        return arrays
+
     @abstractmethod
     def get_stock_info(self, symbol: str) -> StockInfo | None:
         """获取股票基础信息
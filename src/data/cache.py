@@ -0,0 +1,111 @@
+"""
+数据源响应缓存
+以 (接口名, 请求参数) 的MD5为键将数据源返回的DataFrame持久化到本地文件，重复请求同一区间时跳过网络调用
+"""
+
+import hashlib
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+
+class FileCache:
+    """DataFrame文件缓存
+
+    每个条目保存为一个pickle文件，按文件修改时间判断是否过期；
+    写入时先写临时文件再原子替换，并发读取不会读到写了一半的文件。
+    写入时定期删除超过max_age的文件，目录不会随请求区间的变化无限增长
+    """
+
+    # 两次清理过期文件之间的最小间隔（秒），避免每次写入都扫描目录
+    PRUNE_INTERVAL = 3600
+
+    def __init__(self, directory: str = ".cache/tushare", max_age: float = 7 * 24 * 3600):
+        """初始化文件缓存
+
+        Args:
+            directory: 缓存文件所在目录，不存在时自动创建
+            max_age: 缓存文件的最长保留时间（秒），应不小于调用方使用的最大有效期
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_age = max_age
+        # 上次清理的时间（time.monotonic），None表示尚未清理
+        self._last_prune: float | None = None
+        logger.info(f"FileCache initialized at {directory}")
+
+    @staticmethod
+    def make_key(endpoint: str, **params) -> str:
+        """根据接口名和请求参数生成缓存键
+
+        Args:
+            endpoint: 数据源接口名
+            **params: 请求参数，按参数名排序后参与计算
+
+        Returns:
+            str: MD5十六进制摘要
+        """
+        payload = endpoint + ":" + ":".join(f"{name}={params[name]}" for name in sorted(params))
+        return hashlib.md5(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, ttl: float) -> pd.DataFrame | None:
+        """查询缓存
+
+        Args:
+            key: 缓存键
+            ttl: 有效期（秒）
+
+        Returns:
+            缓存的DataFrame，未命中或已过期返回None
+        """
+        path = self.directory / f"{key}.pkl"
+        try:
+            if time.time() - path.stat().st_mtime >= ttl:
+                return None
+            return pd.read_pickle(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Failed to read cache file {path}: {e}")
+            return None
+
+    def put(self, key: str, df: pd.DataFrame):
+        """写入缓存
+
+        Args:
+            key: 缓存键
+            df: 数据源返回的DataFrame
+        """
+        path = self.directory / f"{key}.pkl"
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+
+        if self._last_prune is None or time.monotonic() - self._last_prune >= self.PRUNE_INTERVAL:
+            self.prune()
+
+    def prune(self) -> int:
+        """删除修改时间超过max_age的缓存文件及残留的临时文件
+
+        Returns:
+            int: 删除的文件数
+        """
+        self._last_prune = time.monotonic()
+        cutoff = time.time() - self.max_age
+        removed = 0
+        for path in self.directory.iterdir():
+            if path.suffix not in (".pkl", ".tmp"):
+                continue
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                # 其他进程已删除
+                continue
+        if removed:
+            logger.debug(f"Pruned {removed} expired cache files from {self.directory}")
+        return removed
@@ -4,7 +4,7 @@
 """
 
 from datetime import date
-from decimal import Decimal
+from functools import cache
 
 from loguru import logger
 
@@ -12,17 +12,35 @@ from src.data.base import BaseProvider
 from src.models.schemas import DailyQuote, Financial, Market, StockInfo
 
 
+@cache
+def _futu():
+    """首次使用时才导入futu SDK并缓存模块，避免拖慢未使用港股数据源时的启动"""
+    import futu
+    return futu
+
+
 class FutuProvider(BaseProvider):
     """富途数据源（港股）"""
 
     def __init__(self, host: str = "127.0.0.1", port: int = 11111):
         self.host = host
         self.port = port
+        self._ctx = None
 
     def _get_quote_ctx(self):
-        """获取行情上下文"""
-        from futu import OpenQuoteContext
-        return OpenQuoteContext(self.host, self.port)
+        """获取行情上下文
+
+        首次调用时连接OpenD并缓存，后续请求复用同一连接，避免每次重新握手和鉴权
+        """
+        if self._ctx is None:
+            self._ctx = _futu().OpenQuoteContext(self.host, self.port)
+        return self._ctx
+
+    def close(self):
+        """关闭行情上下文连接，之后的请求会重新建立连接"""
+        if self._ctx is not None:
+            self._ctx.close()
+            self._ctx = None
 
     def _parse_symbol(self, symbol: str) -> tuple[str, Market]:
         """解析股票代码"""
@@ -37,40 +55,47 @@ class FutuProvider(BaseProvider):
         """获取日线行情"""
         futu_symbol, _ = self._parse_symbol(symbol)
 
-        with self._get_quote_ctx() as ctx:
-            from futu import KLType
-            ret, df = ctx.request_history_kline(
-                futu_symbol,
-                start=start.strftime("%Y-%m-%d"),
-                end=end.strftime("%Y-%m-%d"),
-                ktype=KLType.K_DAY,
-            )
-            if ret != 0:
-                logger.error(f"获取行情失败: {df}")
-                return []
-
-        quotes = []
-        for _, row in df.iterrows():
-            quotes.append(DailyQuote(
+        ret, df = self._get_quote_ctx().request_history_kline(
+            futu_symbol,
+            start=start.strftime("%Y-%m-%d"),
+            end=end.strftime("%Y-%m-%d"),
+            ktype=_futu().KLType.K_DAY,
+        )
+        if ret != 0:
+            logger.error(f"获取行情失败: {df}")
+            return []
+
+        # 按列取出Python原生值后zip遍历，避免iterrows逐行构造Series
+        columns = zip(
+            df["time_key"].tolist(),
+            df["open"].tolist(),
+            df["high"].tolist(),
+            df["low"].tolist(),
+            df["close"].tolist(),
+            df["volume"].tolist(),
+            df["turnover"].tolist(),
+        )
+        return [
+            DailyQuote(
                 symbol=symbol,
-                trade_date=row["time_key"].date() if hasattr(row["time_key"], "date") else date.fromisoformat(row["time_key"]),
-                open=Decimal(str(row["open"])),
-                high=Decimal(str(row["high"])),
-                low=Decimal(str(row["low"])),
-                close=Decimal(str(row["close"])),
-                volume=int(row["volume"]),
-                amount=Decimal(str(row["turnover"])),
-            ))
-        return quotes
+                trade_date=time_key.date() if hasattr(time_key, "date") else date.fromisoformat(time_key),
+                open=float(open_price),
+                high=float(high),
+                low=float(low),
+                close=float(close),
+                volume=int(volume),
+                amount=float(turnover),
+            )
+            for time_key, open_price, high, low, close, volume, turnover in columns
+        ]
 
     def get_stock_info(self, symbol: str) -> StockInfo | None:
         """获取股票基础信息"""
         futu_symbol, market = self._parse_symbol(symbol)
 
-        with self._get_quote_ctx() as ctx:
-            ret, df = ctx.get_stock_basicinfo(market="HK", code=futu_symbol)
-            if ret != 0 or df.empty:
-                return None
+        ret, df = self._get_quote_ctx().get_stock_basicinfo(market="HK", code=futu_symbol)
+        if ret != 0 or df.empty:
+            return None
 
         row = df.iloc[0]
         return StockInfo(
@@ -86,17 +111,16 @@ class FutuProvider(BaseProvider):
 
     def search_stocks(self, keyword: str) -> list[StockInfo]:
         """搜索股票"""
-        with self._get_quote_ctx() as ctx:
-            ret, df = ctx.get_stock_filter(market="HK", filter_list=[])
-            if ret != 0:
-                return []
-
-        results = []
-        for _, row in df.iterrows():
-            if keyword in row.get("name", ""):
-                results.append(StockInfo(
-                    symbol=row["code"],
-                    name=row["name"],
-                    market=Market.HK_STOCK,
-                ))
-        return results[:20]
+        ret, df = self._get_quote_ctx().get_stock_filter(market="HK", filter_list=[])
+        if ret != 0:
+            return []
+
+        if "name" not in df.columns:
+            return []
+
+        # 向量化子串匹配，只对前20条命中结果构造StockInfo
+        mask = df["name"].str.contains(keyword, regex=False, na=False)
+        return [
+            StockInfo(symbol=row.code, name=row.name, market=Market.HK_STOCK)
+            for row in df.loc[mask].head(20).itertuples(index=False)
+        ]
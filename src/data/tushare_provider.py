@@ -4,41 +4,127 @@ Tushare数据源（A股）
 """
 
 from datetime import date, timedelta
-from decimal import Decimal
+from functools import lru_cache
 
+import numpy as np
+import pandas as pd
 import tushare as ts
 
-from src.data.base import BaseProvider
+from src.data.base import BaseProvider, to_float
+from src.data.cache import FileCache
 from src.models.schemas import DailyQuote, Financial, Market, StockInfo
 
+# 不带后缀的A股代码首位到交易所后缀的映射：6开头为上交所，0/3开头为深交所，4/8开头为北交所
+_SUFFIX_BY_FIRST = {"6": ".SH", "0": ".SZ", "3": ".SZ", "4": ".BJ", "8": ".BJ"}
+
+
+def _ymd(value) -> date | None:
+    """将YYYYMMDD格式的日期（整数或字符串）转换为date，缺失值返回None
+
+    按整数divmod拆分年月日，不做字符串切片
+    """
+    if not value or value != value:
+        return None
+    year, rest = divmod(int(value), 10000)
+    month, day = divmod(rest, 100)
+    return date(year, month, day)
+
+
+def _ymd_list(values: pd.Series) -> list[date]:
+    """批量转换YYYYMMDD格式的日期列，调用方需先过滤缺失值
+
+    年月日拆分已是numpy整列运算，1万行约0.4ms；主要耗时在字符串列转int64和逐个构造date对象，
+    njit无法构造date对象，编译拆分循环收益有限，因此保持纯numpy实现
+    """
+    numbers = values.astype("int64").to_numpy()
+    return list(map(date, (numbers // 10000).tolist(), (numbers // 100 % 100).tolist(), (numbers % 100).tolist()))
+
 
 class TushareProvider(BaseProvider):
     """Tushare数据源（A股）"""
 
-    def __init__(self, token: str):
+    # stock_basic接口返回的字段
+    STOCK_BASIC_FIELDS = "ts_code,symbol,name,area,industry,list_date"
+
+    # fina_indicator接口返回的字段
+    FINA_INDICATOR_FIELDS = "ts_code,ann_date,roe,pe,pb,debt_to_assets,grossprofit_margin"
+
+    # daily接口单次请求最多返回的行数
+    DAILY_MAX_ROWS = 6000
+
+    # 响应缓存有效期（秒）：日线按收盘后更新一次，财务指标按季度披露
+    DAILY_CACHE_TTL = 24 * 3600
+    # 结束日期不早于今天的日线请求：当日行情可能尚未发布，只短暂缓存
+    DAILY_OPEN_CACHE_TTL = 10 * 60
+    FINA_INDICATOR_CACHE_TTL = 7 * 24 * 3600
+
+    def __init__(self, token: str, cache: FileCache | None = None):
+        """初始化Tushare数据源
+
+        Args:
+            token: Tushare API token
+            cache: 响应缓存，为None时每次都调用接口
+        """
         self.pro = ts.pro_api(token)
+        self.cache = cache
+        # (下载日期, 全市场股票列表, ts_code到(名称, 行业, 上市日期)的索引)，股票列表每日至多变化一次，当日内复用
+        self._stock_basic: tuple[date, pd.DataFrame, dict[str, tuple]] | None = None
+
+    def _load_stock_basic(self) -> tuple[pd.DataFrame, dict[str, tuple]]:
+        """获取全市场股票基础信息列表
+
+        每日首次调用时从Tushare下载，并按ts_code建立索引；
+        当日后续的搜索使用内存中的DataFrame，单只查询直接查索引而不逐行比较
+
+        Returns:
+            (股票列表, ts_code到(名称, 行业, 上市日期)的索引)
+        """
+        today = date.today()
+        if self._stock_basic is None or self._stock_basic[0] != today:
+            df = self.pro.stock_basic(fields=self.STOCK_BASIC_FIELDS)
+            industries = [industry if industry == industry else None for industry in df["industry"].tolist()]
+            index = dict(zip(df["ts_code"].tolist(), zip(df["name"].tolist(), industries, df["list_date"].tolist())))
+            self._stock_basic = (today, df, index)
+        return self._stock_basic[1], self._stock_basic[2]
 
-    def _parse_symbol(self, symbol: str) -> tuple[str, Market]:
+    def _cached_call(self, endpoint: str, ttl: float, **params) -> pd.DataFrame:
+        """调用Tushare接口，命中响应缓存时直接返回缓存的DataFrame
+
+        Args:
+            endpoint: 接口名，如daily、fina_indicator
+            ttl: 缓存有效期（秒）
+            **params: 接口参数
+
+        Returns:
+            pd.DataFrame: 接口返回的数据
+        """
+        if self.cache is None:
+            return getattr(self.pro, endpoint)(**params)
+
+        key = FileCache.make_key(endpoint, **params)
+        df = self.cache.get(key, ttl)
+        if df is None:
+            df = getattr(self.pro, endpoint)(**params)
+            self.cache.put(key, df)
+        return df
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _parse_symbol(symbol: str) -> tuple[str, Market]:
         """解析股票代码
 
+        同一批股票代码会被反复解析，结果按代码缓存
+
         Args:
             symbol: 股票代码，支持带后缀(如000001.SZ)或不带后缀(如000001)
 
         Returns:
             (ts_code, market): Tushare格式的代码和市场类型
         """
-        if "." in symbol:
-            code, suffix = symbol.split(".")
-            if suffix in ("SH", "SZ", "BJ"):
-                return symbol, Market.A_STOCK
-        # 默认添加后缀
-        if symbol.startswith("6"):
-            return f"{symbol}.SH", Market.A_STOCK
-        elif symbol.startswith(("0", "3")):
-            return f"{symbol}.SZ", Market.A_STOCK
-        elif symbol.startswith(("4", "8")):
-            return f"{symbol}.BJ", Market.A_STOCK
-        return symbol, Market.A_STOCK
+        if symbol.endswith((".SH", ".SZ", ".BJ")):
+            return symbol, Market.A_STOCK
+        # 默认按代码首位添加后缀
+        return symbol + _SUFFIX_BY_FIRST.get(symbol[:1], ""), Market.A_STOCK
 
     def _to_stock_info(self, row: dict) -> StockInfo:
         """将Tushare返回的数据行转换为StockInfo
@@ -49,10 +135,7 @@ class TushareProvider(BaseProvider):
         Returns:
             StockInfo对象
         """
-        list_date = None
-        if row.get("list_date"):
-            date_str = str(row["list_date"])
-            list_date = date(int(date_str[:4]), int(date_str[4:6]), int(date_str[6:8]))
+        list_date = _ymd(row.get("list_date"))
 
         return StockInfo(
             symbol=row["ts_code"],
@@ -73,30 +156,126 @@ class TushareProvider(BaseProvider):
         Returns:
             日线行情列表
         """
+        return self._daily_to_quotes(symbol, self._daily_frame(symbol, start, end))
+
+    def get_daily_quotes_batch(self, symbols: list[str], start: date, end: date) -> dict[str, list[DailyQuote]]:
+        """批量获取多只股票的日线行情
+
+        daily接口支持以逗号分隔传入多个代码，按单次返回行数上限分组请求后再按ts_code拆分
+
+        Args:
+            symbols: 股票代码列表
+            start: 开始日期
+            end: 结束日期
+
+        Returns:
+            股票代码到日线行情列表的映射，无数据的股票对应空列表
+        """
+        # 同一ts_code可能以带后缀和不带后缀两种写法同时出现
+        symbols_by_code: dict[str, list[str]] = {}
+        for symbol in symbols:
+            symbols_by_code.setdefault(self._parse_symbol(symbol)[0], []).append(symbol)
+        codes = list(symbols_by_code)
+
+        # 每只股票的行数不超过区间内（含首尾）的工作日数（不扣除节假日，偏保守），保证每次请求不超过返回上限
+        rows_per_code = max(1, int(np.busday_count(start, end + timedelta(days=1))))
+        chunk_size = max(1, self.DAILY_MAX_ROWS // rows_per_code)
+
+        result: dict[str, list[DailyQuote]] = {symbol: [] for symbol in symbols}
+        for i in range(0, len(codes), chunk_size):
+            df = self._cached_call(
+                "daily",
+                self._daily_cache_ttl(end),
+                ts_code=",".join(codes[i:i + chunk_size]),
+                start_date=start.strftime("%Y%m%d"),
+                end_date=end.strftime("%Y%m%d"),
+            )
+            if df.empty:
+                continue
+            for ts_code, group in df.groupby("ts_code", sort=False):
+                for symbol in symbols_by_code.get(ts_code, ()):
+                    result[symbol] = self._daily_to_quotes(symbol, group)
+        return result
+
+    @staticmethod
+    def _daily_to_quotes(symbol: str, df: pd.DataFrame) -> list[DailyQuote]:
+        """将daily接口返回的DataFrame转换为日线行情列表"""
+        if df.empty:
+            return []
+
+        # 按列取出Python原生值后zip遍历，避免iterrows逐行构造Series；
+        # 仍使用校验构造而非model_construct，后者在pydantic v2中逐字段走Python代码，反而更慢
+        columns = zip(
+            _ymd_list(df["trade_date"]),
+            df["open"].tolist(),
+            df["high"].tolist(),
+            df["low"].tolist(),
+            df["close"].tolist(),
+            df["vol"].tolist(),
+            # Tushare的成交额单位为千元，整列换算为元
+            (df["amount"] * 1000).tolist(),
+            df["pre_close"].tolist(),
+        )
+        return [
+            DailyQuote(
+                symbol=symbol,
+                trade_date=trade_date,
+                open=to_float(open_price),
+                high=to_float(high),
+                low=to_float(low),
+                close=to_float(close),
+                volume=int(vol) if vol == vol else None,
+                amount=to_float(amount),
+                pre_close=to_float(pre_close),
+            )
+            for trade_date, open_price, high, low, close, vol, amount, pre_close in columns
+        ]
+
+    def get_daily_quotes_arrays(self, symbol: str, start: date, end: date) -> dict[str, np.ndarray]:
+        """获取按列存储的日线行情
+
+        直接从接口返回的DataFrame取出numpy列，不构造DailyQuote
+
+        Args:
+            symbol: 股票代码
+            start: 开始日期
+            end: 结束日期
+
+        Returns:
+            dict[str, np.ndarray]: 列定义同BaseProvider.get_daily_quotes_arrays，成交额单位为元
+        """
+        df = self._daily_frame(symbol, start, end)
+        if df.empty:
+            return self._quotes_to_arrays([])
+
+        # 接口按交易日期降序返回，YYYYMMDD格式按字符串或整数排序均与日期顺序一致
+        df = df.sort_values("trade_date")
+        return {
+            "trade_date": pd.to_datetime(df["trade_date"].astype(str), format="%Y%m%d").to_numpy("datetime64[ns]"),
+            "open": df["open"].to_numpy(np.float64),
+            "high": df["high"].to_numpy(np.float64),
+            "low": df["low"].to_numpy(np.float64),
+            "close": df["close"].to_numpy(np.float64),
+            "volume": df["vol"].to_numpy(np.float64),
+            "pre_close": df["pre_close"].to_numpy(np.float64),
+            # Tushare的成交额单位为千元，换算为元
+            "amount": df["amount"].to_numpy(np.float64) * 1000,
+        }
+
+    def _daily_cache_ttl(self, end: date) -> float:
+        """日线请求的缓存有效期，区间包含今天时使用较短的DAILY_OPEN_CACHE_TTL"""
+        return self.DAILY_OPEN_CACHE_TTL if end >= date.today() else self.DAILY_CACHE_TTL
+
+    def _daily_frame(self, symbol: str, start: date, end: date) -> pd.DataFrame:
+        """调用daily接口获取日线行情原始DataFrame，经过响应缓存"""
         ts_code, _ = self._parse_symbol(symbol)
-        df = self.pro.daily(
+        return self._cached_call(
+            "daily",
+            self._daily_cache_ttl(end),
             ts_code=ts_code,
             start_date=start.strftime("%Y%m%d"),
             end_date=end.strftime("%Y%m%d"),
         )
-        if df.empty:
-            return []
-
-        quotes = []
-        for _, row in df.iterrows():
-            trade_date_str = str(row["trade_date"])
-            quotes.append(DailyQuote(
-                symbol=symbol,
-                trade_date=date(int(trade_date_str[:4]), int(trade_date_str[4:6]), int(trade_date_str[6:8])),
-                open=Decimal(str(row["open"])) if row["open"] else None,
-                high=Decimal(str(row["high"])) if row["high"] else None,
-                low=Decimal(str(row["low"])) if row["low"] else None,
-                close=Decimal(str(row["close"])) if row["close"] else None,
-                volume=int(row["vol"]) if row["vol"] else None,
-                amount=Decimal(str(row["amount"])) * 1000 if row["amount"] else None,
-                pre_close=Decimal(str(row["pre_close"])) if row["pre_close"] else None,
-            ))
-        return quotes
 
     def get_stock_info(self, symbol: str) -> StockInfo | None:
         """获取股票基础信息
@@ -108,22 +287,18 @@ class TushareProvider(BaseProvider):
             股票基础信息，不存在则返回None
         """
         ts_code, market = self._parse_symbol(symbol)
-        df = self.pro.stock_basic(ts_code=ts_code, fields="ts_code,symbol,name,area,industry,list_date")
-        if df.empty:
+        _, index = self._load_stock_basic()
+        entry = index.get(ts_code)
+        if entry is None:
             return None
 
-        row = df.iloc[0].to_dict()
-        list_date = None
-        if row.get("list_date"):
-            date_str = str(row["list_date"])
-            list_date = date(int(date_str[:4]), int(date_str[4:6]), int(date_str[6:8]))
-
+        name, industry, list_date = entry
         return StockInfo(
             symbol=symbol,
-            name=row["name"],
+            name=name,
             market=market,
-            industry=row.get("industry"),
-            list_date=list_date,
+            industry=industry,
+            list_date=_ymd(list_date),
         )
 
     def get_financials(self, symbol: str, years: int = 5) -> list[Financial]:
@@ -139,22 +314,40 @@ class TushareProvider(BaseProvider):
         ts_code, _ = self._parse_symbol(symbol)
         start_date = (date.today() - timedelta(days=years * 365)).strftime("%Y%m%d")
 
-        df = self.pro.fina_indicator(ts_code=ts_code, start_date=start_date, fields="ts_code,ann_date,roe,pe,pb,debt_to_assets,grossprofit_margin")
-
-        financials = []
-        for _, row in df.iterrows():
-            if row["ann_date"]:
-                ann_date_str = str(row["ann_date"])
-                financials.append(Financial(
-                    symbol=symbol,
-                    report_date=date(int(ann_date_str[:4]), int(ann_date_str[4:6]), int(ann_date_str[6:8])),
-                    roe=Decimal(str(row["roe"])) if row["roe"] else None,
-                    pe=Decimal(str(row["pe"])) if row["pe"] else None,
-                    pb=Decimal(str(row["pb"])) if row["pb"] else None,
-                    debt_ratio=Decimal(str(row["debt_to_assets"])) if row["debt_to_assets"] else None,
-                    gross_margin=Decimal(str(row["grossprofit_margin"])) if row["grossprofit_margin"] else None,
-                ))
-        return financials
+        df = self._cached_call(
+            "fina_indicator",
+            self.FINA_INDICATOR_CACHE_TTL,
+            ts_code=ts_code,
+            start_date=start_date,
+            fields=self.FINA_INDICATOR_FIELDS,
+        )
+        if df.empty:
+            return []
+
+        # 公告日期缺失或无法解析的行直接过滤，不逐行判断
+        ann_dates = pd.to_numeric(df["ann_date"], errors="coerce")
+        valid = ann_dates.notna()
+        df = df.loc[valid]
+        columns = zip(
+            _ymd_list(ann_dates[valid]),
+            df["roe"].tolist(),
+            df["pe"].tolist(),
+            df["pb"].tolist(),
+            df["debt_to_assets"].tolist(),
+            df["grossprofit_margin"].tolist(),
+        )
+        return [
+            Financial(
+                symbol=symbol,
+                report_date=report_date,
+                roe=to_float(roe),
+                pe=to_float(pe),
+                pb=to_float(pb),
+                debt_ratio=to_float(debt_ratio),
+                gross_margin=to_float(gross_margin),
+            )
+            for report_date, roe, pe, pb, debt_ratio, gross_margin in columns
+        ]
 
     def search_stocks(self, keyword: str) -> list[StockInfo]:
         """搜索股票
@@ -165,15 +358,17 @@ class TushareProvider(BaseProvider):
         Returns:
             匹配的股票信息列表
         """
-        df = self.pro.stock_basic(fields="ts_code,symbol,name,area,industry,list_date")
-        df = df[df["name"].str.contains(keyword, na=False)]
-
-        results = []
-        for _, row in df.iterrows():
-            results.append(StockInfo(
-                symbol=row["ts_code"],
-                name=row["name"],
+        df, _ = self._load_stock_basic()
+        # 按字面子串匹配：走pandas的向量化字符串查找而非正则引擎，"*ST"等含正则元字符的关键词也不会报错
+        name_matched = df["name"].str.contains(keyword, regex=False, na=False)
+        df = df.loc[name_matched | df["symbol"].str.startswith(keyword, na=False)]
+
+        return [
+            StockInfo(
+                symbol=ts_code,
+                name=name,
                 market=Market.A_STOCK,
-                industry=row.get("industry"),
-            ))
-        return results
+                industry=industry if industry == industry else None,
+            )
+            for ts_code, name, industry in zip(df["ts_code"].tolist(), df["name"].tolist(), df["industry"].tolist())
+        ]
@@ -1,50 +1,136 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
-from decimal import Decimal
+from functools import lru_cache
 
+import pandas as pd
 import yfinance as yf
+from loguru import logger
 
-from src.data.base import BaseProvider
+from src.data.base import BaseProvider, to_float
 from src.models.schemas import DailyQuote, Financial, Market, StockInfo
 
 
 class YFinanceProvider(BaseProvider):
     """YFinance数据源（美股）"""
 
-    def _parse_symbol(self, symbol: str) -> tuple[str, Market]:
-        """解析股票代码"""
+    # 并发请求多只股票时的最大线程数，请求以网络等待为主
+    MAX_WORKERS = 10
+
+    # 搜索时匹配的预定义热门股票（yfinance没有直接搜索API）
+    POPULAR_SYMBOLS = ("AAPL", "MSFT", "GOOGL", "AMZN", "META", "NVDA", "TSLA", "JPM", "V", "WMT")
+
+    def __init__(self):
+        # (创建日期, yfinance代码到Ticker的映射)，Ticker内部缓存info等请求结果，当日内复用，跨日重建以刷新估值数据
+        self._tickers: tuple[date, dict[str, yf.Ticker]] | None = None
+
+    def _ticker(self, yf_symbol: str) -> yf.Ticker:
+        """获取yfinance代码对应的Ticker对象
+
+        同一只股票当日内复用同一个Ticker，get_stock_info与get_financials先后调用时只请求一次info
+
+        Args:
+            yf_symbol: yfinance格式的股票代码
+
+        Returns:
+            yf.Ticker对象
+        """
+        today = date.today()
+        if self._tickers is None or self._tickers[0] != today:
+            self._tickers = (today, {})
+        tickers = self._tickers[1]
+        ticker = tickers.get(yf_symbol)
+        if ticker is None:
+            ticker = tickers[yf_symbol] = yf.Ticker(yf_symbol)
+        return ticker
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _parse_symbol(symbol: str) -> tuple[str, Market]:
+        """解析股票代码，结果按代码缓存"""
         if symbol.endswith(".US"):
             return symbol[:-3], Market.US_STOCK
         if symbol.endswith(".HK"):
-            return symbol.replace(".HK", ".HK"), Market.HK_STOCK  # yfinance格式
+            # yfinance的港股代码同样以.HK结尾，原样使用
+            return symbol, Market.HK_STOCK
         return symbol, Market.US_STOCK
 
     def get_daily_quotes(self, symbol: str, start: date, end: date) -> list[DailyQuote]:
         """获取日线行情"""
         yf_symbol, _ = self._parse_symbol(symbol)
-        ticker = yf.Ticker(yf_symbol)
+        ticker = self._ticker(yf_symbol)
         df = ticker.history(start=start, end=end)
+        return self._history_to_quotes(symbol, df)
+
+    def get_daily_quotes_batch(self, symbols: list[str], start: date, end: date) -> dict[str, list[DailyQuote]]:
+        """批量获取多只股票的日线行情
+
+        通过yf.download一次请求所有股票，由yfinance内部多线程并发下载
 
+        Args:
+            symbols: 股票代码列表
+            start: 开始日期
+            end: 结束日期
+
+        Returns:
+            股票代码到日线行情列表的映射，无数据的股票对应空列表
+        """
+        if not symbols:
+            return {}
+
+        yf_symbols = {symbol: self._parse_symbol(symbol)[0] for symbol in symbols}
+        df = yf.download(
+            tickers=" ".join(dict.fromkeys(yf_symbols.values())),
+            start=start,
+            end=end,
+            group_by="ticker",
+            threads=True,
+            progress=False,
+            multi_level_index=True,
+            # 与get_daily_quotes使用的Ticker.history保持一致返回复权价格；download的默认值随yfinance版本变化过
+            auto_adjust=True,
+        )
+
+        result = {}
+        for symbol, yf_symbol in yf_symbols.items():
+            if df is None or yf_symbol not in df.columns.get_level_values(0):
+                result[symbol] = []
+                continue
+            # 多只股票按日期对齐，某只股票无交易的日期整行为NaN
+            result[symbol] = self._history_to_quotes(symbol, df[yf_symbol].dropna(subset=["Close"]))
+        return result
+
+    @staticmethod
+    def _history_to_quotes(symbol: str, df: pd.DataFrame) -> list[DailyQuote]:
+        """将yfinance的行情DataFrame（以日期为索引，含Open/High/Low/Close/Volume列）转换为日线行情列表"""
         if df.empty:
             return []
 
-        quotes = []
-        for idx, row in df.iterrows():
-            trade_date = idx.date()
-            quotes.append(DailyQuote(
+        # 按列取出Python原生值后zip遍历，避免iterrows逐行构造Series
+        columns = zip(
+            df.index.date.tolist(),
+            df["Open"].tolist(),
+            df["High"].tolist(),
+            df["Low"].tolist(),
+            df["Close"].tolist(),
+            df["Volume"].tolist(),
+        )
+        return [
+            DailyQuote(
                 symbol=symbol,
                 trade_date=trade_date,
-                open=Decimal(str(row["Open"])) if row["Open"] else None,
-                high=Decimal(str(row["High"])) if row["High"] else None,
-                low=Decimal(str(row["Low"])) if row["Low"] else None,
-                close=Decimal(str(row["Close"])) if row["Close"] else None,
-                volume=int(row["Volume"]) if row["Volume"] else None,
-            ))
-        return quotes
+                open=to_float(open_price),
+                high=to_float(high),
+                low=to_float(low),
+                close=to_float(close),
+                volume=int(volume) if volume == volume else None,
+            )
+            for trade_date, open_price, high, low, close, volume in columns
+        ]
 
     def get_stock_info(self, symbol: str) -> StockInfo | None:
         """获取股票基础信息"""
         yf_symbol, market = self._parse_symbol(symbol)
-        ticker = yf.Ticker(yf_symbol)
+        ticker = self._ticker(yf_symbol)
         info = ticker.info
 
         if not info:
@@ -60,34 +146,40 @@ class YFinanceProvider(BaseProvider):
     def get_financials(self, symbol: str, years: int = 5) -> list[Financial]:
         """获取财务数据"""
         yf_symbol, _ = self._parse_symbol(symbol)
-        ticker = yf.Ticker(yf_symbol)
+        ticker = self._ticker(yf_symbol)
         info = ticker.info
 
         if not info:
             return []
 
+        # yfinance的毛利率为小数，换算为百分比
+        gross_margin = to_float(info.get("grossMargins"))
         return [Financial(
             symbol=symbol,
             report_date=date.today(),
-            pe=Decimal(str(info.get("trailingPE", 0))) if info.get("trailingPE") else None,
-            pb=Decimal(str(info.get("priceToBook", 0))) if info.get("priceToBook") else None,
-            gross_margin=Decimal(str(info.get("grossMargins", 0) * 100)) if info.get("grossMargins") else None,
+            pe=to_float(info.get("trailingPE")),
+            pb=to_float(info.get("priceToBook")),
+            gross_margin=gross_margin * 100 if gross_margin is not None else None,
         )]
 
     def search_stocks(self, keyword: str) -> list[StockInfo]:
         """搜索股票"""
-        # yfinance没有直接搜索API，使用预定义热门股票
-        popular = ["AAPL", "MSFT", "GOOGL", "AMZN", "META", "NVDA", "TSLA", "JPM", "V", "WMT"]
-        results = []
-        for sym in popular:
-            if keyword.upper() in sym:
-                try:
-                    info = yf.Ticker(sym).info
-                    results.append(StockInfo(
-                        symbol=f"{sym}.US",
-                        name=info.get("longName", sym),
-                        market=Market.US_STOCK,
-                    ))
-                except Exception:
-                    pass
-        return results
+        matched = [sym for sym in self.POPULAR_SYMBOLS if keyword.upper() in sym]
+        if not matched:
+            return []
+
+        def _fetch(sym: str) -> StockInfo | None:
+            try:
+                info = self._ticker(sym).info
+                return StockInfo(
+                    symbol=f"{sym}.US",
+                    name=info.get("longName", sym),
+                    market=Market.US_STOCK,
+                )
+            except Exception as e:
+                logger.debug(f"获取{sym}信息失败: {e}")
+                return None
+
+        # 每只股票的info都是一次独立的网络请求，并发执行后按热门列表顺序返回
+        with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(matched))) as executor:
+            return [info for info in executor.map(_fetch, matched) if info is not None]
@@ -7,7 +7,8 @@ from datetime import date, datetime
 from decimal import Decimal
 from enum import Enum
 
-from pydantic import BaseModel, Field, computed_field
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
 
 class Market(str, Enum):
@@ -29,40 +30,124 @@ class StockInfo(BaseModel):
 
 
 class DailyQuote(BaseModel):
-    """日线行情数据"""
+    """日线行情数据
+
+    实例不可变：Repository.get_quotes的缓存会把同一批实例返回给多个调用方。
+    价格字段只用于技术分析和展示，使用float避免逐值构造Decimal；
+    涉及资金核算时（如持仓市值）由调用方转换为Decimal
+    """
+    model_config = ConfigDict(frozen=True)
+
     symbol: str = Field(..., description="股票代码")
     trade_date: date = Field(..., description="交易日期")
-    open: Decimal = Field(..., description="开盘价")
-    high: Decimal = Field(..., description="最高价")
-    low: Decimal = Field(..., description="最低价")
-    close: Decimal = Field(..., description="收盘价")
+    open: float = Field(..., description="开盘价")
+    high: float = Field(..., description="最高价")
+    low: float = Field(..., description="最低价")
+    close: float = Field(..., description="收盘价")
     volume: int = Field(..., description="成交量")
-    pre_close: Decimal | None = Field(None, description="前收盘价")
-    amount: Decimal | None = Field(None, description="成交额")
-    turnover_rate: Decimal | None = Field(None, description="换手率")
+    pre_close: float | None = Field(None, description="前收盘价")
+    amount: float | None = Field(None, description="成交额")
+    turnover_rate: float | None = Field(None, description="换手率")
+
+    @staticmethod
+    def compute_change_pct(close: float, pre_close: float | None) -> float | None:
+        """计算单个涨跌幅百分比
+
+        Args:
+            close: 收盘价
+            pre_close: 前收盘价
+
+        Returns:
+            涨跌幅百分比，前收盘价缺失（None/NaN）或为0时返回None
+        """
+        if pre_close and pre_close == pre_close:
+            return (close - pre_close) / pre_close * 100
+        return None
 
-    @computed_field
     @property
-    def change_pct(self) -> Decimal | None:
-        """涨跌幅百分比"""
-        if self.pre_close and self.pre_close != 0:
-            return (self.close - self.pre_close) / self.pre_close * 100
-        return None
+    def change_pct(self) -> float | None:
+        """涨跌幅百分比
+
+        普通属性而非computed_field：只在访问时计算，不参与model_dump序列化；
+        批量计算请使用change_pct_array
+        """
+        return self.compute_change_pct(self.close, self.pre_close)
+
+
+def change_pct_array(closes: np.ndarray, pre_closes: np.ndarray) -> np.ndarray:
+    """批量计算涨跌幅百分比
+
+    Args:
+        closes: 收盘价数组
+        pre_closes: 前收盘价数组，缺失值为NaN
+
+    Returns:
+        np.ndarray: 涨跌幅百分比数组，前收盘价缺失或为0的位置为NaN
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    pre_closes = np.asarray(pre_closes, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(pre_closes != 0, (closes - pre_closes) / pre_closes * 100, np.nan)
 
 
 class Financial(BaseModel):
-    """财务数据"""
+    """财务数据
+
+    实例不可变：Repository.get_financials的缓存会把同一批实例返回给多个调用方。
+    与DailyQuote相同，数值字段使用float，分析结果模型在其边界上自行转换
+    """
+    model_config = ConfigDict(frozen=True)
+
     symbol: str = Field(..., description="股票代码")
     report_date: date = Field(..., description="报告期")
-    revenue: Decimal | None = Field(None, description="营业收入")
-    net_profit: Decimal | None = Field(None, description="净利润")
-    total_assets: Decimal | None = Field(None, description="总资产")
-    total_equity: Decimal | None = Field(None, description="股东权益")
-    roe: Decimal | None = Field(None, description="净资产收益率")
-    pe: Decimal | None = Field(None, description="市盈率")
-    pb: Decimal | None = Field(None, description="市净率")
-    debt_ratio: Decimal | None = Field(None, description="资产负债率")
-    gross_margin: Decimal | None = Field(None, description="毛利率")
+    revenue: float | None = Field(None, description="营业收入")
+    net_profit: float | None = Field(None, description="净利润")
+    total_assets: float | None = Field(None, description="总资产")
+    total_equity: float | None = Field(None, description="股东权益")
+    roe: float | None = Field(None, description="净资产收益率")
+    pe: float | None = Field(None, description="市盈率")
+    pb: float | None = Field(None, description="市净率")
+    debt_ratio: float | None = Field(None, description="资产负债率")
+    gross_margin: float | None = Field(None, description="毛利率")
+
+
+# 行情和财务列表的序列化适配器，模块加载时构建一次；dump_json/validate_json在pydantic-core中整体完成
+_QUOTES_ADAPTER = TypeAdapter(list[DailyQuote])
+_FINANCIALS_ADAPTER = TypeAdapter(list[Financial])
+
+
+def serialize_quotes(quotes: list[DailyQuote]) -> bytes:
+    """将日线行情列表序列化为JSON字节串
+
+    Args:
+        quotes: 日线行情列表
+
+    Returns:
+        bytes: UTF-8编码的JSON数组
+    """
+    return _QUOTES_ADAPTER.dump_json(quotes)
+
+
+def deserialize_quotes(data: bytes | str) -> list[DailyQuote]:
+    """从serialize_quotes生成的JSON还原日线行情列表"""
+    return _QUOTES_ADAPTER.validate_json(data)
+
+
+def serialize_financials(financials: list[Financial]) -> bytes:
+    """将财务数据列表序列化为JSON字节串
+
+    Args:
+        financials: 财务数据列表
+
+    Returns:
+        bytes: UTF-8编码的JSON数组
+    """
+    return _FINANCIALS_ADAPTER.dump_json(financials)
+
+
+def deserialize_financials(data: bytes | str) -> list[Financial]:
+    """从serialize_financials生成的JSON还原财务数据列表"""
+    return _FINANCIALS_ADAPTER.validate_json(data)
 
 
 class WatchlistItem(BaseModel):
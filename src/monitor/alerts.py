@@ -7,14 +7,15 @@
 - RSI超买/超卖预警
 """
 
+from collections import OrderedDict
 from datetime import datetime
 
-import pandas as pd
+import numpy as np
 from loguru import logger
 
-from src.analysis.indicators import calc_macd, calc_rsi
+from src.analysis.indicators import calc_macd_batch, calc_rsi_batch
 from src.data.repository import Repository
-from src.models.schemas import Alert, AlertType, WatchlistItem
+from src.models.schemas import Alert, AlertType, DailyQuote, WatchlistItem
 
 
 class AlertEngine:
@@ -25,11 +26,19 @@ class AlertEngine:
 
     # 异常波动阈值（百分比）
     VOLATILITY_THRESHOLD = 5.0
+    # 涨跌幅与阈值比较前保留的小数位数
+    CHANGE_PCT_DIGITS = 6
 
     # RSI超买/超卖阈值
     RSI_OVERBOUGHT_THRESHOLD = 80
     RSI_OVERSOLD_THRESHOLD = 20
 
+    # 检查预警时读取的行情天数
+    QUOTE_DAYS = 90
+
+    # 指标缓存最多保存的条目数，超出后淘汰最久未使用的条目
+    INDICATOR_CACHE_SIZE = 4096
+
     def __init__(self, repository: Repository):
         """初始化预警引擎
 
@@ -37,11 +46,17 @@ class AlertEngine:
             repository: 数据访问层
         """
         self.repository = repository
+        # (股票代码, 最新交易日, 最新收盘价, 数据天数) -> (前一日DIF, 前一日DEA, 当日DIF, 当日DEA, RSI)
+        self._indicator_cache: OrderedDict[
+            tuple[str, datetime, float, int], tuple[float, float, float, float, float]
+        ] = OrderedDict()
         logger.info("AlertEngine initialized")
 
     def check_all(self) -> list[Alert]:
         """检查所有自选股的预警条件
 
+        行情一次批量读取，MACD/RSI在收盘价矩阵上批量计算并按最新K线缓存，只为触发条件的股票构造预警
+
         Returns:
             触发的预警列表
         """
@@ -50,74 +65,154 @@ class AlertEngine:
             logger.debug("No watchlist items to check")
             return []
 
+        # 获取历史行情数据（至少需要60天用于计算技术指标）
+        try:
+            frames = self.repository.get_quotes_df_bulk([item.symbol for item in watchlist], days=self.QUOTE_DAYS)
+        except Exception as e:
+            logger.error(f"Error loading quotes for alert check: {e}")
+            return []
+
+        # 收盘价整列取出一次，最新行情和各项指标共用
+        closes: dict[str, np.ndarray] = {}
+        for item in watchlist:
+            df = frames.get(item.symbol)
+            if df is None or len(df) < 2:
+                logger.debug(f"Not enough quotes for {item.symbol}, skipping alert check")
+                continue
+            closes[item.symbol] = df["close"].to_numpy(np.float64)
+
+        try:
+            latest_dates = {symbol: frames[symbol]["trade_date"].iat[-1] for symbol in closes}
+            indicators = self._calc_indicators(closes, latest_dates)
+        except Exception as e:
+            logger.debug(f"Error calculating indicators: {e}")
+            indicators = {}
+
         all_alerts: list[Alert] = []
+        # 同一轮检查触发的预警共用一个触发时间
+        now = datetime.now()
 
         for item in watchlist:
+            symbol = item.symbol
+            if symbol not in closes:
+                continue
             try:
-                alerts = self._check_item(item)
-                all_alerts.extend(alerts)
+                current_price = float(closes[symbol][-1])
+                pre_close = float(frames[symbol]["pre_close"].iat[-1])
+                # 无前收盘价或前收盘价为0时没有涨跌幅
+                change_pct = DailyQuote.compute_change_pct(current_price, pre_close)
+                if change_pct is not None:
+                    # 浮点误差会让恰好5%的涨跌幅（如1.60→1.68）算成4.99999999999999，取整后再与阈值比较
+                    change_pct = round(change_pct, self.CHANGE_PCT_DIGITS)
+
+                # 先在调用处做浮点比较，未设置预警价格或涨跌幅未达阈值的股票不进入预警构造
+                # 1. 检查价格上限/下限预警
+                if item.alert_price_high is not None or item.alert_price_low is not None:
+                    all_alerts.extend(self._check_price_alerts(symbol, item, current_price, now))
+
+                # 2. 检查异常波动预警
+                if change_pct is not None and abs(change_pct) >= self.VOLATILITY_THRESHOLD:
+                    all_alerts.extend(self._check_volatility_alert(symbol, change_pct, now))
+
+                values = indicators.get(symbol)
+                if values is not None:
+                    prev_dif, prev_dea, dif, dea, rsi = values
+
+                    # 3. 检查MACD金叉预警
+                    all_alerts.extend(self._check_macd_golden_cross(symbol, (prev_dif, prev_dea), (dif, dea), now))
+
+                    # 4. 检查RSI超买/超卖预警
+                    all_alerts.extend(self._check_rsi_alerts(symbol, rsi, now))
             except Exception as e:
-                logger.error(f"Error checking alerts for {item.symbol}: {e}")
+                logger.error(f"Error checking alerts for {symbol}: {e}")
 
-        # 保存所有预警到数据库
-        for alert in all_alerts:
-            self.repository.save_alert(alert)
+        # 所有预警在一个事务中批量写入数据库
+        self.repository.save_alerts(all_alerts)
 
         return all_alerts
 
-    def _check_item(self, item: WatchlistItem) -> list[Alert]:
-        """检查单个自选股的预警条件
+    def _calc_indicators(
+        self, closes: dict[str, np.ndarray], latest_dates: dict[str, datetime]
+    ) -> dict[str, tuple[float, float, float, float, float]]:
+        """计算各股票的MACD/RSI指标值
+
+        以(股票代码, 最新交易日, 最新收盘价, 数据天数)为键做LRU缓存，盘中轮询时最新K线未变化的股票直接复用上次结果；
+        未命中的股票拼成收盘价矩阵批量计算
 
         Args:
-            item: 自选股项目
+            closes: 股票代码到按日期升序的收盘价数组的映射
+            latest_dates: 股票代码到最新交易日的映射
 
         Returns:
-            触发的预警列表
+            股票代码到(前一日DIF, 前一日DEA, 当日DIF, 当日DEA, RSI)的映射，数据不足无法计算的指标为NaN
         """
-        alerts: list[Alert] = []
-        symbol = item.symbol
-
-        # 获取历史行情数据（至少需要60天用于计算技术指标）
-        quotes = self.repository.get_quotes(symbol, days=90)
-        if len(quotes) < 2:
-            logger.debug(f"Not enough quotes for {symbol}, skipping alert check")
-            return alerts
-
-        # 转换为DataFrame便于计算
-        df = self._quotes_to_dataframe(quotes)
-
-        # 获取最新行情
-        latest_quote = quotes[-1]
-
-        # 1. 检查价格上限/下限预警
-        alerts.extend(self._check_price_alerts(symbol, item, latest_quote))
-
-        # 2. 检查异常波动预警
-        alerts.extend(self._check_volatility_alert(symbol, latest_quote))
+        results: dict[str, tuple[float, float, float, float, float]] = {}
+        missing = []
+        for symbol, series in closes.items():
+            key = (symbol, latest_dates[symbol], float(series[-1]), len(series))
+            cached = self._indicator_cache.get(key)
+            if cached is None:
+                missing.append(key)
+                continue
+            self._indicator_cache.move_to_end(key)
+            results[symbol] = cached
+
+        if not missing:
+            return results
+
+        series = [closes[key[0]] for key in missing]
+        matrix = self._close_matrix(series)
+        lengths = np.array([len(c) for c in series], dtype=np.int64)
+
+        difs, deas = calc_macd_batch(matrix, 2)
+        # 当日与前一日各自至少需要26个数据点才能计算MACD
+        difs[lengths < 27] = np.nan
+        deas[lengths < 27] = np.nan
+        # 数据不足14个时RSI为NaN
+        rsi = calc_rsi_batch(matrix)
+
+        for key, dif_pair, dea_pair, rsi_value in zip(missing, difs.tolist(), deas.tolist(), rsi.tolist()):
+            values = (dif_pair[0], dea_pair[0], dif_pair[1], dea_pair[1], rsi_value)
+            self._indicator_cache[key] = values
+            results[key[0]] = values
+        while len(self._indicator_cache) > self.INDICATOR_CACHE_SIZE:
+            self._indicator_cache.popitem(last=False)
+
+        return results
+
+    @staticmethod
+    def _close_matrix(series: list[np.ndarray]) -> np.ndarray:
+        """将各股票的收盘价数组拼成(股票数, 天数)矩阵
+
+        每行按日期升序右对齐，使各行最新交易日位于同一列，数据较少的行在左侧以NaN填充
 
-        # 3. 检查MACD金叉预警
-        alerts.extend(self._check_macd_golden_cross(symbol, df))
-
-        # 4. 检查RSI超买/超卖预警
-        alerts.extend(self._check_rsi_alerts(symbol, df))
+        Args:
+            series: 各股票按日期升序的收盘价数组
 
-        return alerts
+        Returns:
+            np.ndarray: float64收盘价矩阵
+        """
+        width = max((len(c) for c in series), default=0)
+        matrix = np.full((len(series), width), np.nan)
+        for row, c in zip(matrix, series):
+            row[width - len(c):] = c
+        return matrix
 
     def _check_price_alerts(
-        self, symbol: str, item: WatchlistItem, latest_quote
+        self, symbol: str, item: WatchlistItem, current_price: float, triggered_at: datetime
     ) -> list[Alert]:
         """检查价格上限/下限预警
 
         Args:
             symbol: 股票代码
             item: 自选股项目（包含预警价格设置）
-            latest_quote: 最新行情
+            current_price: 最新收盘价
+            triggered_at: 本轮检查的触发时间
 
         Returns:
             触发的预警列表
         """
         alerts: list[Alert] = []
-        current_price = float(latest_quote.close)
 
         # 检查价格上限
         if item.alert_price_high is not None:
@@ -127,7 +222,7 @@ class AlertEngine:
                     symbol=symbol,
                     alert_type=AlertType.PRICE_BREAK,
                     message=f"价格突破上限: 当前价格 {current_price:.2f} >= 上限 {high_threshold:.2f}",
-                    triggered_at=datetime.now(),
+                    triggered_at=triggered_at,
                     is_read=False,
                 )
                 alerts.append(alert)
@@ -141,7 +236,7 @@ class AlertEngine:
                     symbol=symbol,
                     alert_type=AlertType.PRICE_BREAK,
                     message=f"价格突破下限: 当前价格 {current_price:.2f} <= 下限 {low_threshold:.2f}",
-                    triggered_at=datetime.now(),
+                    triggered_at=triggered_at,
                     is_read=False,
                 )
                 alerts.append(alert)
@@ -149,23 +244,22 @@ class AlertEngine:
 
         return alerts
 
-    def _check_volatility_alert(self, symbol: str, latest_quote) -> list[Alert]:
+    def _check_volatility_alert(self, symbol: str, change_pct: float | None, triggered_at: datetime) -> list[Alert]:
         """检查异常波动预警
 
         Args:
             symbol: 股票代码
-            latest_quote: 最新行情
+            change_pct: 最新涨跌幅百分比，无前收盘价时为None
+            triggered_at: 本轮检查的触发时间
 
         Returns:
             触发的预警列表
         """
         alerts: list[Alert] = []
 
-        if latest_quote.change_pct is None:
+        if change_pct is None:
             return alerts
 
-        change_pct = float(latest_quote.change_pct)
-
         # 检查涨跌幅是否超过阈值
         if abs(change_pct) >= self.VOLATILITY_THRESHOLD:
             direction = "上涨" if change_pct > 0 else "下跌"
@@ -173,7 +267,7 @@ class AlertEngine:
                 symbol=symbol,
                 alert_type=AlertType.ABNORMAL_VOLATILITY,
                 message=f"异常波动: {direction} {abs(change_pct):.2f}%",
-                triggered_at=datetime.now(),
+                triggered_at=triggered_at,
                 is_read=False,
             )
             alerts.append(alert)
@@ -181,116 +275,78 @@ class AlertEngine:
 
         return alerts
 
-    def _check_macd_golden_cross(self, symbol: str, df: pd.DataFrame) -> list[Alert]:
+    def _check_macd_golden_cross(
+        self, symbol: str, prev: tuple[float, float], current: tuple[float, float], triggered_at: datetime
+    ) -> list[Alert]:
         """检查MACD金叉预警
 
         Args:
             symbol: 股票代码
-            df: 包含历史行情的DataFrame
+            prev: 前一日的(DIF, DEA)，数据不足时为NaN
+            current: 当日的(DIF, DEA)，数据不足时为NaN
+            triggered_at: 本轮检查的触发时间
 
         Returns:
             触发的预警列表
         """
         alerts: list[Alert] = []
 
-        # 至少需要26个数据点才能计算MACD
-        if len(df) < 26:
-            return alerts
+        prev_dif, prev_dea = prev
+        dif, dea = current
 
-        try:
-            # 计算当前MACD
-            current_macd = calc_macd(df)
-
-            # 计算前一天的MACD用于判断是否刚发生金叉
-            prev_df = df.iloc[:-1]
-            if len(prev_df) >= 26:
-                prev_macd = calc_macd(prev_df)
-
-                # 判断金叉：当前DIF>DEA且MACD>0，且前一天不满足
-                is_golden_cross = (
-                    current_macd.is_golden_cross()
-                    and not prev_macd.is_golden_cross()
-                )
-
-                if is_golden_cross:
-                    alert = Alert(
-                        symbol=symbol,
-                        alert_type=AlertType.MACD_GOLDEN_CROSS,
-                        message=f"MACD金叉: DIF({current_macd.dif:.4f}) > DEA({current_macd.dea:.4f})",
-                        triggered_at=datetime.now(),
-                        is_read=False,
-                    )
-                    alerts.append(alert)
-                    logger.info(f"MACD golden cross alert triggered for {symbol}")
+        # 判断金叉：当前DIF>DEA且MACD>0，且前一天不满足；NaN参与比较均为False，数据不足时不会触发
+        is_golden_cross = (dif > dea and (dif - dea) * 2 > 0) and not (
+            prev_dif > prev_dea and (prev_dif - prev_dea) * 2 > 0
+        )
 
-        except Exception as e:
-            logger.debug(f"Error checking MACD for {symbol}: {e}")
+        if is_golden_cross:
+            alert = Alert(
+                symbol=symbol,
+                alert_type=AlertType.MACD_GOLDEN_CROSS,
+                message=f"MACD金叉: DIF({dif:.4f}) > DEA({dea:.4f})",
+                triggered_at=triggered_at,
+                is_read=False,
+            )
+            alerts.append(alert)
+            logger.info(f"MACD golden cross alert triggered for {symbol}")
 
         return alerts
 
-    def _check_rsi_alerts(self, symbol: str, df: pd.DataFrame) -> list[Alert]:
+    def _check_rsi_alerts(self, symbol: str, rsi_value: float, triggered_at: datetime) -> list[Alert]:
         """检查RSI超买/超卖预警
 
         Args:
             symbol: 股票代码
-            df: 包含历史行情的DataFrame
+            rsi_value: 最新RSI，数据不足时为NaN
+            triggered_at: 本轮检查的触发时间
 
         Returns:
             触发的预警列表
         """
         alerts: list[Alert] = []
 
-        # 至少需要14个数据点才能计算RSI
-        if len(df) < 14:
-            return alerts
-
-        try:
-            rsi = calc_rsi(df)
-            rsi_value = float(rsi)
-
-            # 检查RSI超买
-            if rsi_value > self.RSI_OVERBOUGHT_THRESHOLD:
-                alert = Alert(
-                    symbol=symbol,
-                    alert_type=AlertType.RSI_OVERBOUGHT,
-                    message=f"RSI超买: RSI({rsi_value:.2f}) > {self.RSI_OVERBOUGHT_THRESHOLD}",
-                    triggered_at=datetime.now(),
-                    is_read=False,
-                )
-                alerts.append(alert)
-                logger.info(f"RSI overbought alert triggered for {symbol}: {rsi_value:.2f}")
-
-            # 检查RSI超卖
-            elif rsi_value < self.RSI_OVERSOLD_THRESHOLD:
-                alert = Alert(
-                    symbol=symbol,
-                    alert_type=AlertType.RSI_OVERSOLD,
-                    message=f"RSI超卖: RSI({rsi_value:.2f}) < {self.RSI_OVERSOLD_THRESHOLD}",
-                    triggered_at=datetime.now(),
-                    is_read=False,
-                )
-                alerts.append(alert)
-                logger.info(f"RSI oversold alert triggered for {symbol}: {rsi_value:.2f}")
+        # 检查RSI超买
+        if rsi_value > self.RSI_OVERBOUGHT_THRESHOLD:
+            alert = Alert(
+                symbol=symbol,
+                alert_type=AlertType.RSI_OVERBOUGHT,
+                message=f"RSI超买: RSI({rsi_value:.2f}) > {self.RSI_OVERBOUGHT_THRESHOLD}",
+                triggered_at=triggered_at,
+                is_read=False,
+            )
+            alerts.append(alert)
+            logger.info(f"RSI overbought alert triggered for {symbol}: {rsi_value:.2f}")
 
-        except Exception as e:
-            logger.debug(f"Error checking RSI for {symbol}: {e}")
+        # 检查RSI超卖
+        elif rsi_value < self.RSI_OVERSOLD_THRESHOLD:
+            alert = Alert(
+                symbol=symbol,
+                alert_type=AlertType.RSI_OVERSOLD,
+                message=f"RSI超卖: RSI({rsi_value:.2f}) < {self.RSI_OVERSOLD_THRESHOLD}",
+                triggered_at=triggered_at,
+                is_read=False,
+            )
+            alerts.append(alert)
+            logger.info(f"RSI oversold alert triggered for {symbol}: {rsi_value:.2f}")
 
         return alerts
-
-    def _quotes_to_dataframe(self, quotes: list) -> pd.DataFrame:
-        """将行情列表转换为DataFrame
-
-        Args:
-            quotes: 行情列表
-
-        Returns:
-            包含行情数据的DataFrame
-        """
-        data = {
-            "open": [float(q.open) for q in quotes],
-            "high": [float(q.high) for q in quotes],
-            "low": [float(q.low) for q in quotes],
-            "close": [float(q.close) for q in quotes],
-            "volume": [q.volume for q in quotes],
-        }
-        return pd.DataFrame(data)
@@ -4,6 +4,7 @@
 - 每15分钟更新自选股行情
 - 每日16:00同步日线数据
 - 每15分钟检查预警条件
+- 每小时执行数据库维护
 """
 
 
@@ -12,6 +13,7 @@ from loguru import logger
 
 from config.settings import Settings
 from src.data.repository import Repository
+from src.monitor.alerts import AlertEngine
 
 
 class DataScheduler:
@@ -21,6 +23,7 @@ class DataScheduler:
     1. update_watchlist_quotes: 每15分钟更新自选股行情
     2. sync_daily_data: 每日16:00同步日线数据
     3. check_alerts: 每15分钟检查预警条件
+    4. db_maintenance: 每小时执行数据库维护
     """
 
     def __init__(self, settings: Settings, repository: Repository):
@@ -32,6 +35,8 @@ class DataScheduler:
         """
         self.settings = settings
         self.repository = repository
+        # 预警引擎跨轮次复用，最新K线未变化的股票直接命中其指标缓存
+        self._alert_engine = AlertEngine(repository)
         self._scheduler: BackgroundScheduler | None = None
         logger.info("DataScheduler initialized")
 
@@ -76,10 +81,7 @@ class DataScheduler:
         检查所有自选股的预警条件是否触发
         """
         try:
-            from src.monitor.alerts import AlertEngine
-
-            engine = AlertEngine(self.repository)
-            alerts = engine.check_all()
+            alerts = self._alert_engine.check_all()
 
             if alerts:
                 logger.info(f"Generated {len(alerts)} alerts")
@@ -88,6 +90,16 @@ class DataScheduler:
         except Exception as e:
             logger.error(f"Error checking alerts: {e}")
 
+    def _db_maintenance(self):
+        """数据库维护
+
+        截断SQLite的WAL文件并刷新查询规划器统计信息
+        """
+        try:
+            self.repository.maintenance()
+        except Exception as e:
+            logger.error(f"Error running database maintenance: {e}")
+
     def start(self):
         """启动调度器
 
@@ -95,6 +107,7 @@ class DataScheduler:
         - update_watchlist_quotes: 每15分钟执行一次
         - sync_daily_data: 每日16:00执行
         - check_alerts: 每15分钟执行一次
+        - db_maintenance: 每小时执行一次
         """
         if self._scheduler is not None and self._scheduler.running:
             logger.warning("Scheduler is already running")
@@ -130,8 +143,19 @@ class DataScheduler:
             replace_existing=True,
         )
 
+        # 每小时执行数据库维护
+        self._scheduler.add_job(
+            self._db_maintenance,
+            "interval",
+            hours=1,
+            id="db_maintenance",
+            replace_existing=True,
+        )
+
         self._scheduler.start()
-        logger.info("DataScheduler started with jobs: update_watchlist_quotes, sync_daily_data, check_alerts")
+        logger.info(
+            "DataScheduler started with jobs: update_watchlist_quotes, sync_daily_data, check_alerts, db_maintenance"
+        )
 
     def stop(self):
         """停止调度器
@@ -7,13 +7,13 @@ from datetime import datetime
 
 import streamlit as st
 
-from src.data.repository import Repository
+from src.resources import get_repo
 
 
 def init_session_state():
     """初始化会话状态"""
     if "repository" not in st.session_state:
-        st.session_state.repository = Repository("sqlite:///stock_analyzer.db")
+        st.session_state.repository = get_repo()
 
 
 def main():
@@ -92,7 +92,7 @@ def main():
 
         with col3:
             if latest_quote and latest_quote.change_pct:
-                change = float(latest_quote.change_pct)
+                change = latest_quote.change_pct
                 color = "green" if change >= 0 else "red"
                 st.markdown(f":{color}[{change:+.2f}%]")
             else:
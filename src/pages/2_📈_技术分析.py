@@ -11,13 +11,13 @@ from plotly.subplots import make_subplots
 
 from src.analysis.indicators import calc_ma, calc_macd
 from src.analysis.technical import TechnicalAnalyzer
-from src.data.repository import Repository
+from src.resources import get_repo
 
 
 def init_session_state():
     """初始化会话状态"""
     if "repository" not in st.session_state:
-        st.session_state.repository = Repository("sqlite:///stock_analyzer.db")
+        st.session_state.repository = get_repo()
 
 
 def create_candlestick_chart(df: pd.DataFrame, indicators: dict = None) -> go.Figure:
@@ -180,21 +180,9 @@ def main():
         # K线图
         st.subheader("📊 K线图")
 
-        # 获取行情数据
-        quotes = repo.get_quotes(selected_symbol, days)
-        if quotes:
-            # 转换为DataFrame
-            data = {
-                "trade_date": [q.trade_date for q in quotes],
-                "open": [float(q.open) for q in quotes],
-                "high": [float(q.high) for q in quotes],
-                "low": [float(q.low) for q in quotes],
-                "close": [float(q.close) for q in quotes],
-                "volume": [q.volume for q in quotes],
-            }
-            df = pd.DataFrame(data)
-            df["trade_date"] = pd.to_datetime(df["trade_date"])
-            df = df.sort_values("trade_date").reset_index(drop=True)
+        # 获取行情数据（已按交易日期升序）
+        df = repo.get_quotes_df(selected_symbol, days)
+        if not df.empty:
 
             # 计算指标
             ma_dict = calc_ma(df, [5, 10, 20])
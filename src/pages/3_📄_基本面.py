@@ -9,13 +9,13 @@ import plotly.graph_objects as go
 import streamlit as st
 
 from src.analysis.fundamental import FundamentalAnalyzer
-from src.data.repository import Repository
+from src.resources import get_repo
 
 
 def init_session_state():
     """初始化会话状态"""
     if "repository" not in st.session_state:
-        st.session_state.repository = Repository("sqlite:///stock_analyzer.db")
+        st.session_state.repository = get_repo()
 
 
 def create_radar_chart(scores: dict) -> go.Figure:
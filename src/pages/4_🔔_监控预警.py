@@ -7,14 +7,14 @@ from datetime import datetime
 
 import streamlit as st
 
-from src.data.repository import Repository
 from src.models.schemas import AlertType
+from src.resources import get_repo
 
 
 def init_session_state():
     """初始化会话状态"""
     if "repository" not in st.session_state:
-        st.session_state.repository = Repository("sqlite:///stock_analyzer.db")
+        st.session_state.repository = get_repo()
 
 
 def main():
@@ -3,20 +3,23 @@ AI助手页面
 AI对话分析股票
 """
 
+from datetime import datetime
 
 import streamlit as st
 
 from config.settings import get_settings
+from src.ai.cache import ResponseCache
 from src.ai.client import AIClient
 from src.analysis.fundamental import FundamentalAnalyzer
 from src.analysis.technical import TechnicalAnalyzer
 from src.data.repository import Repository
+from src.resources import get_repo
 
 
 def init_session_state():
     """初始化会话状态"""
     if "repository" not in st.session_state:
-        st.session_state.repository = Repository("sqlite:///stock_analyzer.db")
+        st.session_state.repository = get_repo()
 
     if "ai_client" not in st.session_state:
         settings = get_settings()
@@ -25,6 +28,7 @@ def init_session_state():
                 api_key=settings.openai_api_key,
                 base_url=settings.openai_base_url,
                 model=settings.openai_model,
+                cache=ResponseCache(),
             )
         else:
             st.session_state.ai_client = None
@@ -51,8 +55,8 @@ def get_stock_context(symbol: str, repo: Repository) -> dict:
     # 获取最新行情
     latest_quote = repo.get_latest_quote(symbol)
     if latest_quote:
-        context["price"] = float(latest_quote.close)
-        context["change_pct"] = float(latest_quote.change_pct) if latest_quote.change_pct else 0
+        context["price"] = latest_quote.close
+        context["change_pct"] = latest_quote.change_pct or 0
 
     # 获取技术分析
     tech_analyzer = TechnicalAnalyzer(repo)
@@ -135,7 +139,7 @@ def main():
             latest_quote = repo.get_latest_quote(selected_symbol)
             if latest_quote:
                 st.metric("最新价", f"{latest_quote.close:.2f}",
-                         delta=f"{float(latest_quote.change_pct):.2f}%" if latest_quote.change_pct else None)
+                         delta=f"{latest_quote.change_pct:.2f}%" if latest_quote.change_pct else None)
 
         st.markdown("---")
 
@@ -260,12 +264,10 @@ def main():
                         "RSI": float(tech_report.indicators.rsi) if tech_report.indicators and tech_report.indicators.rsi else None,
                     }
 
-                    # 调用AI分析
-                    analysis = ai_client.analyze_stock(symbol, fundamental_data, technical_data)
-
+                # 流式调用AI分析，边生成边展示
                 st.markdown("#### 📊 AI分析报告")
-                st.markdown(analysis.summary)
-                st.markdown(f"*生成时间: {analysis.generated_at.strftime('%Y-%m-%d %H:%M')}*")
+                st.write_stream(ai_client.analyze_stock_stream(symbol, fundamental_data, technical_data))
+                st.markdown(f"*生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M')}*")
 
             st.markdown("---")
 
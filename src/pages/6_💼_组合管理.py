@@ -8,17 +8,17 @@ from decimal import Decimal
 
 import streamlit as st
 
-from src.data.repository import Repository
 from src.models.portfolio import AccountType, TradeType
 from src.portfolio.account_manager import AccountManager
 from src.portfolio.position_service import PositionService
 from src.portfolio.transaction_service import TransactionService
+from src.resources import get_repo
 
 
 def init_session_state():
     """初始化会话状态"""
     if "repository" not in st.session_state:
-        st.session_state.repository = Repository("sqlite:///stock_analyzer.db")
+        st.session_state.repository = get_repo()
 
     if "account_manager" not in st.session_state:
         repo = st.session_state.repository
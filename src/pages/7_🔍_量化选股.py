@@ -7,8 +7,8 @@ from datetime import datetime
 
 import streamlit as st
 
-from src.data.repository import Repository
 from src.models.schemas import Market
+from src.resources import get_repo
 from src.screening.screener import StockScreener
 from src.screening.strategies import StrategyRegistry
 
@@ -16,7 +16,7 @@ from src.screening.strategies import StrategyRegistry
 def init_session_state():
     """初始化会话状态"""
     if "repository" not in st.session_state:
-        st.session_state.repository = Repository("sqlite:///stock_analyzer.db")
+        st.session_state.repository = get_repo()
     if "screen_results" not in st.session_state:
         st.session_state.screen_results = []
     if "selected_symbols" not in st.session_state:
@@ -66,7 +66,8 @@ class PositionService:
 
         # 获取当前价格
         latest_quote = self.repo.get_latest_quote(symbol)
-        current_price = latest_quote.close if latest_quote else Decimal("0")
+        # 行情价格为float，参与金额计算前转换为Decimal
+        current_price = Decimal(str(latest_quote.close)) if latest_quote else Decimal("0")
 
         market_value = current_price * total_shares
         cost_value = total_cost
@@ -0,0 +1,18 @@
+"""
+Streamlit共享资源
+首页与各页面共用的进程级资源
+"""
+
+import streamlit as st
+
+from src.data.repository import Repository
+
+
+@st.cache_resource
+def get_repo() -> Repository:
+    """获取全局共享的Repository
+
+    SQLAlchemy引擎线程安全，由所有会话和页面共用，避免每个页面各建一套连接池
+    """
+    # 使用SQLite作为默认数据库（测试模式）
+    return Repository("sqlite:///stock_analyzer.db")
@@ -69,8 +69,8 @@ class StockScreener:
                     continue
 
                 latest = financials[-1]
-                pe = float(latest.pe) if latest.pe else None
-                pb = float(latest.pb) if latest.pb else None
+                pe = latest.pe
+                pb = latest.pb
 
                 if pe and pb and pe <= max_pe and pb <= max_pb:
                     score = self._calculate_value_score(pe, pb, params)
@@ -137,7 +137,7 @@ class StockScreener:
                     continue
 
                 latest = financials[-1]
-                pe = float(latest.pe) if latest.pe else None
+                pe = latest.pe
 
                 if pe and pe <= max_pe:
                     score = max(0, 100 - pe * 5)
@@ -169,7 +169,7 @@ class StockScreener:
                 if not quote:
                     continue
 
-                current_price = float(quote.close)
+                current_price = quote.close
 
                 ma_value = None
                 if ma_period == 5 and report.indicators.ma5:
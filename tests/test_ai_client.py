@@ -2,10 +2,14 @@
 AI客户端测试
 """
 
+import asyncio
+
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 from datetime import datetime
+from decimal import Decimal
 
+from src.ai.cache import ResponseCache
 from src.ai.client import AIClient
 from src.ai.prompts import Prompts
 from src.models.schemas import AIAnalysis
@@ -19,6 +23,13 @@ class TestPrompts:
         assert Prompts.SYSTEM_ANALYST is not None
         assert "股票分析师" in Prompts.SYSTEM_ANALYST
 
+    def test_system_analyst_tokens(self):
+        """测试系统提示词token数首次调用时统计并缓存（tiktoken不可用时为None）"""
+        tokens = Prompts.system_analyst_tokens()
+
+        assert tokens is None or 0 < tokens < len(Prompts.SYSTEM_ANALYST) * 2
+        assert Prompts.system_analyst_tokens() == tokens
+
     def test_stock_analysis_with_data(self):
         """测试股票分析提示词生成（有数据）"""
         fundamental = {"PE": 15.5, "ROE": 12.3}
@@ -42,6 +53,34 @@ class TestPrompts:
         assert "暂无基本面数据" in prompt
         assert "暂无技术面数据" in prompt
 
+    def test_stock_analysis_stable_prefix(self):
+        """测试固定指令位于提示词开头，动态数据位于末尾"""
+        prompt_a = Prompts.stock_analysis("000001.SZ", {"PE": 15.5}, {})
+        prompt_b = Prompts.stock_analysis("600000.SH", {"PE": 8.1}, {})
+
+        assert prompt_a.startswith(Prompts.STOCK_ANALYSIS_INSTRUCTIONS)
+        assert prompt_b.startswith(Prompts.STOCK_ANALYSIS_INSTRUCTIONS)
+        assert prompt_a.index("000001.SZ") > len(Prompts.STOCK_ANALYSIS_INSTRUCTIONS)
+
+    def test_stock_analysis_cached_by_value_type(self):
+        """测试提示词缓存区分相等但类型不同的值，且不可哈希的值可以正常生成"""
+        prompt_int = Prompts.stock_analysis("000001.SZ", {"PE": 15}, {})
+        prompt_float = Prompts.stock_analysis("000001.SZ", {"PE": 15.0}, {})
+        prompt_list = Prompts.stock_analysis("000001.SZ", {"信号": ["金叉"]}, {})
+
+        assert "- PE: 15\n" in prompt_int + "\n"
+        assert "- PE: 15.0" in prompt_float
+        assert "- 信号: ['金叉']" in prompt_list
+        assert Prompts.stock_analysis("000001.SZ", {"PE": 15}, {}) is prompt_int
+
+    def test_stock_analysis_normalizes_decimal(self):
+        """测试数值相同、写法不同的Decimal共用缓存且格式化结果一致"""
+        prompt = Prompts.stock_analysis("000001.SZ", {"ROE": Decimal("1.10"), "营收": Decimal("100")}, {})
+
+        assert "- ROE: 1.1\n" in prompt
+        assert "- 营收: 100\n" in prompt
+        assert Prompts.stock_analysis("000001.SZ", {"ROE": Decimal("1.1"), "营收": Decimal("1E+2")}, {}) is prompt
+
     def test_quick_question_with_context(self):
         """测试快速问题提示词（有上下文）"""
         prompt = Prompts.quick_question("这只股票怎么样？", "PE=15, ROE=20%")
@@ -89,6 +128,25 @@ class TestAIClient:
         )
         assert client.model == "gpt-3.5-turbo"
 
+    def test_system_message_cache_control(self, mock_openai_client):
+        """测试Anthropic兼容接口的系统提示词带缓存标记"""
+        openai_client = AIClient(api_key="test_key", base_url="https://api.test.com/v1")
+        anthropic_client = AIClient(api_key="test_key", base_url="https://api.anthropic.com/v1/")
+
+        assert openai_client._system_message() == {"role": "system", "content": Prompts.SYSTEM_ANALYST}
+        block = anthropic_client._system_message()["content"][0]
+        assert block["text"] == Prompts.SYSTEM_ANALYST
+        assert block["cache_control"] == {"type": "ephemeral"}
+
+    def test_system_prompt_tokens_counted_only_when_cached(self, mock_openai_client):
+        """测试只有需要缓存系统提示词时才统计token数"""
+        with patch.object(Prompts, "system_analyst_tokens", return_value=10) as tokens:
+            AIClient(api_key="test_key", base_url="https://api.test.com/v1")
+            assert tokens.call_count == 0
+
+            AIClient(api_key="test_key", base_url="https://api.anthropic.com/v1/")
+            assert tokens.call_count == 1
+
     def test_analyze_stock_success(self, ai_client, mock_openai_client):
         """测试股票分析成功"""
         # 设置Mock返回值
@@ -122,6 +180,24 @@ class TestAIClient:
         assert "分析失败" in result.summary
         assert result.confidence == 0
 
+    def test_analyze_stock_stream(self, ai_client):
+        """测试流式分析逐段返回内容"""
+        chunks = [Mock(choices=[Mock(delta=Mock(content=text))]) for text in ("这是", None, "分析报告")]
+        ai_client.client.chat.completions.create.return_value = iter(chunks)
+
+        parts = list(ai_client.analyze_stock_stream("000001.SZ", {"PE": 15}, {"MA5": 10}))
+
+        assert parts == ["这是", "分析报告"]
+        assert ai_client.client.chat.completions.create.call_args.kwargs["stream"] is True
+
+    def test_analyze_stock_stream_failure(self, ai_client):
+        """测试流式分析失败时返回错误信息"""
+        ai_client.client.chat.completions.create.side_effect = Exception("API Error")
+
+        parts = list(ai_client.analyze_stock_stream("000001.SZ", {}, {}))
+
+        assert parts == ["分析失败: API Error"]
+
     def test_chat_success(self, ai_client):
         """测试对话成功"""
         mock_response = Mock()
@@ -163,6 +239,119 @@ class TestAIClient:
 
         assert "分析失败" in result
 
+    def test_analyze_stocks_concurrent(self, ai_client):
+        """测试并发批量分析"""
+        mock_response = Mock()
+        mock_response.choices = [Mock(message=Mock(content="批量分析结果"))]
+        ai_client.aclient = MagicMock()
+        ai_client.aclient.chat.completions.create = AsyncMock(
+            side_effect=[mock_response, Exception("API Error")]
+        )
+
+        results = asyncio.run(
+            ai_client.analyze_stocks([
+                ("000001.SZ", {"PE": 15}, {"MA5": 10}),
+                ("600000.SH", {}, {}),
+            ])
+        )
+
+        assert [r.symbol for r in results] == ["000001.SZ", "600000.SH"]
+        assert results[0].summary == "批量分析结果"
+        assert results[1].confidence == 0
+        assert ai_client.aclient.chat.completions.create.await_count == 2
+
+
+class TestResponseCache:
+    """AI响应缓存测试"""
+
+    def test_exact_hit(self):
+        """测试精确命中"""
+        cache = ResponseCache(":memory:")
+        messages = [{"role": "user", "content": "分析000001.SZ"}]
+        key = ResponseCache.make_key("gpt-4", messages)
+
+        assert cache.get(key) is None
+        cache.put(key, "缓存的回复")
+        assert cache.get(key) == "缓存的回复"
+        assert ResponseCache.make_key("gpt-3.5-turbo", messages) != key
+
+    def test_semantic_hit(self):
+        """测试语义相似命中"""
+        vectors = {"平安银行怎么样": [1.0, 0.0], "平安银行如何": [0.99, 0.05], "天气如何": [0.0, 1.0]}
+        cache = ResponseCache(":memory:", embedder=vectors.__getitem__, similarity_threshold=0.95)
+        cache.put(b"k1", "平安银行分析", "平安银行怎么样", b"scope")
+
+        assert cache.get(b"k2", "平安银行如何", b"scope") == "平安银行分析"
+        assert cache.get(b"k3", "天气如何", b"scope") is None
+
+    def test_semantic_hit_limited_to_scope(self):
+        """测试语义匹配只在同一作用域内进行"""
+        vectors = {"今天走势如何": [1.0, 0.0]}
+        cache = ResponseCache(":memory:", embedder=vectors.__getitem__)
+        history_a = [{"role": "user", "content": "介绍一下平安银行"}]
+        history_b = [{"role": "user", "content": "介绍一下贵州茅台"}]
+        cache.put(b"k1", "平安银行走势", "今天走势如何", ResponseCache.make_scope("gpt-4", history_a))
+
+        assert cache.get(b"k2", "今天走势如何", ResponseCache.make_scope("gpt-4", history_a)) == "平安银行走势"
+        assert cache.get(b"k2", "今天走势如何", ResponseCache.make_scope("gpt-4", history_b)) is None
+        assert cache.get(b"k2", "今天走势如何", ResponseCache.make_scope("gpt-3.5-turbo", history_a)) is None
+        assert cache.get(b"k2", "今天走势如何") is None
+
+    def test_expired_entries(self):
+        """测试过期条目不再命中，并在写入时清除"""
+        vectors = {"平安银行怎么样": [1.0, 0.0]}
+        cache = ResponseCache(":memory:", embedder=vectors.__getitem__, max_age=60)
+        with patch("src.ai.cache.time.time", return_value=1_000_000):
+            cache.put(b"k1", "旧的回复", "平安银行怎么样")
+
+        with patch("src.ai.cache.time.time", return_value=1_000_061):
+            assert cache.get(b"k1") is None
+            assert cache.get(b"k2", "平安银行怎么样") is None
+            cache.put(b"k3", "新的回复")
+
+        assert cache._conn.execute("SELECT key FROM responses").fetchall() == [(b"k3",)]
+
+    def test_client_uses_cache(self):
+        """测试客户端命中缓存时不再调用接口"""
+        with patch("src.ai.client.OpenAI"):
+            client = AIClient(api_key="test_key", base_url="https://api.test.com/v1", cache=ResponseCache(":memory:"))
+        mock_response = Mock()
+        mock_response.choices = [Mock(message=Mock(content="快速分析结果"))]
+        client.client.chat.completions.create.return_value = mock_response
+
+        first = client.quick_analyze("000001.SZ", "这只股票值得买入吗？")
+        second = client.quick_analyze("000001.SZ", "这只股票值得买入吗？")
+
+        assert first == second == "快速分析结果"
+        assert client.client.chat.completions.create.call_count == 1
+
+    def test_client_semantic_text_and_scope(self):
+        """测试客户端只用问题或动态数据做语义匹配，并按股票代码隔离"""
+        embedded = []
+
+        def embedder(text):
+            embedded.append(text)
+            return [1.0, 0.0]
+
+        with patch("src.ai.client.OpenAI"):
+            client = AIClient(
+                api_key="test_key",
+                base_url="https://api.test.com/v1",
+                cache=ResponseCache(":memory:", embedder=embedder),
+            )
+        mock_response = Mock()
+        mock_response.choices = [Mock(message=Mock(content="分析结果"))]
+        client.client.chat.completions.create.return_value = mock_response
+
+        client.quick_analyze("000001.SZ", "值得买入吗？")
+        client.quick_analyze("600000.SH", "值得买入吗？")
+        client.analyze_stock("000001.SZ", {"PE": 15}, {})
+        client.analyze_stock("600000.SH", {"PE": 15}, {})
+
+        assert client.client.chat.completions.create.call_count == 4
+        assert "值得买入吗？" in embedded
+        assert not any(Prompts.STOCK_ANALYSIS_INSTRUCTIONS in text for text in embedded)
+
 
 class TestAIAnalysis:
     """AI分析结果模型测试"""
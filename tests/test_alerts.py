@@ -0,0 +1,189 @@
+"""
+预警引擎测试
+"""
+
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import text
+
+from src.data.repository import Repository
+from src.models.schemas import AlertType, DailyQuote
+from src.monitor import alerts as alerts_module
+from src.monitor.alerts import AlertEngine
+
+
+def _save_closes(repo: Repository, symbol: str, closes: list[float]):
+    """以昨天为最后一个交易日，按日期升序写入收盘价序列"""
+    today = date.today()
+    repo.save_quotes([
+        DailyQuote(
+            symbol=symbol,
+            trade_date=today - timedelta(days=len(closes) - i),
+            open=price,
+            high=price,
+            low=price,
+            close=price,
+            volume=1000,
+            pre_close=closes[i - 1] if i > 0 else None,
+        )
+        for i, price in enumerate(closes)
+    ])
+
+
+@pytest.fixture
+def repo():
+    return Repository("sqlite:///:memory:")
+
+
+def _set_alert_prices(repo: Repository, symbol: str, high: float | None = None, low: float | None = None):
+    """设置自选股的预警价格"""
+    with repo.engine.begin() as conn:
+        conn.execute(
+            text("UPDATE watchlist SET alert_price_high = :high, alert_price_low = :low WHERE symbol = :symbol"),
+            {"symbol": symbol, "high": high, "low": low},
+        )
+
+
+def _golden_cross_closes(days: int) -> list[float]:
+    """持续下跌后最后一天大幅反弹的收盘价序列，最后一天MACD由死叉转为金叉"""
+    closes = [100 - 0.5 * i for i in range(days - 1)]
+    return closes + [closes[-1] + 6]
+
+
+def _alert_types(alerts, symbol: str) -> list[AlertType]:
+    """按触发顺序取出指定股票的预警类型"""
+    return [a.alert_type for a in alerts if a.symbol == symbol]
+
+
+class TestCheckAll:
+    """check_all预警检查测试"""
+
+    def test_empty_watchlist(self, repo):
+        """测试没有自选股时不产生预警"""
+        assert AlertEngine(repo).check_all() == []
+
+    def test_price_alerts(self, repo):
+        """测试价格上限/下限预警"""
+        _save_closes(repo, "000001.SZ", [10.0] * 5 + [10.2])
+        _save_closes(repo, "600000.SH", [10.0] * 5 + [9.8])
+        _save_closes(repo, "000002.SZ", [10.0] * 5 + [10.0])
+        for symbol in ("000001.SZ", "600000.SH", "000002.SZ"):
+            repo.add_to_watchlist(symbol)
+            _set_alert_prices(repo, symbol, high=10.1, low=9.9)
+
+        alerts = AlertEngine(repo).check_all()
+
+        assert [a.message for a in alerts if a.symbol == "000001.SZ"] == ["价格突破上限: 当前价格 10.20 >= 上限 10.10"]
+        assert [a.message for a in alerts if a.symbol == "600000.SH"] == ["价格突破下限: 当前价格 9.80 <= 下限 9.90"]
+        assert _alert_types(alerts, "000002.SZ") == []
+
+    def test_volatility_threshold(self, repo):
+        """测试涨跌幅达到阈值时触发异常波动预警"""
+        _save_closes(repo, "000001.SZ", [10.0] * 5 + [10.5])
+        _save_closes(repo, "600000.SH", [10.0] * 5 + [9.5])
+        _save_closes(repo, "000002.SZ", [10.0] * 5 + [10.49])
+        for symbol in ("000001.SZ", "600000.SH", "000002.SZ"):
+            repo.add_to_watchlist(symbol)
+
+        alerts = AlertEngine(repo).check_all()
+
+        assert [a.message for a in alerts if a.symbol == "000001.SZ"] == ["异常波动: 上涨 5.00%"]
+        assert [a.message for a in alerts if a.symbol == "600000.SH"] == ["异常波动: 下跌 5.00%"]
+        assert _alert_types(alerts, "000002.SZ") == []
+
+    def test_volatility_exact_threshold(self, repo):
+        """测试浮点误差下恰好5%的涨跌幅（1.60→1.68）仍触发异常波动预警"""
+        _save_closes(repo, "000001.SZ", [1.60] * 5 + [1.68])
+        repo.add_to_watchlist("000001.SZ")
+
+        alerts = AlertEngine(repo).check_all()
+
+        assert [a.message for a in alerts] == ["异常波动: 上涨 5.00%"]
+
+    def test_macd_golden_cross(self, repo):
+        """测试MACD金叉预警，当日与前一日都需至少26个数据点"""
+        _save_closes(repo, "000001.SZ", _golden_cross_closes(27))
+        _save_closes(repo, "600000.SH", _golden_cross_closes(26))
+        _save_closes(repo, "000002.SZ", [100 - 0.5 * i for i in range(40)])
+        for symbol in ("000001.SZ", "600000.SH", "000002.SZ"):
+            repo.add_to_watchlist(symbol)
+
+        alerts = AlertEngine(repo).check_all()
+
+        assert AlertType.MACD_GOLDEN_CROSS in _alert_types(alerts, "000001.SZ")
+        assert AlertType.MACD_GOLDEN_CROSS not in _alert_types(alerts, "600000.SH")
+        assert AlertType.MACD_GOLDEN_CROSS not in _alert_types(alerts, "000002.SZ")
+
+    def test_rsi_alerts(self, repo):
+        """测试RSI超买/超卖预警，数据不足14个时不检查"""
+        _save_closes(repo, "000001.SZ", [10 + 0.1 * i for i in range(20)])
+        _save_closes(repo, "600000.SH", [10 - 0.1 * i for i in range(20)])
+        _save_closes(repo, "000002.SZ", [10 + 0.1 * i for i in range(13)])
+        for symbol in ("000001.SZ", "600000.SH", "000002.SZ"):
+            repo.add_to_watchlist(symbol)
+
+        alerts = AlertEngine(repo).check_all()
+
+        assert _alert_types(alerts, "000001.SZ") == [AlertType.RSI_OVERBOUGHT]
+        assert _alert_types(alerts, "600000.SH") == [AlertType.RSI_OVERSOLD]
+        assert _alert_types(alerts, "000002.SZ") == []
+
+    def test_insufficient_quotes_skipped(self, repo):
+        """测试不足2根K线或没有行情的股票被跳过，不影响其他股票"""
+        _save_closes(repo, "000001.SZ", [10.0])
+        _save_closes(repo, "600000.SH", [10.0] * 5 + [10.5])
+        for symbol in ("000001.SZ", "600000.SH", "000002.SZ"):
+            repo.add_to_watchlist(symbol)
+            _set_alert_prices(repo, symbol, high=1.0)
+
+        alerts = AlertEngine(repo).check_all()
+
+        assert {a.symbol for a in alerts} == {"600000.SH"}
+
+    def test_alerts_saved_in_one_batch(self, repo):
+        """测试本轮触发的预警一次批量保存，且共用同一触发时间"""
+        _save_closes(repo, "000001.SZ", [10 + 0.1 * i for i in range(20)])
+        _save_closes(repo, "600000.SH", [10.0] * 5 + [10.5])
+        for symbol in ("000001.SZ", "600000.SH"):
+            repo.add_to_watchlist(symbol)
+
+        with patch.object(repo, "save_alerts", wraps=repo.save_alerts) as save_alerts:
+            alerts = AlertEngine(repo).check_all()
+
+        save_alerts.assert_called_once_with(alerts)
+        assert len(alerts) == 2
+        assert len({a.triggered_at for a in alerts}) == 1
+        assert sorted(a.message for a in repo.get_alerts()) == sorted(a.message for a in alerts)
+
+
+class TestIndicatorCache:
+    """指标缓存测试"""
+
+    def test_unchanged_bars_hit_cache(self, repo):
+        """测试最新K线未变化时第二次检查不重新计算指标"""
+        _save_closes(repo, "000001.SZ", [100 + i * 0.5 for i in range(40)])
+        repo.add_to_watchlist("000001.SZ")
+        engine = AlertEngine(repo)
+
+        with patch.object(alerts_module, "calc_macd_batch", wraps=alerts_module.calc_macd_batch) as calc_macd_batch:
+            first = engine.check_all()
+            second = engine.check_all()
+
+        assert calc_macd_batch.call_count == 1
+        assert [a.alert_type for a in second] == [a.alert_type for a in first]
+
+    def test_revised_latest_close_misses_cache(self, repo):
+        """测试最新收盘价被修正后重新计算指标"""
+        closes = [100 + i * 0.5 for i in range(40)]
+        _save_closes(repo, "000001.SZ", closes)
+        repo.add_to_watchlist("000001.SZ")
+        engine = AlertEngine(repo)
+        engine.check_all()
+
+        _save_closes(repo, "000001.SZ", closes[:-1] + [closes[-1] + 1])
+        with patch.object(alerts_module, "calc_macd_batch", wraps=alerts_module.calc_macd_batch) as calc_macd_batch:
+            engine.check_all()
+
+        assert calc_macd_batch.call_count == 1
@@ -6,9 +6,10 @@ from datetime import date, timedelta
 from decimal import Decimal
 from unittest.mock import MagicMock
 
+import numpy as np
 import pytest
 
-from src.analysis.fundamental import FundamentalAnalyzer
+from src.analysis.fundamental import _PE_EDGES, _PE_SCORES, FundamentalAnalyzer, _bucket_score
 from src.data.repository import Repository
 from src.models.schemas import Financial
 
@@ -517,3 +518,24 @@ class TestFundamentalAnalyzerEdgeCases:
 
         # 应该能够处理零营收
         assert report.growth.score >= 0
+
+    def test_analyze_many(self, mock_repository, sample_financials):
+        """测试批量分析"""
+        mock_repository.get_financials_bulk.return_value = {"000001.SZ": sample_financials}
+
+        analyzer = FundamentalAnalyzer(mock_repository)
+        reports = analyzer.analyze_many(["000001.SZ", "000002.SZ"], years=5)
+
+        mock_repository.get_financials_bulk.assert_called_once_with(["000001.SZ", "000002.SZ"], 5)
+        assert [r.symbol for r in reports] == ["000001.SZ", "000002.SZ"]
+        assert reports[0].overall_score == analyzer._analyze_from_data("000001.SZ", sample_financials).overall_score
+        assert reports[1].overall_score == 0
+
+    def test_bucket_score_boundaries(self):
+        """测试分档查找表的边界与向量化计算"""
+        pes = np.array([-5, 0, 0.1, 15, 24.9, 25, 40, 100])
+
+        deltas = _bucket_score(pes, _PE_EDGES, _PE_SCORES)
+
+        assert deltas.tolist() == [-20, -20, 20, 10, 10, 0, -10, -10]
+        assert _bucket_score(Decimal("15"), _PE_EDGES, _PE_SCORES) == 10
@@ -1,3 +1,7 @@
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
 import pytest
 from src.data.futu_provider import FutuProvider
 from src.models.schemas import Market
@@ -21,3 +25,58 @@ def test_parse_symbol_without_suffix(provider):
     symbol, market = provider._parse_symbol("00700")
     assert symbol == "HK.00700"
     assert market == Market.HK_STOCK
+
+
+def _mock_ctx(method: str, df: pd.DataFrame) -> MagicMock:
+    ctx = MagicMock()
+    getattr(ctx, method).return_value = (0, df)
+    return ctx
+
+
+def test_get_daily_quotes(provider):
+    """测试日线行情转换"""
+    df = pd.DataFrame({
+        "time_key": ["2024-01-02", "2024-01-03"],
+        "open": [380.0, 385.2],
+        "high": [388.4, 390.0],
+        "low": [378.6, 383.0],
+        "close": [386.2, 388.8],
+        "volume": [12000000, 15000000],
+        "turnover": [4.6e9, 5.8e9],
+    })
+    ctx = _mock_ctx("request_history_kline", df)
+
+    with patch.object(provider, "_get_quote_ctx", return_value=ctx):
+        quotes = provider.get_daily_quotes("00700.HK", date(2024, 1, 1), date(2024, 1, 5))
+
+    assert len(quotes) == 2
+    assert quotes[0].trade_date == date(2024, 1, 2)
+    assert quotes[1].close == 388.8
+    assert quotes[1].volume == 15000000
+
+
+def test_search_stocks(provider):
+    """测试按名称搜索股票"""
+    df = pd.DataFrame({
+        "code": ["HK.00700", "HK.09988", "HK.00001"],
+        "name": ["腾讯控股", "阿里巴巴-W", None],
+    })
+    ctx = _mock_ctx("get_stock_filter", df)
+
+    with patch.object(provider, "_get_quote_ctx", return_value=ctx):
+        results = provider.search_stocks("腾讯")
+
+    assert [r.symbol for r in results] == ["HK.00700"]
+
+
+def test_quote_ctx_reused_until_closed(provider):
+    """测试行情上下文在多次请求间复用，close后重新连接"""
+    with patch("futu.OpenQuoteContext") as ctx_cls:
+        first = provider._get_quote_ctx()
+        assert provider._get_quote_ctx() is first
+        assert ctx_cls.call_count == 1
+
+        provider.close()
+        first.close.assert_called_once()
+        provider._get_quote_ctx()
+        assert ctx_cls.call_count == 2
@@ -5,10 +5,22 @@
 from datetime import date, timedelta
 from decimal import Decimal
 
+import numpy as np
 import pandas as pd
 import pytest
 
-from src.analysis.indicators import calc_macd, calc_rsi, calc_kdj, calc_ma, calc_bollinger_bands, calc_atr
+from src.analysis.indicators import (
+    calc_all_indicators,
+    calc_atr,
+    calc_bollinger_bands,
+    calc_kdj,
+    calc_ma,
+    calc_macd,
+    calc_macd_batch,
+    calc_macd_tail,
+    calc_rsi,
+    calc_rsi_batch,
+)
 
 
 @pytest.fixture
@@ -62,6 +74,43 @@ class TestCalcMACD:
         assert result is not None
         assert isinstance(result.dif, Decimal)
 
+    def test_calc_macd_matches_ewm(self, sample_df):
+        """测试MACD与pandas ewm口径一致"""
+        closes = sample_df["close"]
+        dif = closes.ewm(span=12, adjust=False).mean() - closes.ewm(span=26, adjust=False).mean()
+        dea = dif.ewm(span=9, adjust=False).mean()
+
+        result = calc_macd(sample_df)
+
+        assert abs(float(result.dif) - dif.iloc[-1]) < 1e-9
+        assert abs(float(result.dea) - dea.iloc[-1]) < 1e-9
+        assert abs(float(result.macd) - (dif.iloc[-1] - dea.iloc[-1]) * 2) < 1e-9
+
+    def test_calc_macd_accepts_array(self, sample_df):
+        """测试直接传入收盘价数组与传入DataFrame结果一致"""
+        assert calc_macd(sample_df["close"].to_numpy()) == calc_macd(sample_df)
+
+    def test_calc_macd_tail(self, sample_df):
+        """测试单次遍历得到的末尾多日MACD与逐日切片计算一致"""
+        closes = sample_df["close"].to_numpy()
+
+        assert calc_macd_tail(closes, 2) == [calc_macd(closes[:-1]), calc_macd(closes)]
+        assert calc_macd_tail(closes[:1], 2) == [calc_macd(closes[:1])]
+
+    def test_calc_macd_batch(self, sample_df):
+        """测试批量计算时右对齐的各行与逐只计算结果一致"""
+        closes = sample_df["close"].to_numpy()
+        matrix = np.full((2, len(closes)), np.nan)
+        matrix[0] = closes
+        matrix[1, 10:] = closes[:-10]
+
+        difs, deas = calc_macd_batch(matrix, 2)
+
+        for row, series in zip(range(2), (closes, closes[:-10])):
+            expected = calc_macd_tail(series, 2)
+            assert [Decimal(repr(v)) for v in difs[row].tolist()] == [r.dif for r in expected]
+            assert [Decimal(repr(v)) for v in deas[row].tolist()] == [r.dea for r in expected]
+
 
 class TestCalcRSI:
     """RSI计算测试"""
@@ -105,6 +154,34 @@ class TestCalcRSI:
         assert result is not None
         assert 0 <= result <= 100
 
+    def test_calc_rsi_matches_rolling_mean(self):
+        """测试RSI与滚动均值口径一致"""
+        close_prices = [100 + (i % 7 - 3) * 1.5 + i * 0.2 for i in range(40)]  # 震荡行情
+        df = pd.DataFrame({"close": close_prices})
+
+        delta = df["close"].diff()
+        avg_gain = delta.where(delta > 0, 0).rolling(window=14).mean()
+        avg_loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+        expected = 100 - 100 / (1 + avg_gain.iloc[-1] / avg_loss.iloc[-1])
+
+        result = calc_rsi(df)
+
+        assert abs(float(result) - expected) < 1e-6
+
+    def test_calc_rsi_batch(self, sample_df):
+        """测试批量计算时右对齐的各行与逐只计算结果一致，数据不足的行为NaN"""
+        closes = sample_df["close"].to_numpy()
+        matrix = np.full((3, len(closes)), np.nan)
+        matrix[0] = closes
+        matrix[1, -14:] = closes[:14]
+        matrix[2, -13:] = closes[:13]
+
+        result = calc_rsi_batch(matrix)
+
+        assert Decimal(repr(float(result[0]))) == calc_rsi(closes)
+        assert Decimal(repr(float(result[1]))) == calc_rsi(closes[:14])
+        assert np.isnan(result[2])
+
 
 class TestCalcKDJ:
     """KDJ计算测试"""
@@ -132,6 +209,25 @@ class TestCalcKDJ:
 
         assert result is not None
 
+    def test_calc_kdj_matches_rolling(self, sample_df):
+        """测试KDJ与pandas滚动窗口口径一致"""
+        low_min = sample_df["low"].rolling(window=9, min_periods=9).min()
+        high_max = sample_df["high"].rolling(window=9, min_periods=9).max()
+        rsv = ((sample_df["close"] - low_min) / (high_max - low_min) * 100).fillna(50)
+        k = rsv.ewm(span=3, adjust=False).mean()
+        d = k.ewm(span=3, adjust=False).mean()
+
+        result = calc_kdj(sample_df)
+
+        assert abs(float(result.k) - k.iloc[-1]) < 1e-9
+        assert abs(float(result.d) - d.iloc[-1]) < 1e-9
+
+    def test_calc_kdj_accepts_column_mapping(self, sample_df):
+        """测试传入列名到数组的映射与传入DataFrame结果一致"""
+        columns = {col: sample_df[col].to_numpy() for col in ("high", "low", "close")}
+
+        assert calc_kdj(columns) == calc_kdj(sample_df)
+
 
 class TestCalcMA:
     """均线计算测试"""
@@ -214,3 +310,25 @@ class TestCalcATR:
 
         assert result is not None
         assert result > 0
+
+
+class TestCalcAllIndicators:
+    """单次遍历计算全部指标测试"""
+
+    def test_matches_individual_functions(self, sample_df):
+        """测试与逐个指标单独计算的结果一致"""
+        result = calc_all_indicators(sample_df)
+
+        assert result["macd"] == calc_macd(sample_df)
+        assert result["kdj"] == calc_kdj(sample_df)
+        assert result["rsi"] == calc_rsi(sample_df)
+        expected_ma = calc_ma(sample_df)
+        assert result["ma"].keys() == expected_ma.keys() == {5, 10, 20}
+        for period, value in expected_ma.items():
+            assert abs(result["ma"][period] - value) < Decimal("1e-9")
+
+    def test_accepts_strided_arrays(self, sample_df):
+        """测试传入步长不为1的数组时结果不变"""
+        reversed_cols = {col: sample_df[col].to_numpy()[::-1].copy()[::-1] for col in ("high", "low", "close")}
+
+        assert calc_all_indicators(reversed_cols) == calc_all_indicators(sample_df)
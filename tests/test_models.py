@@ -1,6 +1,7 @@
 from datetime import date
 from decimal import Decimal
 
+import numpy as np
 import pytest
 
 from src.models.schemas import (
@@ -23,6 +24,11 @@ from src.models.schemas import (
     TrendResult,
     ValuationResult,
     WatchlistItem,
+    change_pct_array,
+    deserialize_financials,
+    deserialize_quotes,
+    serialize_financials,
+    serialize_quotes,
 )
 
 
@@ -37,14 +43,14 @@ def test_daily_quote():
     quote = DailyQuote(
         symbol="000001.SZ",
         trade_date=date(2024, 1, 15),
-        open=Decimal("10.5"),
-        high=Decimal("10.8"),
-        low=Decimal("10.3"),
-        close=Decimal("10.6"),
+        open=10.5,
+        high=10.8,
+        low=10.3,
+        close=10.6,
         volume=1000000,
     )
     assert quote.symbol == "000001.SZ"
-    assert quote.close == Decimal("10.6")
+    assert quote.close == 10.6
 
 
 def test_daily_quote_change_pct():
@@ -52,15 +58,15 @@ def test_daily_quote_change_pct():
     quote = DailyQuote(
         symbol="000001.SZ",
         trade_date=date(2024, 1, 15),
-        open=Decimal("10.5"),
-        high=Decimal("10.8"),
-        low=Decimal("10.3"),
-        close=Decimal("10.6"),
+        open=10.5,
+        high=10.8,
+        low=10.3,
+        close=10.6,
         volume=1000000,
-        pre_close=Decimal("10.0"),
+        pre_close=10.0,
     )
     # 涨幅 = (10.6 - 10.0) / 10.0 * 100 = 6%
-    assert quote.change_pct == Decimal("6.0")
+    assert quote.change_pct == pytest.approx(6.0)
 
 
 def test_daily_quote_change_pct_none():
@@ -68,15 +74,93 @@ def test_daily_quote_change_pct_none():
     quote = DailyQuote(
         symbol="000001.SZ",
         trade_date=date(2024, 1, 15),
-        open=Decimal("10.5"),
-        high=Decimal("10.8"),
-        low=Decimal("10.3"),
-        close=Decimal("10.6"),
+        open=10.5,
+        high=10.8,
+        low=10.3,
+        close=10.6,
         volume=1000000,
     )
     assert quote.change_pct is None
 
 
+def test_daily_quote_change_pct_not_serialized():
+    """测试涨跌幅不参与序列化，序列化结果可直接重建实例"""
+    quote = DailyQuote(
+        symbol="000001.SZ",
+        trade_date=date(2024, 1, 15),
+        open=10.5,
+        high=10.8,
+        low=10.3,
+        close=10.6,
+        volume=1000000,
+        pre_close=10.0,
+    )
+    data = quote.model_dump()
+
+    assert "change_pct" not in data
+    assert DailyQuote(**data) == quote
+
+
+def test_change_pct_array():
+    """测试批量涨跌幅计算与单值计算口径一致"""
+    closes = [10.6, 10.0, 9.0, 11.0]
+    pre_closes = [10.0, 0.0, float("nan"), 10.0]
+
+    result = change_pct_array(closes, pre_closes)
+
+    assert result[0] == pytest.approx(6.0)
+    assert np.isnan(result[1]) and np.isnan(result[2])
+    assert result[3] == pytest.approx(DailyQuote.compute_change_pct(11.0, 10.0))
+    assert DailyQuote.compute_change_pct(9.0, float("nan")) is None
+    assert DailyQuote.compute_change_pct(9.0, 0.0) is None
+
+
+def test_serialize_quotes_and_financials_round_trip():
+    """测试行情和财务列表JSON序列化后可原样还原"""
+    quotes = [
+        DailyQuote(
+            symbol="000001.SZ",
+            trade_date=date(2024, 1, 15),
+            open=10.5,
+            high=10.8,
+            low=10.3,
+            close=10.6,
+            volume=1000000,
+            pre_close=10.0,
+        )
+    ]
+    financials = [Financial(symbol="000001.SZ", report_date=date(2024, 3, 31), roe=Decimal("15.53"))]
+
+    data = serialize_quotes(quotes)
+
+    assert data.startswith(b'[{"symbol":"000001.SZ","trade_date":"2024-01-15"')
+    assert deserialize_quotes(data) == quotes
+    assert deserialize_financials(serialize_financials(financials)) == financials
+    assert deserialize_quotes(serialize_quotes([])) == []
+
+
+def test_daily_quote_frozen():
+    """测试行情实例不可修改"""
+    quote = DailyQuote(
+        symbol="000001.SZ",
+        trade_date=date(2024, 1, 15),
+        open=10.5,
+        high=10.8,
+        low=10.3,
+        close=10.6,
+        volume=1000000,
+    )
+    with pytest.raises(ValueError):
+        quote.close = 11
+
+
+def test_financial_frozen():
+    """测试财务数据实例不可修改"""
+    financial = Financial(symbol="000001.SZ", report_date=date(2024, 3, 31), roe=Decimal("10"))
+    with pytest.raises(ValueError):
+        financial.roe = Decimal("12")
+
+
 def test_financial():
     fin = Financial(
         symbol="000001.SZ",
@@ -5,6 +5,9 @@ Tests for portfolio repository methods.
 import pytest
 from datetime import date, datetime
 from decimal import Decimal
+from unittest.mock import patch
+
+from sqlalchemy import text
 
 from src.data.repository import Repository
 from src.models.portfolio import Account, AccountType, Transaction, TradeType
@@ -149,6 +152,31 @@ def test_add_sell_transaction(repo):
     assert updated_account.current_cash == Decimal("62000")  # 50000 + 12000
 
 
+def test_add_transaction_rolls_back_with_cash_update(repo):
+    """测试现金更新失败时交易记录一并回滚"""
+    account = repo.create_account(Account(
+        name="测试账户",
+        initial_capital=Decimal("100000"),
+        current_cash=Decimal("100000"),
+    ))
+    transaction = Transaction(
+        account_id=account.id,
+        symbol="000001.SZ",
+        trade_type=TradeType.BUY,
+        shares=1000,
+        price=Decimal("10.5"),
+        amount=Decimal("10500"),
+        trade_date=date.today(),
+    )
+
+    with patch("src.data.repository._SQL_UPDATE_ACCOUNT_CASH", text("UPDATE missing_table SET x = :change")):
+        with pytest.raises(Exception):
+            repo.add_transaction(transaction)
+
+    assert repo.get_transactions(account.id) == []
+    assert repo.get_account(account.id).current_cash == Decimal("100000")
+
+
 def test_get_transactions_by_symbol(repo):
     """测试获取指定股票的交易记录"""
     account = Account(
@@ -1,10 +1,15 @@
-from datetime import date, timedelta
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 from decimal import Decimal
+from unittest.mock import patch
 
 import pytest
+from sqlalchemy import text
 
+from src.data import repository
 from src.data.repository import Repository
-from src.models.schemas import DailyQuote, Market, StockInfo
+from src.models.schemas import Alert, AlertType, DailyQuote, Financial, Market, StockInfo
 
 
 @pytest.fixture
@@ -49,4 +54,303 @@ def test_save_and_get_quotes(repo):
 
     result = repo.get_quotes("000001.SZ", days=30)
     assert len(result) == 2
-    assert result[-1].close == Decimal("10.6")
+    assert result[-1].close == 10.6
+
+
+def test_get_financials_bulk(repo):
+    today = date.today()
+    repo.save_financials([
+        Financial(symbol="000001.SZ", report_date=today - timedelta(days=90), roe=Decimal("10")),
+        Financial(symbol="000001.SZ", report_date=today - timedelta(days=1), roe=Decimal("12")),
+        Financial(symbol="600000.SH", report_date=today - timedelta(days=1), roe=Decimal("8")),
+    ])
+
+    result = repo.get_financials_bulk(["000001.SZ", "600000.SH", "000002.SZ"], years=1)
+
+    assert set(result) == {"000001.SZ", "600000.SH"}
+    assert [f.roe for f in result["000001.SZ"]] == [Decimal("12"), Decimal("10")]
+
+
+def test_get_financials_newest_first(repo):
+    today = date.today()
+    repo.save_financials([
+        Financial(symbol="000001.SZ", report_date=today - timedelta(days=180), roe=Decimal("9")),
+        Financial(symbol="000001.SZ", report_date=today - timedelta(days=1), roe=Decimal("12")),
+        Financial(symbol="000001.SZ", report_date=today - timedelta(days=90), roe=Decimal("10")),
+    ])
+
+    result = repo.get_financials("000001.SZ", years=1)
+
+    assert [f.roe for f in result] == [Decimal("12"), Decimal("10"), Decimal("9")]
+
+
+def test_get_quotes_cached_until_saved(repo):
+    today = date.today()
+    quote = DailyQuote(
+        symbol="000001.SZ",
+        trade_date=today - timedelta(days=2),
+        open=Decimal("10.4"),
+        high=Decimal("10.6"),
+        low=Decimal("10.3"),
+        close=Decimal("10.5"),
+        volume=1000,
+    )
+    repo.save_quotes([quote])
+    assert len(repo.get_quotes("000001.SZ", days=30)) == 1
+
+    with patch.object(repo, "_row_to_quote", side_effect=AssertionError("should hit cache")):
+        assert len(repo.get_quotes("000001.SZ", days=30)) == 1
+
+    repo.save_quotes([quote.model_copy(update={"trade_date": today - timedelta(days=1)})])
+    assert len(repo.get_quotes("000001.SZ", days=30)) == 2
+
+
+def test_query_cache_bounded(repo, monkeypatch):
+    monkeypatch.setattr(Repository, "QUERY_CACHE_SIZE", 2)
+    for symbol in ("000001.SZ", "000002.SZ"):
+        repo.get_quotes(symbol, days=30)
+    repo.get_quotes("000001.SZ", days=30)
+    repo.get_quotes("600000.SH", days=30)
+
+    assert [key[0] for key in repo._quote_cache] == ["000001.SZ", "600000.SH"]
+
+
+def test_query_cache_prunes_stale_entries_on_write(repo):
+    today = date.today()
+    repo._quote_cache[("000001.SZ", 30, today - timedelta(days=1))] = (0.0, [])
+    repo._financial_cache[("000001.SZ", 1, today)] = (-repo.FINANCIAL_CACHE_TTL, [])
+
+    repo.get_quotes("000002.SZ", days=30)
+    repo.get_financials("000002.SZ", years=1)
+
+    assert list(repo._quote_cache) == [("000002.SZ", 30, today)]
+    assert list(repo._financial_cache) == [("000002.SZ", 1, today)]
+
+
+def test_query_cache_thread_safe(repo, monkeypatch):
+    """多线程并发读写同一缓存时，淘汰与清理不会与命中后的move_to_end竞争"""
+    monkeypatch.setattr(Repository, "QUERY_CACHE_SIZE", 4)
+    monkeypatch.setattr(repo, "iter_quotes", lambda symbol, days: iter(()))
+    interval = sys.getswitchinterval()
+    # 缩短线程切换间隔，放大竞争窗口
+    sys.setswitchinterval(1e-6)
+
+    def worker(offset: int):
+        for i in range(2000):
+            repo.get_quotes(f"S{(i + offset) % 8}", days=30)
+            if i % 50 == 0:
+                repo.clear_quote_cache({f"S{offset % 8}"})
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for future in [executor.submit(worker, n) for n in range(8)]:
+                future.result()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert len(repo._quote_cache) <= 4
+
+
+def test_get_quotes_sorted_ascending(repo):
+    today = date.today()
+    repo.save_quotes([
+        DailyQuote(
+            symbol="000001.SZ",
+            trade_date=today - timedelta(days=offset),
+            open=Decimal("10"),
+            high=Decimal("10"),
+            low=Decimal("10"),
+            close=Decimal(str(offset)),
+            volume=1000,
+        )
+        for offset in (1, 3, 2)
+    ])
+
+    result = repo.get_quotes("000001.SZ", days=30)
+
+    assert [q.close for q in result] == [3.0, 2.0, 1.0]
+
+
+def test_sqlite_pragmas(tmp_path):
+    file_repo = Repository(f"sqlite:///{tmp_path / 'test.db'}")
+
+    with file_repo.engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+        assert conn.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+
+
+def test_get_quotes_df(repo):
+    today = date.today()
+    repo.save_quotes([
+        DailyQuote(
+            symbol="000001.SZ",
+            trade_date=today - timedelta(days=offset),
+            open=Decimal("10.4"),
+            high=Decimal("10.6"),
+            low=Decimal("10.3"),
+            close=Decimal(str(10 + offset)),
+            volume=1000,
+            pre_close=Decimal("10.2") if offset == 1 else None,
+        )
+        for offset in (1, 2)
+    ])
+
+    df = repo.get_quotes_df("000001.SZ", days=30)
+
+    assert df["close"].tolist() == [12.0, 11.0]
+    assert df["close"].dtype == "float64"
+    assert df["pre_close"].isna().tolist() == [True, False]
+    assert repo.get_quotes_df("000002.SZ", days=30).empty
+
+
+def test_get_quotes_df_bulk(repo):
+    today = date.today()
+    repo.save_quotes([
+        DailyQuote(
+            symbol=symbol,
+            trade_date=today - timedelta(days=offset),
+            open=Decimal("10"),
+            high=Decimal("11"),
+            low=Decimal("9"),
+            close=Decimal(str(offset)),
+            volume=1000,
+        )
+        for symbol in ("000001.SZ", "600000.SH")
+        for offset in (2, 1)
+    ])
+    assert len(repo.get_quotes_df("000001.SZ", days=30)) == 2
+
+    frames = repo.get_quotes_df_bulk(["000001.SZ", "600000.SH", "000002.SZ"], days=30)
+
+    assert set(frames) == {"000001.SZ", "600000.SH"}
+    assert frames["600000.SH"]["close"].tolist() == [2.0, 1.0]
+    assert frames["600000.SH"].columns.tolist() == repo.get_quotes_df("000001.SZ", days=30).columns.tolist()
+    with patch("src.data.repository.pd.read_sql", side_effect=AssertionError("should hit cache")):
+        assert repo.get_quotes_df("600000.SH", days=30)["close"].tolist() == [2.0, 1.0]
+        assert repo.get_quotes_df_bulk(["000002.SZ"], days=30) == {}
+
+
+def test_memory_db_shared_across_threads(repo):
+    repo.save_stock_info(StockInfo(symbol="000001.SZ", name="平安银行", market=Market.A_STOCK))
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        result = executor.submit(repo.get_stock_info, "000001.SZ").result()
+
+    assert result is not None
+
+
+def test_file_db_single_writer(tmp_path):
+    file_repo = Repository(f"sqlite:///{tmp_path / 'test.db'}")
+    file_repo.save_stock_info(StockInfo(symbol="000001.SZ", name="平安银行", market=Market.A_STOCK))
+
+    assert file_repo._write_engine is not file_repo.engine
+    assert file_repo._write_engine.pool.size() == 1
+    assert file_repo.get_stock_info("000001.SZ").name == "平安银行"
+
+
+def test_save_quotes_in_chunks(repo):
+    today = date.today()
+    quotes = [
+        DailyQuote(
+            symbol="000001.SZ",
+            trade_date=today - timedelta(days=offset),
+            open=Decimal("10"),
+            high=Decimal("11"),
+            low=Decimal("9"),
+            close=Decimal(str(offset)),
+            volume=1000,
+        )
+        for offset in range(1, 26)
+    ]
+    # 每块最多容纳2行，25行需分13条语句写入
+    repo.INSERT_MAX_PARAMS = 25
+
+    repo.save_quotes(quotes)
+
+    result = repo.get_quotes("000001.SZ", days=30)
+    assert [q.close for q in result] == [float(offset) for offset in range(25, 0, -1)]
+    assert result[0].trade_date == today - timedelta(days=25)
+
+
+def test_quote_queries_use_composite_index(repo):
+    params = {"symbol": "000001.SZ", "start_date": date.today()}
+    with repo.engine.connect() as conn:
+        plans = [
+            " ".join(row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql.text}"), params))
+            for sql in (repository._SQL_GET_QUOTES, repository._SQL_GET_LATEST_QUOTE)
+        ]
+        indexes = {row[0] for row in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+    for plan in plans:
+        assert "SEARCH daily_quote USING INDEX" in plan
+        assert "TEMP B-TREE" not in plan
+    assert "idx_quote_symbol" not in indexes
+    assert "idx_tx_account_date" in indexes
+
+
+def test_maintenance_truncates_wal(tmp_path):
+    db_path = tmp_path / "test.db"
+    file_repo = Repository(f"sqlite:///{db_path}")
+    file_repo.save_stock_info(StockInfo(symbol="000001.SZ", name="平安银行", market=Market.A_STOCK))
+    wal_path = tmp_path / "test.db-wal"
+    assert wal_path.stat().st_size > 0
+
+    file_repo.maintenance()
+
+    assert wal_path.stat().st_size == 0
+    assert file_repo.get_stock_info("000001.SZ").name == "平安银行"
+
+
+def test_get_financials_cached_until_saved(repo):
+    today = date.today()
+    repo.save_financials([Financial(symbol="000001.SZ", report_date=today - timedelta(days=90), roe=Decimal("10"))])
+    assert len(repo.get_financials("000001.SZ", years=1)) == 1
+
+    with patch.object(repo, "_row_to_financial", side_effect=AssertionError("should hit cache")):
+        assert len(repo.get_financials("000001.SZ", years=1)) == 1
+        assert list(repo.get_financials_bulk(["000001.SZ"], years=1)) == ["000001.SZ"]
+
+    repo.save_financials([Financial(symbol="000001.SZ", report_date=today - timedelta(days=1), roe=Decimal("12"))])
+    bulk = repo.get_financials_bulk(["000001.SZ"], years=1)
+    assert [f.roe for f in bulk["000001.SZ"]] == [Decimal("12"), Decimal("10")]
+
+
+def test_iter_quotes_streams_in_batches(repo):
+    today = date.today()
+    repo.save_quotes([
+        DailyQuote(
+            symbol="000001.SZ",
+            trade_date=today - timedelta(days=offset),
+            open=Decimal("10"),
+            high=Decimal("11"),
+            low=Decimal("9"),
+            close=Decimal(str(offset)),
+            volume=1000,
+        )
+        for offset in range(1, 6)
+    ])
+    repo.QUOTE_STREAM_BATCH = 2
+
+    quotes = repo.iter_quotes("000001.SZ", days=30)
+
+    assert next(quotes).close == 5.0
+    assert [q.close for q in quotes] == [4.0, 3.0, 2.0, 1.0]
+    assert repo.get_quotes("000001.SZ", days=30)[0].close == 5.0
+
+
+def test_save_alerts_in_one_statement(repo):
+    triggered_at = datetime(2024, 1, 2, 9, 30, 1)
+    alerts = [
+        Alert(symbol=symbol, alert_type=AlertType.RSI_OVERSOLD, message=symbol, triggered_at=triggered_at)
+        for symbol in ("000001.SZ", "600000.SH")
+    ]
+
+    with patch.object(repo, "_insert_rows", wraps=repo._insert_rows) as insert_rows:
+        repo.save_alerts(alerts)
+        repo.save_alerts([])
+
+    insert_rows.assert_called_once()
+    result = repo.get_alerts()
+    assert {a.symbol for a in result} == {"000001.SZ", "600000.SH"}
+    assert all(a.triggered_at == triggered_at and not a.is_read for a in result)
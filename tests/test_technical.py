@@ -6,6 +6,7 @@ from datetime import date, timedelta
 from decimal import Decimal
 from unittest.mock import MagicMock, patch
 
+import pandas as pd
 import pytest
 
 from src.analysis.technical import TechnicalAnalyzer
@@ -13,10 +14,26 @@ from src.data.repository import Repository
 from src.models.schemas import DailyQuote
 
 
+def _quotes_to_df(quotes: list[DailyQuote]) -> pd.DataFrame:
+    """按Repository.get_quotes_df的列格式转换行情列表"""
+    return pd.DataFrame({
+        "trade_date": pd.to_datetime([q.trade_date for q in quotes]),
+        "open": [float(q.open) for q in quotes],
+        "high": [float(q.high) for q in quotes],
+        "low": [float(q.low) for q in quotes],
+        "close": [float(q.close) for q in quotes],
+        "volume": [q.volume for q in quotes],
+    })
+
+
 @pytest.fixture
 def mock_repository():
-    """创建模拟的Repository"""
+    """创建模拟的Repository
+
+    测试用例通过get_quotes设置行情列表，get_quotes_df返回同一份数据的DataFrame形式
+    """
     repo = MagicMock(spec=Repository)
+    repo.get_quotes_df.side_effect = lambda symbol, days=365: _quotes_to_df(repo.get_quotes(symbol, days))
     return repo
 
 
@@ -134,6 +151,29 @@ class TestTechnicalAnalyzer:
         ]
         assert report.trend.current_price > 0
 
+    def test_trend_strength_with_exactly_20_quotes(self, mock_repository):
+        """测试恰好20日数据时趋势强度仍以20日为分母"""
+        # 先跌6日再涨13日：19个涨跌幅中13个上涨，13/20=0.65未超过强势阈值
+        closes = [100 - 0.1 * i for i in range(7)] + [99.4 + (i + 1) for i in range(13)]
+        quotes = [
+            DailyQuote(
+                symbol="000001.SZ",
+                trade_date=date(2024, 1, 1) + timedelta(days=i),
+                open=Decimal(str(price)),
+                high=Decimal(str(price + 0.5)),
+                low=Decimal(str(price - 0.5)),
+                close=Decimal(str(price)),
+                volume=1000000,
+            )
+            for i, price in enumerate(closes)
+        ]
+        mock_repository.get_quotes.return_value = quotes
+
+        analyzer = TechnicalAnalyzer(mock_repository)
+        report = analyzer.analyze("000001.SZ", days=365)
+
+        assert report.trend.direction == "震荡偏强"
+
     def test_indicators_calculation(self, mock_repository, sample_quotes):
         """测试技术指标计算"""
         mock_repository.get_quotes.return_value = sample_quotes
@@ -182,6 +222,17 @@ class TestTechnicalAnalyzer:
         # 评分应该在0-100之间
         assert 0 <= report.score <= 100
 
+    def test_analyze_many(self, mock_repository, sample_quotes):
+        """测试批量并发分析"""
+        mock_repository.get_quotes.side_effect = lambda symbol, days: sample_quotes if symbol == "000001.SZ" else []
+
+        analyzer = TechnicalAnalyzer(mock_repository)
+        reports = analyzer.analyze_many(["000001.SZ", "000002.SZ"], days=120)
+
+        assert [r.symbol for r in reports] == ["000001.SZ", "000002.SZ"]
+        assert reports[0].score == analyzer.analyze("000001.SZ", days=120).score
+        assert reports[1].score == 0
+
 
 class TestTechnicalAnalyzerPatterns:
     """K线形态检测测试"""
@@ -303,3 +354,4 @@ class TestTechnicalAnalyzerMACD:
         # 上涨趋势中MACD应该显示金叉或正值
         if report.indicators.macd:
             assert report.indicators.macd.macd > 0 or report.indicators.macd.dif > report.indicators.macd.dea
+
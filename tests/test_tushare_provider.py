@@ -1,7 +1,14 @@
+import os
+import time
 import pytest
-from datetime import date
+from datetime import date, timedelta
+from unittest.mock import MagicMock, patch
 
-from src.data.tushare_provider import TushareProvider
+import numpy as np
+import pandas as pd
+
+from src.data.cache import FileCache
+from src.data.tushare_provider import TushareProvider, _ymd_list
 from src.models.schemas import Market
 
 
@@ -17,6 +24,14 @@ def test_parse_symbol_a_stock(provider):
     assert market == Market.A_STOCK
 
 
+def test_parse_symbol_adds_exchange_suffix(provider):
+    """测试不带后缀的代码按首位补全交易所后缀"""
+    assert provider._parse_symbol("600000") == ("600000.SH", Market.A_STOCK)
+    assert provider._parse_symbol("300750") == ("300750.SZ", Market.A_STOCK)
+    assert provider._parse_symbol("830799") == ("830799.BJ", Market.A_STOCK)
+    assert provider._parse_symbol("900901") == ("900901", Market.A_STOCK)
+
+
 def test_to_stock_info(provider):
     """测试转换为StockInfo"""
     row = {
@@ -27,3 +42,263 @@ def test_to_stock_info(provider):
     info = provider._to_stock_info(row)
     assert info.symbol == "000001.SZ"
     assert info.name == "平安银行"
+
+
+def test_to_stock_info_list_date(provider):
+    """测试整数、字符串和缺失的上市日期"""
+    row = {"ts_code": "000001.SZ", "name": "平安银行"}
+
+    assert provider._to_stock_info({**row, "list_date": 19910403}).list_date == date(1991, 4, 3)
+    assert provider._to_stock_info({**row, "list_date": "19910403"}).list_date == date(1991, 4, 3)
+    assert provider._to_stock_info({**row, "list_date": float("nan")}).list_date is None
+
+
+def test_ymd_list():
+    """测试字符串和整数的YYYYMMDD日期列批量转换"""
+    expected = [date(2024, 1, 2), date(1999, 11, 10), date(2024, 12, 31)]
+
+    assert _ymd_list(pd.Series(["20240102", "19991110", "20241231"])) == expected
+    assert _ymd_list(pd.Series([20240102, 19991110, 20241231])) == expected
+    assert _ymd_list(pd.Series([], dtype="int64")) == []
+
+
+def test_get_daily_quotes(provider):
+    """测试日线行情按列转换，成交额由千元换算为元，缺失值为None"""
+    provider.pro = MagicMock()
+    provider.pro.daily.return_value = pd.DataFrame({
+        "trade_date": ["20240103", "20240102"],
+        "open": [10.5, 10.1],
+        "high": [11.0, 10.9],
+        "low": [10.0, 9.9],
+        "close": [10.8, 10.2],
+        "vol": [12345.0, 0.0],
+        "amount": [1234.567, 0.1],
+        "pre_close": [10.2, float("nan")],
+    })
+
+    quotes = provider.get_daily_quotes("000001.SZ", date(2024, 1, 1), date(2024, 1, 31))
+
+    assert [q.trade_date for q in quotes] == [date(2024, 1, 3), date(2024, 1, 2)]
+    assert quotes[0].close == 10.8
+    assert quotes[0].amount == 1234567
+    assert quotes[1].volume == 0
+    assert quotes[1].pre_close is None
+
+
+def test_get_daily_quotes_arrays(provider):
+    """测试列式行情与逐行构造的行情内容一致，且按交易日期升序"""
+    provider.pro = MagicMock()
+    provider.pro.daily.return_value = pd.DataFrame({
+        "trade_date": ["20240103", "20240102"],
+        "open": [10.5, 10.1],
+        "high": [11.0, 10.9],
+        "low": [10.0, 9.9],
+        "close": [10.8, 10.2],
+        "vol": [12345.0, 0.0],
+        "amount": [1234.567, 0.1],
+        "pre_close": [10.2, float("nan")],
+    })
+
+    arrays = provider.get_daily_quotes_arrays("000001.SZ", date(2024, 1, 1), date(2024, 1, 31))
+    quotes = provider.get_daily_quotes("000001.SZ", date(2024, 1, 1), date(2024, 1, 31))
+    expected = TushareProvider._quotes_to_arrays(quotes)
+
+    assert arrays.keys() == expected.keys()
+    assert arrays["trade_date"].tolist() == expected["trade_date"].tolist()
+    assert arrays["close"].tolist() == [10.2, 10.8]
+    for col in TushareProvider.QUOTE_ARRAY_COLUMNS:
+        np.testing.assert_allclose(arrays[col], expected[col])
+
+    provider.pro.daily.return_value = pd.DataFrame()
+    empty = provider.get_daily_quotes_arrays("000001.SZ", date(2024, 1, 1), date(2024, 1, 31))
+    assert all(len(values) == 0 for values in empty.values())
+
+
+def test_get_daily_quotes_batch(provider):
+    """测试批量行情按返回上限分组请求并按ts_code拆分"""
+    frame = pd.DataFrame({
+        "ts_code": ["000001.SZ", "600000.SH", "000001.SZ"],
+        "trade_date": ["20240103", "20240103", "20240102"],
+        "open": [10.5, 7.0, 10.1],
+        "high": [11.0, 7.2, 10.9],
+        "low": [10.0, 6.9, 9.9],
+        "close": [10.8, 7.1, 10.2],
+        "vol": [100.0, 200.0, 300.0],
+        "amount": [1.0, 2.0, 3.0],
+        "pre_close": [10.2, 7.0, 10.0],
+    })
+    provider.pro = MagicMock()
+    provider.pro.daily.side_effect = lambda ts_code, **kwargs: frame[frame["ts_code"].isin(ts_code.split(","))]
+    # 1月1日至31日共23个工作日，上限46行时每次请求2只股票
+    provider.DAILY_MAX_ROWS = 46
+
+    result = provider.get_daily_quotes_batch(
+        ["000001.SZ", "000001", "600000.SH", "300750.SZ"], date(2024, 1, 1), date(2024, 1, 31)
+    )
+
+    ts_codes = [call.kwargs["ts_code"] for call in provider.pro.daily.call_args_list]
+    assert ts_codes == ["000001.SZ,600000.SH", "300750.SZ"]
+    assert [q.trade_date for q in result["000001.SZ"]] == [date(2024, 1, 3), date(2024, 1, 2)]
+    assert result["000001"][0].symbol == "000001"
+    assert result["600000.SH"][0].close == 7.1
+    assert result["300750.SZ"] == []
+
+
+def test_get_daily_quotes_batch_within_row_limit(provider):
+    """测试短区间分组后每次请求不超过返回上限，超出部分被截断时也不会丢失股票"""
+    trade_dates = [f"2024010{day}" for day in range(1, 6)]
+    codes = ["000001.SZ", "600000.SH", "300750.SZ"]
+    frame = pd.DataFrame({
+        "ts_code": [code for code in codes for _ in trade_dates],
+        "trade_date": trade_dates * len(codes),
+        "open": 10.0,
+        "high": 10.0,
+        "low": 10.0,
+        "close": 10.0,
+        "vol": 100.0,
+        "amount": 1.0,
+        "pre_close": 10.0,
+    })
+    provider.pro = MagicMock()
+    provider.DAILY_MAX_ROWS = 10
+    # 与Tushare一致：超过返回上限的行被直接截断
+    provider.pro.daily.side_effect = (
+        lambda ts_code, **kwargs: frame[frame["ts_code"].isin(ts_code.split(","))].head(provider.DAILY_MAX_ROWS)
+    )
+
+    # 周一至周五共5个交易日
+    result = provider.get_daily_quotes_batch(codes, date(2024, 1, 1), date(2024, 1, 5))
+
+    assert {symbol: len(quotes) for symbol, quotes in result.items()} == dict.fromkeys(codes, 5)
+
+
+def test_get_daily_quotes_uses_file_cache(tmp_path):
+    """测试配置响应缓存后相同区间只调用一次接口，过期后重新请求"""
+    provider = TushareProvider("test_token", cache=FileCache(str(tmp_path)))
+    provider.pro = MagicMock()
+    provider.pro.daily.return_value = pd.DataFrame({
+        "trade_date": ["20240102"],
+        "open": [10.1],
+        "high": [10.9],
+        "low": [9.9],
+        "close": [10.2],
+        "vol": [100.0],
+        "amount": [1.0],
+        "pre_close": [10.0],
+    })
+
+    first = provider.get_daily_quotes("000001.SZ", date(2024, 1, 1), date(2024, 1, 31))
+    second = provider.get_daily_quotes("000001.SZ", date(2024, 1, 1), date(2024, 1, 31))
+    assert first == second
+    assert provider.pro.daily.call_count == 1
+
+    provider.get_daily_quotes("000001.SZ", date(2024, 1, 1), date(2024, 2, 29))
+    assert provider.pro.daily.call_count == 2
+
+    provider.DAILY_CACHE_TTL = 0
+    provider.get_daily_quotes("000001.SZ", date(2024, 1, 1), date(2024, 1, 31))
+    assert provider.pro.daily.call_count == 3
+
+
+def test_daily_cache_ttl_short_when_range_includes_today(tmp_path):
+    """测试结束日期为今天的请求使用较短的缓存有效期"""
+    provider = TushareProvider("test_token", cache=FileCache(str(tmp_path)))
+    provider.pro = MagicMock()
+    provider.pro.daily.return_value = pd.DataFrame()
+    today = date.today()
+
+    assert provider._daily_cache_ttl(today) == provider.DAILY_OPEN_CACHE_TTL
+    assert provider._daily_cache_ttl(today - timedelta(days=1)) == provider.DAILY_CACHE_TTL
+
+    provider.get_daily_quotes("000001.SZ", today - timedelta(days=30), today)
+    provider.get_daily_quotes("000001.SZ", today - timedelta(days=30), today)
+    assert provider.pro.daily.call_count == 1
+
+    provider.DAILY_OPEN_CACHE_TTL = 0
+    provider.get_daily_quotes("000001.SZ", today - timedelta(days=30), today)
+    assert provider.pro.daily.call_count == 2
+
+
+def test_file_cache_prunes_expired_files(tmp_path):
+    """测试写入时删除超过最长保留时间的缓存文件"""
+    cache = FileCache(str(tmp_path), max_age=3600)
+    df = pd.DataFrame({"close": [10.0]})
+    cache.put("old", df)
+    old_path = tmp_path / "old.pkl"
+    stale = time.time() - 7200
+    os.utime(old_path, (stale, stale))
+
+    cache.put("new", df)
+    assert old_path.exists()
+
+    cache._last_prune -= cache.PRUNE_INTERVAL
+    cache.put("new", df)
+    assert not old_path.exists()
+    assert cache.get("new", 3600) is not None
+
+
+def test_get_financials_skips_missing_ann_date(provider):
+    """测试公告日期缺失的财务数据被过滤"""
+    provider.pro = MagicMock()
+    provider.pro.fina_indicator.return_value = pd.DataFrame({
+        "ts_code": ["000001.SZ"] * 2,
+        "ann_date": ["20240420", None],
+        "roe": [1.5, 2.0],
+        "pe": [10.0, 1.0],
+        "pb": [1.1, 1.0],
+        "debt_to_assets": [50.0, 1.0],
+        "grossprofit_margin": [30.0, float("nan")],
+    })
+
+    financials = provider.get_financials("000001.SZ")
+
+    assert len(financials) == 1
+    assert financials[0].report_date == date(2024, 4, 20)
+    assert financials[0].roe == 1.5
+
+    provider.pro.fina_indicator.return_value = pd.DataFrame()
+    assert provider.get_financials("000001.SZ") == []
+
+
+def test_search_stocks_literal_match(provider):
+    """测试搜索按名称子串或代码前缀字面匹配，正则元字符不报错"""
+    provider.pro = MagicMock()
+    provider.pro.stock_basic.return_value = pd.DataFrame({
+        "ts_code": ["000001.SZ", "600000.SH", "600234.SH"],
+        "symbol": ["000001", "600000", "600234"],
+        "name": ["平安银行", "浦发银行", "*ST科新"],
+        "area": ["深圳", "上海", "山西"],
+        "industry": ["银行", "银行", None],
+        "list_date": ["19910403", "19991110", "20000714"],
+    })
+
+    assert [s.symbol for s in provider.search_stocks("*ST")] == ["600234.SH"]
+    assert [s.symbol for s in provider.search_stocks("6000")] == ["600000.SH"]
+    assert provider.search_stocks("*ST")[0].industry is None
+    assert provider.get_stock_info("600234").industry is None
+    assert provider.search_stocks("不存在") == []
+
+
+def test_stock_basic_downloaded_once_per_day(provider):
+    """测试股票列表当日只下载一次，搜索和单只查询共用"""
+    provider.pro = MagicMock()
+    provider.pro.stock_basic.return_value = pd.DataFrame({
+        "ts_code": ["000001.SZ", "600000.SH"],
+        "symbol": ["000001", "600000"],
+        "name": ["平安银行", "浦发银行"],
+        "area": ["深圳", "上海"],
+        "industry": ["银行", "银行"],
+        "list_date": ["19910403", "19991110"],
+    })
+
+    assert [s.symbol for s in provider.search_stocks("银行")] == ["000001.SZ", "600000.SH"]
+    info = provider.get_stock_info("600000")
+    assert info.name == "浦发银行"
+    assert info.list_date == date(1999, 11, 10)
+    assert provider.get_stock_info("000002.SZ") is None
+    assert provider.pro.stock_basic.call_count == 1
+
+    with patch("src.data.tushare_provider.date") as mock_date:
+        mock_date.today.return_value = date.today() + timedelta(days=1)
+        provider.search_stocks("平安")
+    assert provider.pro.stock_basic.call_count == 2
@@ -1,4 +1,9 @@
+from datetime import date, timedelta
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
 import pytest
+
 from src.data.yfinance_provider import YFinanceProvider
 from src.models.schemas import Market
 
@@ -20,3 +25,64 @@ def test_parse_symbol_without_suffix(provider):
     symbol, market = provider._parse_symbol("TSLA")
     assert symbol == "TSLA"
     assert market == Market.US_STOCK
+
+
+def test_parse_symbol_hk_stock(provider):
+    """测试港股代码保持yfinance的.HK格式"""
+    assert provider._parse_symbol("0700.HK") == ("0700.HK", Market.HK_STOCK)
+
+
+def test_search_stocks_concurrent(provider):
+    """测试并发获取热门股票信息，保持列表顺序并跳过失败的请求"""
+    def fake_ticker(sym):
+        if sym == "MSFT":
+            raise RuntimeError("network error")
+        return MagicMock(info={"longName": f"{sym} Inc."})
+
+    with patch("src.data.yfinance_provider.yf.Ticker", side_effect=fake_ticker):
+        results = provider.search_stocks("M")
+
+    assert [r.symbol for r in results] == ["AMZN.US", "META.US", "JPM.US", "WMT.US"]
+    assert results[0].name == "AMZN Inc."
+
+
+def test_ticker_reused_within_day(provider):
+    """测试同一股票当日内复用Ticker，info只请求一次，跨日后重建"""
+    ticker = MagicMock(info={"longName": "Apple Inc.", "industry": "Consumer Electronics", "trailingPE": 30.5})
+
+    with patch("src.data.yfinance_provider.yf.Ticker", return_value=ticker) as mock_ticker:
+        assert provider.get_stock_info("AAPL.US").name == "Apple Inc."
+        assert provider.get_financials("AAPL.US")[0].pe == 30.5
+        assert mock_ticker.call_count == 1
+
+        with patch("src.data.yfinance_provider.date") as mock_date:
+            mock_date.today.return_value = date.today() + timedelta(days=1)
+            provider.get_stock_info("AAPL.US")
+        assert mock_ticker.call_count == 2
+
+
+def test_get_daily_quotes_batch(provider):
+    """测试批量下载按股票拆分，并去掉对齐产生的空行"""
+    index = pd.DatetimeIndex(["2024-01-02", "2024-01-03"])
+    frames = {
+        "AAPL": pd.DataFrame(
+            {"Open": [1.5, 2.0], "High": [2.0, 2.5], "Low": [1.0, 1.5], "Close": [1.75, 2.25], "Volume": [100, 200]},
+            index=index,
+        ),
+        "MSFT": pd.DataFrame(
+            {"Open": [float("nan"), 3.0], "High": [float("nan"), 3.5], "Low": [float("nan"), 2.5],
+             "Close": [float("nan"), 3.25], "Volume": [float("nan"), 300]},
+            index=index,
+        ),
+    }
+    downloaded = pd.concat(frames, axis=1)
+
+    with patch("src.data.yfinance_provider.yf.download", return_value=downloaded) as mock_download:
+        result = provider.get_daily_quotes_batch(["AAPL.US", "MSFT", "TSLA"], date(2024, 1, 1), date(2024, 1, 31))
+
+    assert mock_download.call_args.kwargs["tickers"] == "AAPL MSFT TSLA"
+    assert mock_download.call_args.kwargs["auto_adjust"] is True
+    assert [q.close for q in result["AAPL.US"]] == [1.75, 2.25]
+    assert [q.trade_date for q in result["MSFT"]] == [date(2024, 1, 3)]
+    assert result["MSFT"][0].volume == 300
+    assert result["TSLA"] == []